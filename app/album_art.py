@@ -0,0 +1,160 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageTk
+
+from http_session import fetch_bytes
+
+
+class AlbumArtCache:
+    """
+    Two-tier album-art cache with off-thread loading.
+
+    Memory tier: LRU of decoded images already resized to `size`, keyed by
+    track_id (or URL when there is no id). Disk tier: the raw downloaded bytes
+    under `cache_dir`, keyed by a hash of the URL, so art survives restarts.
+    Download, decode and resize run on a small worker pool; only the
+    PhotoImage conversion happens on the Tk thread, once per entry.
+
+    API:
+      art = AlbumArtCache()
+      img = art.request(url, track_id, callback)  # cached image, or None and callback(key, image) later
+      art.prefetch(url, track_id)
+      photo = art.photo(key)                       # Tk thread only
+    """
+
+    def __init__(self, size=(120, 120), capacity=64, cache_dir=".album_art_cache", max_disk_files=512, max_workers=2):
+        self.size = size
+        self.capacity = capacity
+        self.cache_dir = cache_dir
+        self.max_disk_files = max_disk_files
+        self._images = OrderedDict()  # key -> resized PIL image
+        self._photos = {}  # key -> ImageTk.PhotoImage, created and dropped on the Tk thread
+        self._evicted_photos = []
+        self._pending = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="album-art")
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Album art disk cache disabled: {e}")
+            self.cache_dir = None
+
+    @staticmethod
+    def key_for(url, track_id=None):
+        return track_id or url
+
+    def get(self, key):
+        """Return the resized PIL image for `key` if it is in memory."""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def request(self, url, track_id=None, callback=None):
+        """
+        Return the cached image right away, or None and load it in the background.
+
+        `callback(key, image)` is called on a worker thread when the load finishes;
+        image is None if it failed.
+        """
+        key = self.key_for(url, track_id)
+        image = self.get(key)
+        if image is not None:
+            return image
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pool.submit(self._load, key, url)
+                self._pending[key] = future
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(key, None if f.exception() else f.result()))
+        return None
+
+    def prefetch(self, url, track_id=None):
+        if url:
+            self.request(url, track_id)
+
+    def photo(self, key):
+        """Tk thread only. Return a PhotoImage for a cached key, built once per entry."""
+        with self._lock:
+            self._evicted_photos.clear()
+            image = self._images.get(key)
+            photo = self._photos.get(key)
+        if image is None:
+            return None
+        if photo is None:
+            photo = ImageTk.PhotoImage(image=image)
+            with self._lock:
+                if key in self._images:
+                    self._photos[key] = photo
+        return photo
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+    # ---------- Workers ----------
+    def _load(self, key, url):
+        try:
+            image = self._decode(self._read_bytes(url))
+            with self._lock:
+                self._images[key] = image
+                self._images.move_to_end(key)
+                while len(self._images) > self.capacity:
+                    old_key, _ = self._images.popitem(last=False)
+                    # PhotoImages must be released on the Tk thread, see photo()
+                    if old_key in self._photos:
+                        self._evicted_photos.append(self._photos.pop(old_key))
+            return image
+        except Exception as e:
+            print(f"Error processing thumbnail URL: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _read_bytes(self, url):
+        path = self._disk_path(url)
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # keeps _prune_disk least-recently-used
+            return data
+        data = fetch_bytes(url)
+        if path is not None:
+            try:
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._prune_disk()
+            except OSError as e:
+                print(f"Failed to write album art cache: {e}")
+        return data
+
+    def _decode(self, data):
+        image = Image.open(io.BytesIO(data))
+        # Let the JPEG decoder downscale by a power of two before the LANCZOS pass
+        image.draft("RGB", self.size)
+        return image.convert("RGB").resize(self.size, Image.LANCZOS)
+
+    def _disk_path(self, url):
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".img")
+
+    def _prune_disk(self):
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".img")]
+        if len(entries) <= self.max_disk_files:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[: len(entries) - self.max_disk_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -1,24 +1,38 @@
+from startup import lazy_import, run_in_background, timeline  # first, so the timeline starts at launch
 import tkinter as tk
 from tkinter import ttk
-from pynput.keyboard import Key, Controller
 import numpy as np
-import cv2
 import time
 import threading
 import queue
 from PIL import Image, ImageTk
-import io
-import requests
 
-from main_controller import MainController
-from utils import Drawer, Event, targets
 import warnings
 from circle_visualizer import AudioRingVisualizer
+from spectrum_analyzer import load_fft
 from media_info import MediaInfo
+from album_art import AlbumArtCache
+from now_playing import NowPlayingTracker
+from camera_hub import CameraHub
+from quality_governor import QualityGovernor
+from motion_gate import MotionGate
+from session_recorder import SessionRecorder
 warnings.filterwarnings("ignore", category=RuntimeWarning, module="soundcard")
 
+# Heavy modules are imported on first use (or by the model warm-up thread), not at startup
+cv2 = lazy_import("cv2")
+Key = lazy_import("pynput.keyboard", "Key")
+Controller = lazy_import("pynput.keyboard", "Controller")
+Drawer = lazy_import("utils", "Drawer")
+Event = lazy_import("utils", "Event")
+targets = lazy_import("utils", "targets")
+timeline.mark("imports done")
+
 
 class MediaMusicController:
+    INFERENCE_WORKERS = 0  # >0 runs the hand models in that many worker processes (see InferencePool)
+    RECORD_DIR = "recordings"  # detections, tracks and events of every session (see SessionRecorder); None disables
+
     def __init__(self, root):
         self.root = root
         self.root.title("Gesture Control Media Player")
@@ -31,20 +45,31 @@ class MediaMusicController:
         # --- Camera State ---
         self.camera_on = False
         self.camera_visible = False
-        self.cap = None
+        self.camera = CameraHub(0, width=1280, height=720)  # opened once, shared by every frame consumer
         # --- Smaller camera feed ---
         self.CAM_WIDTH = 640
         self.CAM_HEIGHT = 480
-        self.keyboard = Controller()
+        self._keyboard = None
         self.is_gesture_active = False
         self.gesture_thread = None
-        self.stop_flag = False
+        self.gesture_stop = threading.Event()  # set to end the current recognition session
+        # ONNX sessions are created while the window comes up, not when the button is pressed
+        self.controller = None
+        self.governor = None
+        self.motion_gate = None
+        self.controller_future = run_in_background("gesture models", self._load_controller)
+        run_in_background("spectrum fft", load_fft)  # scipy.fft, before the visualizer's first block
 
         # --- Media Info State ---
         self.media_info = MediaInfo()
         self.media_queue = queue.Queue()
-        self.media_poll_thread = None
-        self.polling_media = False
+        self.now_playing = NowPlayingTracker(self.media_info)
+        self.now_playing.subscribe(self.media_queue.put)
+        self.now_playing.subscribe(self._prefetch_next_album_art)
+        self.album_art = AlbumArtCache(size=(120, 120))
+        self.album_art_queue = queue.Queue()
+        self.album_art_key = None
+        self.prefetched_for = None
 
         # --- Top frame (camera/visualizer container) ---
         self.camera_frame = tk.Frame(self.root, width=self.CAM_WIDTH, height=self.CAM_HEIGHT, bg="#282828")
@@ -126,6 +151,23 @@ class MediaMusicController:
         self.status_label.pack(pady=(0, 10))
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after(0, lambda: timeline.mark("window shown"))
+
+    @property
+    def keyboard(self):
+        if self._keyboard is None:
+            self._keyboard = Controller()
+        return self._keyboard
+
+    @staticmethod
+    def _load_controller():
+        from main_controller import MainController
+
+        return MainController(
+            'models/hand_detector.onnx',
+            'models/crops_classifier.onnx',
+            inference_workers=MediaMusicController.INFERENCE_WORKERS,
+        )
 
     # --- rest of your original methods unchanged ---
     def toggle_gesture_control(self):
@@ -136,70 +178,118 @@ class MediaMusicController:
 
     def start_gesture_control(self):
         self.is_gesture_active = True
-        self.stop_flag = False
         self.gesture_btn.config(text="⏸ Stop Gesture Control", bg="#cc0000")
         self.show_status("📷 Gesture control started")
 
 
-        self.gesture_thread = threading.Thread(target=self.run_gesture_recognition, daemon=True)
+        # A new event per session: a quick stop/start must not un-stop the previous loop
+        previous = self.gesture_thread
+        self.gesture_stop = threading.Event()
+        self.gesture_thread = threading.Thread(
+            target=self.run_gesture_recognition, args=(self.gesture_stop, previous), daemon=True
+        )
         self.gesture_thread.start()
 
 
     def stop_gesture_control(self):
-        self.stop_flag = True
+        self.gesture_stop.set()
         self.is_gesture_active = False
-        if self.cap is not None:
-            self.cap.release()
+        self.camera.stop()
         cv2.destroyAllWindows()
         self.gesture_btn.config(text="📷 Start Gesture Control", bg="#0066cc")
         self.show_status("⏸ Gesture control stopped")
 
-    def run_gesture_recognition(self):
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        self.controller = MainController('models/hand_detector.onnx', 'models/crops_classifier.onnx')
+    def run_gesture_recognition(self, stop, previous=None):
+        if previous is not None:
+            previous.join()  # the last session must be done with the controller before it is reset
+        if stop.is_set():
+            return
+        self.camera.start()
+        recognition = self.camera.subscribe("recognition")
+        try:
+            self.controller = self.controller_future.result()
+        except Exception as e:
+            print(f"Failed to load gesture models: {e}")
+            recognition.close()
+            return
+        self.controller.reset()  # models are preloaded once; tracks start fresh every session
         self.drawer = Drawer()
+        self.governor = QualityGovernor()
+        self.motion_gate = MotionGate(idle_after=5.0, idle_hz=2.0)  # sleep the detector on an empty, still scene
+        if self.RECORD_DIR:
+            self.controller.recorder = SessionRecorder(self.RECORD_DIR)
         debug_mode = True
-        while self.cap.isOpened() and not self.stop_flag:
-            ret, frame = self.cap.read()
-            frame = cv2.flip(frame, 1)
-            if ret:
-                start_time = time.time()
-                bboxes, ids, labels = self.controller(frame)
-                if debug_mode and bboxes is not None:
-                    bboxes = bboxes.astype(np.int32)
-                    for i in range(bboxes.shape[0]):
-                        box = bboxes[i, :]
+        next_preview = 0.0
+        bboxes = ids = labels = None
+        while not stop.is_set():
+            frame, _, captured_at = recognition.read(timeout=1.0)
+            if frame is None:
+                if not self.camera.running:
+                    break  # stopped, or the camera could not be opened
+                continue
+            start_time = time.perf_counter()
+            # finished frames (all of them in-process; whatever the workers are done with otherwise)
+            for bboxes, ids, labels, _ in self.controller.results():
+                self.dispatch_track_actions()
+            if self.motion_gate.allow(frame, captured_at, self.controller.last_detection_at):
+                detect, classify = self.governor.plan()
+            else:
+                detect = classify = False
+            preview = debug_mode and captured_at >= next_preview
+            if not (detect or preview):
+                self.governor.frame_done(time.perf_counter() - start_time)
+                continue
+            frame = cv2.flip(frame, 1)  # writable copy; hub frames are shared read-only
+            if detect and self.controller.submit(frame, captured_at, classify):
+                for bboxes, ids, labels, _ in self.controller.results():
+                    self.dispatch_track_actions()
+            if preview:
+                # boxes from the last detected frame; the preview runs at the governor's rate
+                period = 1.0 / self.governor.preview_fps
+                next_preview = max(next_preview + period, captured_at + 0.5 * period)
+                if bboxes is not None:
+                    boxes = bboxes.astype(np.int32)
+                    for i in range(boxes.shape[0]):
+                        box = boxes[i, :]
                         gesture = targets[labels[i]] if labels[i] is not None else "None"
                         cv2.rectangle(frame, (box[0], box[1]), (box[2], box[3]), (255, 255, 0), 4)
                         cv2.putText(frame, f"ID {ids[i]} : {gesture}",
                                     (box[0], box[1] - 10), cv2.FONT_HERSHEY_SIMPLEX,
                                     1, (0, 0, 255), 2)
-                    fps = 1.0 / ((time.time() - start_time) + 0.00001)
-                    cv2.putText(frame, f"fps {fps:.2f}", (10, 30),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                if len(self.controller.tracks) > 0:
-                    for trk in self.controller.tracks:
-                        if trk["tracker"].time_since_update < 1 and len(trk['hands']):
-                            gesture_id = trk['hands'][-1].gesture
-                            gesture_name = targets[gesture_id] if gesture_id is not None else None
-                            if gesture_name in ["part_hand_heart", "part_hand_heart2"]:
-                                self.handle_gesture_action(-1000,gesture_name)
-                            if trk["hands"].action is not None:
-                                self.handle_gesture_action(trk["hands"].action)
-                                self.drawer.set_action(trk["hands"].action)
-                                if trk["hands"].action not in [Event.DRAG, Event.DRAG2, Event.DRAG3]:
-                                    trk["hands"].action = None
+                status = "idle" if self.motion_gate.idle else f"level {self.governor.level}"
+                cv2.putText(frame, f"frame {self.governor.frame_cost * 1000:.1f} ms  {status}",
+                            (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
                 frame = self.drawer.draw(frame)
                 cv2.imshow("Gesture Control", frame)
                 if cv2.waitKey(1) & 0xFF == ord("q"):
-                    self.stop_flag = True
+                    stop.set()
                     break
-        if self.cap is not None:
-            self.cap.release()
+            self.governor.frame_done(time.perf_counter() - start_time)
+        metrics = self.governor.metrics()
+        idle = self.motion_gate.metrics(time.monotonic())
+        print(f"Gesture recognition: {metrics['frames']} frames, {metrics['detections']} detected, "
+              f"{metrics['classifications']} classified, {len(metrics['transitions'])} quality changes, "
+              f"{idle['idle_seconds']:.0f} s idle")
+        if self.controller.recorder is not None:
+            self.controller.recorder.close()
+            self.controller.recorder = None
+        recognition.close()
         cv2.destroyAllWindows()
 
+    def dispatch_track_actions(self):
+        """Fire the actions of tracks updated by the frame just tracked."""
+        for trk in self.controller.tracks:
+            if trk["tracker"].time_since_update < 1 and len(trk['hands']):
+                gesture_id = trk['hands'][-1].gesture
+                gesture_name = targets[gesture_id] if gesture_id is not None else None
+                if gesture_name in ["part_hand_heart", "part_hand_heart2"]:
+                    self.handle_gesture_action(-1000,gesture_name)
+                if trk["hands"].action is not None:
+                    self.handle_gesture_action(trk["hands"].action)
+                    self.drawer.set_action(trk["hands"].action)
+                    if trk["hands"].action not in [Event.DRAG, Event.DRAG2, Event.DRAG3]:
+                        trk["hands"].action = None
+
     def handle_gesture_action(self, action, gesture="None"):
         # print("gesture", gesture)
         if action in [Event.SWIPE_LEFT, Event.SWIPE_LEFT2, Event.SWIPE_LEFT3]:
@@ -223,15 +313,18 @@ class MediaMusicController:
         self.keyboard.press(Key.media_play_pause)
         self.keyboard.release(Key.media_play_pause)
         self.show_status("⏯ Play/Pause toggled")
+        self.now_playing.poke()
 
     def next_track(self):
         self.keyboard.press(Key.media_next)
         self.keyboard.release(Key.media_next)
         self.show_status("⏭ Skipped to next track")
+        self.now_playing.poke()
     def previous_track(self):
         self.keyboard.press(Key.media_previous)
         self.keyboard.release(Key.media_previous)
         self.show_status("⏮ Previous track")
+        self.now_playing.poke()
     def volume_up(self):
         self.keyboard.press(Key.media_volume_up)
         self.keyboard.release(Key.media_volume_up)
@@ -247,38 +340,33 @@ class MediaMusicController:
 
     # ---------- Media polling ----------
     def start_media_polling(self):
-        if self.polling_media:
-            return
-        self.polling_media = True
-        self.media_poll_thread = threading.Thread(target=self._run_media_polling_loop, daemon=True)
-        self.media_poll_thread.start()
+        self.now_playing.start()
 
     def stop_media_polling(self):
-        if not self.polling_media:
-            return
-        self.polling_media = False
-        if self.media_poll_thread:
-            self.media_poll_thread.join(timeout=1.0)
-            self.media_poll_thread = None
-
-    def _run_media_polling_loop(self):
-        while self.polling_media:
-            try:
-                info = self.media_info.get()
-                self.media_queue.put(info)
-            except Exception as e:
-                print(f"Error in media info thread: {e}")
-                self.media_queue.put(None)
-            time.sleep(2)
+        self.now_playing.stop()
 
     def check_media_queue(self):
         try:
             while not self.media_queue.empty():
                 info = self.media_queue.get_nowait()
                 self.update_media_ui(info)
+            while not self.album_art_queue.empty():
+                key = self.album_art_queue.get_nowait()
+                if key == self.album_art_key:
+                    self.show_album_art(key)
         except queue.Empty:
             pass
 
+    def _prefetch_next_album_art(self, info):
+        # Runs on the now-playing thread, once per track change
+        track_id = info.get("track_id") if info else None
+        if track_id is None or track_id == self.prefetched_for:
+            return
+        self.prefetched_for = track_id
+        next_info = self.media_info.next_in_queue()
+        if next_info:
+            self.album_art.prefetch(next_info["album_art_url"], next_info["track_id"])
+
     def update_media_ui(self, info):
         # 1) Text labels
         if info and info.get('title'):
@@ -292,38 +380,27 @@ class MediaMusicController:
             self.song_title_label.config(text="No Media Playing")
             self.artist_label.config(text="---")
 
-        # --- 2. Update Album Art (Spotipy URL Method) ---
-        
+        # --- 2. Update Album Art (cached, loaded off the Tk thread) ---
         album_art_url = info.get("album_art_url") if info else None
-        
-        
-        if album_art_url:
-            try:
-                headers = {'User-Agent': 'Mozilla/5.0'}
-                response = requests.get(album_art_url, headers=headers, stream=True)
-                
-                if response.status_code != 200:
-                    raise Exception(f"Failed to download image: {response.status_code}")
-
-                image_bytes = response.raw.read()
-                image_stream = io.BytesIO(image_bytes)
-                pil_img = Image.open(image_stream)
-                
-                # --- Resize to new 120x120 size ---
-                pil_img = pil_img.resize((120, 120), Image.LANCZOS)
-                
-                img_tk = ImageTk.PhotoImage(image=pil_img)
-                
-                self.album_art_label.config(image=img_tk)
-                self.album_art_label.image = img_tk 
-                
-            except Exception as e:
-                print(f"Error processing thumbnail URL: {e}")
-                self.album_art_label.config(image=self.placeholder_img)
-                self.album_art_label.image = self.placeholder_img
-        else:
-            self.album_art_label.config(image=self.placeholder_img)
-            self.album_art_label.image = self.placeholder_img 
+        if not album_art_url:
+            self.album_art_key = None
+            self.show_album_art(None)
+            return
+
+        key = AlbumArtCache.key_for(album_art_url, info.get("track_id"))
+        if key == self.album_art_key:
+            return  # Same track, art is already shown or on its way
+        self.album_art_key = key
+        image = self.album_art.request(album_art_url, info.get("track_id"),
+                                       callback=lambda k, _img: self.album_art_queue.put(k))
+        self.show_album_art(key if image is not None else None)
+
+    def show_album_art(self, key):
+        img_tk = self.album_art.photo(key) if key is not None else None
+        if img_tk is None:
+            img_tk = self.placeholder_img
+        self.album_art_label.config(image=img_tk)
+        self.album_art_label.image = img_tk
 
 
     # ---------- Helpers ----------
@@ -335,11 +412,13 @@ class MediaMusicController:
         # Always clean up both camera and visualizer
 
         self.stop_media_polling()
-        if self.camera_on:
-            try:
-                self.cap.release()
-            except Exception:
-                pass
+        self.album_art.shutdown()
+        self.gesture_stop.set()
+        self.camera.stop()
+        if self.gesture_thread is not None:
+            self.gesture_thread.join(timeout=2.0)
+        if self.controller is not None:
+            self.controller.close()
         self.root.destroy()
 
     def update_camera_feed(self):
@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Single-producer / single-consumer ring of mono float32 samples.
+
+    The writer copies a block into the preallocated buffer and then publishes it
+    by advancing `written` (total samples ever written). Readers never take a
+    lock: they copy the newest samples and retry if the writer lapped them
+    during the copy.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._buf = np.zeros(self.capacity, dtype=np.float32)
+        self.written = 0
+
+    def write(self, block):
+        n = block.shape[0]
+        if n > self.capacity:
+            block = block[-self.capacity:]
+            self.written += n - self.capacity
+            n = self.capacity
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self._buf[start:start + first] = block[:first]
+        self._buf[:n - first] = block[first:]
+        self.written += n  # publish
+
+    def read_latest(self, out):
+        """
+        Copy the newest len(out) samples into `out` (oldest first).
+
+        Returns
+        -------
+        int
+            Value of `written` the copy corresponds to.
+        """
+        n = out.shape[0]
+        for _ in range(3):
+            end = self.written
+            available = min(n, end, self.capacity)
+            out[:n - available] = 0.0
+            start = (end - available) % self.capacity
+            first = min(available, self.capacity - start)
+            out[n - available:n - available + first] = self._buf[start:start + first]
+            out[n - available + first:] = self._buf[:available - first]
+            if self.written - (end - available) <= self.capacity:
+                break  # the writer did not overwrite what we copied
+        return end
+
+
+class LoopbackCapture:
+    """
+    Records the default speaker's loopback on a dedicated thread.
+
+    The thread reads `hop` frames at a time into an AudioRingBuffer, so the UI
+    never waits on the audio device. latest() returns the newest `window`
+    samples (consecutive windows overlap by window - hop) without blocking.
+
+    API:
+      c = LoopbackCapture(samplerate=44100, window=2048, overlap=0.75)
+      c.start()
+      samples, is_new = c.latest()
+      c.stop()
+    """
+
+    def __init__(self, samplerate=44100, window=2048, hop=None, overlap=0.75, buffer_windows=4):
+        self.samplerate = samplerate
+        self.window = int(window)
+        self.hop = int(hop) if hop else max(1, int(round(self.window * (1.0 - overlap))))
+        self.ring = AudioRingBuffer(self.window * buffer_windows)
+        self._out = np.zeros(self.window, dtype=np.float32)
+        self._last_read = None
+        self._thread = None
+        self.running = False
+        self.error = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def latest(self):
+        """
+        Returns
+        -------
+        samples : np.ndarray
+            Newest `window` samples, float32. The array is reused between calls.
+        is_new : bool
+            False if no samples arrived since the previous call.
+        """
+        end = self.ring.read_latest(self._out)
+        is_new = end != self._last_read
+        self._last_read = end
+        return self._out, is_new
+
+    def _run(self):
+        # soundcard is opened on the thread that records (COM on Windows)
+        try:
+            import soundcard as sc
+
+            default_speaker = sc.default_speaker()
+            try:
+                loopback = sc.get_microphone(id=str(default_speaker.name), include_loopback=True)
+            except Exception:
+                mics = sc.all_microphones(include_loopback=True)
+                loopback = [m for m in mics if "loopback" in m.name.lower()][0]
+            with loopback.recorder(samplerate=self.samplerate, blocksize=self.hop) as rec:
+                while self.running:
+                    data = rec.record(numframes=self.hop)
+                    data = data.mean(axis=1) if data.ndim > 1 else data
+                    self.ring.write(data.astype(np.float32, copy=False))
+        except Exception as e:
+            print("Audio capture error:", e)
+            self.error = e
+            self.running = False
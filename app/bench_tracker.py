@@ -0,0 +1,335 @@
+import argparse
+import time
+
+import numpy as np
+
+import main_controller
+from main_controller import MainController
+from ocsort import KalmanBoxTracker, associate, giou_batch, iou_batch, kernels
+from ocsort.association import velocity_direction_cost
+from ocsort.box_filter import BoxKalmanFilter
+from ocsort.kalmanboxtracker import convert_bbox_to_z
+from ocsort.kalmanfilter import KalmanFilterNew
+from synthetic_hands import SyntheticScene
+
+FILTER_TOLERANCE = 1e-8  # largest relative difference allowed between BoxKalmanFilter and KalmanFilterNew
+KERNEL_TOLERANCE = 1e-12  # largest difference allowed between the numba and NumPy kernel backends
+KERNELS = ("iou_batch", "giou_batch", "angle_diff_cost", "box_predict", "box_update")
+
+
+class _Timed:
+    """Wraps a function and adds up the time spent in it."""
+
+    def __init__(self, func):
+        self.func = func
+        self.seconds = 0.0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def bench(frames, **controller_kwargs):
+    """
+    Run a tracker-only MainController over a detection stream.
+
+    Returns
+    -------
+    seconds : float
+        Time spent in update().
+    associate_seconds : float
+        Part of it spent in the first association round (associate()).
+    outputs : list
+        update() output per frame: (boxes with the track id in the last column, labels) or None.
+    """
+    controller = MainController(None, None, **controller_kwargs)
+    saved_count = KalmanBoxTracker.count
+    KalmanBoxTracker.count = 0
+    timed = _Timed(main_controller.associate)
+    main_controller.associate = timed
+    outputs = []
+    try:
+        start = time.perf_counter()
+        for timestamp, dets, labels in frames:
+            outputs.append(controller.update(dets, labels, timestamp))
+        seconds = time.perf_counter() - start
+    finally:
+        main_controller.associate = timed.func
+        KalmanBoxTracker.count = saved_count
+    return seconds, timed.seconds, outputs
+
+
+def identity_metrics(frames, truth, outputs):
+    """
+    Returns
+    -------
+    dict
+        id_switches: times an object's reported track id changed;
+        tracks: distinct track ids reported;
+        coverage: share of true detections reported under some track.
+    """
+    last_id = {}
+    switches = 0
+    reported = 0
+    total = 0
+    ids = set()
+    for (_, dets, _), objects, output in zip(frames, truth, outputs):
+        total += int((objects >= 0).sum())
+        if output is None or len(output[0]) == 0:
+            continue
+        # an updated track reports its last observation, i.e. the detection box itself
+        owner = {tuple(box): obj for box, obj in zip(dets[:, :4].tolist(), objects.tolist())}
+        boxes = output[0]
+        for box, track_id in zip(boxes[:, :4].tolist(), boxes[:, 4].astype(int).tolist()):
+            obj = owner.get(tuple(box), -1)
+            ids.add(track_id)
+            if obj < 0:
+                continue
+            reported += 1
+            if obj in last_id and last_id[obj] != track_id:
+                switches += 1
+            last_id[obj] = track_id
+    return {"id_switches": switches, "tracks": len(ids), "coverage": reported / max(1, total)}
+
+
+def check_box_filter(trials=500, seed=0):
+    """
+    Property check: BoxKalmanFilter follows KalmanFilterNew on random box trajectories.
+
+    Each trial drives both filters, configured as KalmanBoxTracker does, through random
+    motion with random misses (so freeze/unfreeze re-updates are covered too) and compares
+    x, P and K after every step.
+
+    Returns
+    -------
+    worst : float
+        Largest difference, relative to 1 + |dense value|.
+    us : tuple of float
+        Microseconds per predict+update for (KalmanFilterNew, BoxKalmanFilter).
+    """
+    rng = np.random.default_rng(seed)
+    worst = 0.0
+    for _ in range(trials):
+        dense, box_kf = KalmanFilterNew(dim_x=7, dim_z=4), BoxKalmanFilter()
+        corner = rng.uniform(0.0, 1000.0, 2)
+        size = rng.uniform(20.0, 200.0, 2)
+        for kf in (dense, box_kf):
+            KalmanBoxTracker._configure(kf)
+            kf.x[:4] = convert_bbox_to_z(np.concatenate((corner, corner + size)))
+        for _ in range(rng.integers(2, 150)):
+            corner += rng.normal(0.0, 10.0, 2)
+            size = np.clip(size + rng.normal(0.0, 4.0, 2), 5.0, None)
+            z = None if rng.random() < rng.uniform(0.0, 0.5) else convert_bbox_to_z(np.concatenate((corner, corner + size)))
+            dense.predict()
+            box_kf.predict()
+            dense.update(z)
+            box_kf.update(None if z is None else z.copy())
+            for name in ("x", "P", "K"):
+                a, b = getattr(dense, name), getattr(box_kf, name)
+                worst = max(worst, float(np.max(np.abs(a - b) / (1.0 + np.abs(a)))))
+    us = []
+    z = convert_bbox_to_z(np.array([100.0, 100.0, 180.0, 200.0]))
+    for kf in (KalmanFilterNew(dim_x=7, dim_z=4), BoxKalmanFilter()):
+        KalmanBoxTracker._configure(kf)
+        start = time.perf_counter()
+        for _ in range(5000):
+            kf.predict()
+            kf.update(z)
+        us.append((time.perf_counter() - start) * 1e6 / 5000)
+    return worst, tuple(us)
+
+
+def _random_boxes(rng, n):
+    corner = rng.uniform(0.0, 1000.0, (n, 2))
+    size = rng.uniform(5.0, 200.0, (n, 2))
+    return np.column_stack((corner, corner + size, rng.uniform(0.1, 1.0, n)))
+
+
+def check_kernels(trials=300, seed=0):
+    """
+    Equivalence check: the numba kernels give the NumPy results.
+
+    Random detection/track sets of 0-12 boxes go through iou_batch, giou_batch,
+    velocity_direction_cost and associate() under both backends, and random box
+    trajectories through BoxKalmanFilter (as in check_box_filter). A short tracker run
+    (new tracks, misses, false positives) then checks that kernels.warmup() compiled
+    everything the tracker calls, so the camera's first frames do not wait for numba.
+
+    Returns
+    -------
+    worst : float
+        Largest difference between the backends; inf if associate() matched differently.
+    recompiled : list
+        Kernels numba had to compile again after warmup(); empty if none.
+    timings : list
+        (name, objects, numpy us, numba us) per kernel call.
+    """
+    saved = kernels.backend
+    rng = np.random.default_rng(seed)
+    worst = 0.0
+    try:
+        kernels.use("numba")
+        kernels.warmup()
+        compiled = {name: set(getattr(kernels, name).signatures) for name in KERNELS}
+        for _ in range(trials):
+            dets, trks = _random_boxes(rng, rng.integers(0, 13)), _random_boxes(rng, rng.integers(0, 13))
+            trks[rng.random(len(trks)) < 0.2, 4] = -1.0  # tracks without a previous observation
+            velocities = rng.normal(0.0, 1.0, (len(trks), 2))
+            velocities /= np.linalg.norm(velocities, axis=1, keepdims=True) + 1e-6
+            calls = (
+                lambda: iou_batch(dets, trks),
+                lambda: giou_batch(dets, trks),
+                lambda: velocity_direction_cost(dets, trks, velocities, 0.2),
+            )
+            for call in calls:
+                kernels.use("numpy")
+                expected = call()
+                kernels.use("numba")
+                worst = max(worst, float(np.max(np.abs(call() - expected), initial=0.0)))
+            results = []
+            for name in ("numpy", "numba"):
+                kernels.use(name)
+                results.append(associate(dets, trks, 0.3, velocities, trks, 0.2))
+            if not all(np.array_equal(a, b) for a, b in zip(*results)):
+                worst = np.inf
+
+        filters = BoxKalmanFilter(), BoxKalmanFilter()
+        for trial in range(trials):
+            if trial % 50 == 0:
+                filters = BoxKalmanFilter(), BoxKalmanFilter()
+                for kf in filters:
+                    KalmanBoxTracker._configure(kf)
+            z = None if rng.random() < 0.2 else convert_bbox_to_z(_random_boxes(rng, 1)[0, :4])
+            for kf, name in zip(filters, ("numpy", "numba")):
+                kernels.use(name)
+                kf.predict()
+                kf.update(None if z is None else z.copy())
+            for attr in ("x", "P", "K"):
+                a, b = getattr(filters[0], attr), getattr(filters[1], attr)
+                worst = max(worst, float(np.max(np.abs(a - b) / (1.0 + np.abs(a)))))
+
+        kernels.use("numba")
+        frames, _ = SyntheticScene(objects=5, frames=100, false_positives=1.0, seed=seed).generate()
+        bench(frames)
+        recompiled = [name for name in KERNELS if set(getattr(kernels, name).signatures) - compiled[name]]
+
+        timings = []
+        for objects in (2, 5, 10):
+            dets, trks = _random_boxes(rng, objects), _random_boxes(rng, objects)
+            velocities = np.zeros((objects, 2))
+            kf = BoxKalmanFilter()
+            KalmanBoxTracker._configure(kf)
+            z = convert_bbox_to_z(trks[0, :4])
+            calls = (
+                ("iou_batch", lambda: iou_batch(dets, trks)),
+                ("giou_batch", lambda: giou_batch(dets, trks)),
+                ("velocity_direction_cost", lambda: velocity_direction_cost(dets, trks, velocities, 0.2)),
+                ("associate", lambda: associate(dets, trks, 0.3, velocities, trks, 0.2)),
+                ("kalman predict+update", lambda: (kf.predict(), kf.update(z))),
+            )
+            for name, call in calls:
+                if name.startswith("kalman") and objects != 2:
+                    continue  # per track, independent of the object count
+                us = []
+                for backend in ("numpy", "numba"):
+                    kernels.use(backend)
+                    start = time.perf_counter()
+                    for _ in range(2000):
+                        call()
+                    us.append((time.perf_counter() - start) * 1e6 / 2000)
+                timings.append((name, objects if not name.startswith("kalman") else 1, *us))
+    finally:
+        kernels.use(saved)
+    return worst, recompiled, timings
+
+
+def run(args):
+    if args.check_filter:
+        worst, (dense_us, box_us) = check_box_filter()
+        ok = worst <= FILTER_TOLERANCE
+        print(f"BoxKalmanFilter vs KalmanFilterNew: worst relative difference {worst:.2e} "
+              f"({'ok' if ok else 'FAILED'}), {dense_us:.1f} -> {box_us:.1f} us per predict+update")
+        if not ok:
+            return 1
+    if args.check_kernels:
+        if kernels.numba is None:
+            print("numba is not installed; skipping the kernel check")
+        else:
+            worst, recompiled, timings = check_kernels()
+            same = worst <= KERNEL_TOLERANCE
+            ok = same and not recompiled
+            print(f"numba vs NumPy kernels: worst difference {worst:.2e} ({'ok' if same else 'FAILED'})")
+            print(f"compiled after warmup(): {', '.join(recompiled) if recompiled else 'nothing (ok)'}")
+            print(f"{'kernel':>24} {'objects':>7} {'numpy us':>9} {'numba us':>9} {'speedup':>8}")
+            for name, objects, numpy_us, numba_us in timings:
+                print(f"{name:>24} {objects:>7} {numpy_us:>9.1f} {numba_us:>9.1f} {numpy_us / numba_us:>7.1f}x")
+            if not ok:
+                return 1
+    backends = args.backends or [kernels.backend]
+    print(f"{args.frames} frames per scene, motion {args.motion}, crossing {args.crossing:.0%}, "
+          f"dropout {args.dropout:.0%}, noise {args.noise:g} px, {args.false_positives:g} false positives/frame")
+    KalmanBoxTracker.steady_state = not args.full_kalman
+    print(f"Kalman filter: {'full' if args.full_kalman else 'steady-state gain once converged'}")
+    print(f"{'objects':>7} {'kernels':>7} {'dets/frame':>10} {'ms/frame':>9} {'frames/s':>9} {'assoc %':>8} {'steady %':>9} "
+          f"{'id switches':>11} {'tracks':>7} {'coverage':>9}")
+    for objects in args.objects:
+        scene = SyntheticScene(
+            objects=objects,
+            frames=args.frames,
+            motion=args.motion,
+            crossing=args.crossing,
+            dropout=args.dropout,
+            occlusion_iou=args.occlusion_iou,
+            noise_px=args.noise,
+            false_positives=args.false_positives,
+            seed=args.seed,
+        )
+        frames, truth = scene.generate()
+        dets_per_frame = np.mean([len(dets) for _, dets, _ in frames])
+        for backend in backends:
+            backend = kernels.use(backend)
+            kernels.warmup()
+            bench(frames[:min(30, len(frames))])  # warm-up
+            before = dict(KalmanBoxTracker.paths)
+            seconds, associate_seconds, outputs = bench(frames)
+            paths = {path: KalmanBoxTracker.paths[path] - before[path] for path in before}
+            steady_share = paths["steady"] / max(1, paths["steady"] + paths["full"])
+            metrics = identity_metrics(frames, truth, outputs)
+            print(f"{objects:>7} {backend:>7} {dets_per_frame:>10.1f} {seconds * 1000 / len(frames):>9.3f} "
+                  f"{len(frames) / seconds:>9.1f} {100 * associate_seconds / seconds:>8.1f} {100 * steady_share:>9.1f} "
+                  f"{metrics['id_switches']:>11} {metrics['tracks']:>7} {metrics['coverage']:>9.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="Benchmark the hand tracker on synthetic multi-hand scenes")
+    parser.add_argument(
+        "--objects",
+        default=[1, 2, 5, 10, 20, 50, 100, 200],
+        type=int,
+        nargs="+",
+        help="Object counts to compare",
+    )
+    parser.add_argument("--frames", default=300, type=int, help="Frames per scene")
+    parser.add_argument("--motion", default="walk", choices=SyntheticScene.MOTIONS, help="Motion model")
+    parser.add_argument("--crossing", default=0.2, type=float, help="Share of objects on crossing paths")
+    parser.add_argument("--dropout", default=0.05, type=float, help="Chance of a missed detection")
+    parser.add_argument("--occlusion-iou", default=0.5, type=float, help="Overlap that hides the object behind")
+    parser.add_argument("--noise", default=2.0, type=float, help="Detector noise per box corner, in pixels")
+    parser.add_argument("--false-positives", default=0.0, type=float, help="Spurious detections per frame")
+    parser.add_argument("--seed", default=0, type=int, help="Scene random seed")
+    parser.add_argument("--full-kalman", action="store_true", help="Disable the steady-state Kalman gain")
+    parser.add_argument("--check-filter", action="store_true", help="First check BoxKalmanFilter against KalmanFilterNew")
+    parser.add_argument("--check-kernels", action="store_true", help="First check the numba kernels against NumPy and time both")
+    parser.add_argument(
+        "--backends",
+        choices=kernels.BACKENDS,
+        nargs="+",
+        help="Kernel backends to compare side by side (default: the one selected at import)",
+    )
+    args = parser.parse_args()
+    raise SystemExit(run(args))
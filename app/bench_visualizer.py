@@ -0,0 +1,103 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from offline_render import OfflineRingRenderer, load_audio
+from ring_frames import RingFrameBuilder
+
+
+def synthetic_audio(seconds, samplerate, seed=0):
+    """Kick drum on the beat over a chord and noise, enough to drive every code path."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * samplerate)) / samplerate
+    beat = np.exp(-((t % 0.5) * 18.0))
+    kick = beat * np.sin(2 * np.pi * 55.0 * t)
+    chord = sum(0.1 * np.sin(2 * np.pi * f * t) for f in (220.0, 277.2, 329.6, 880.0))
+    return (0.6 * kick + chord + 0.05 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def bench(renderer, frames):
+    """Frames per second and time split between analysis, shaping and rasterization."""
+    builder = renderer.builder
+    timings = np.zeros(3)
+    start = time.perf_counter()
+    for index in range(frames):
+        block = renderer.block(index)
+        t0 = time.perf_counter()
+        builder.analyzer.process(block, now=index / renderer.fps)
+        t1 = time.perf_counter()
+        r_per_angle, palette = builder.ring_shape()
+        t2 = time.perf_counter()
+        builder.renderer.render(r_per_angle, palette)
+        builder.r_inner = builder.inner_radius()
+        timings += (t1 - t0, t2 - t1, time.perf_counter() - t2)
+    total = time.perf_counter() - start
+    return frames / total, timings * 1000.0 / frames
+
+
+def allocations(renderer, frames):
+    """Mean count and bytes of Python/NumPy allocations still traced after each frame, and the mean transient peak."""
+    tracemalloc.start()
+    try:
+        peaks, blocks, sizes = [], [], []
+        for index in range(frames):
+            block = renderer.block(index)
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            renderer.builder.step(block, now=index / renderer.fps)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            diff = tracemalloc.take_snapshot().compare_to(before, "filename")
+            blocks.append(sum(max(0, d.count_diff) for d in diff))
+            sizes.append(sum(max(0, d.size_diff) for d in diff))
+    finally:
+        tracemalloc.stop()
+    return np.mean(blocks), np.mean(sizes), np.mean(peaks)
+
+
+def run(args):
+    if args.input:
+        samples, samplerate = load_audio(args.input, args.samplerate)
+    else:
+        samplerate = args.samplerate or RingFrameBuilder.FS
+        samples = synthetic_audio(args.frames / args.fps + 1.0, samplerate)
+
+    print(f"{len(samples) / samplerate:.1f} s of audio @ {samplerate} Hz, display {args.size}px, {args.frames} frames")
+    print(f"{'internal':>8} {'fps':>9} {'analyze ms':>11} {'shape ms':>9} {'raster ms':>10} "
+          f"{'kept/frame':>11} {'kept B':>8} {'peak KiB':>9}")
+    for internal_size in args.internal_sizes:
+        renderer = OfflineRingRenderer(samples, samplerate, args.size, internal_size, args.fps)
+        for _ in renderer.frames(min(30, args.frames)):
+            pass  # warm-up
+        fps, stages = bench(renderer, args.frames)
+        kept, kept_bytes, peak = allocations(renderer, args.alloc_frames)
+        print(f"{internal_size:>8} {fps:>9.1f} {stages[0]:>11.3f} {stages[1]:>9.3f} {stages[2]:>10.3f} "
+              f"{kept:>11.1f} {kept_bytes:>8.0f} {peak / 1024:>9.1f}")
+
+    if args.out:
+        renderer = OfflineRingRenderer(samples, samplerate, args.size, args.internal_sizes[-1], args.fps)
+        written = renderer.save_sequence(args.out, args.frames)
+        print(f"Wrote {written} frames to {args.out}")
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="Benchmark the audio ring visualizer without Tk or a sound card")
+    parser.add_argument("--input", default=None, type=str, help="WAV or .npy audio; synthetic beat if omitted")
+    parser.add_argument("--samplerate", default=None, type=int, help="Sample rate of a .npy input")
+    parser.add_argument("--size", default=480, type=int, help="Display size in pixels")
+    parser.add_argument(
+        "--internal-sizes",
+        default=[160, 240, 320, 480],
+        type=int,
+        nargs="+",
+        help="INTERNAL_SIZE values to compare",
+    )
+    parser.add_argument("--fps", default=60, type=int, help="Frame rate the audio is sliced at")
+    parser.add_argument("--frames", default=600, type=int, help="Frames to time per INTERNAL_SIZE")
+    parser.add_argument("--alloc-frames", default=50, type=int, help="Frames traced with tracemalloc")
+    parser.add_argument("--out", default=None, type=str, help="Also write an image sequence here")
+    args = parser.parse_args()
+    run(args)
@@ -0,0 +1,207 @@
+import threading
+import time
+
+import numpy as np
+
+from startup import lazy_import
+
+cv2 = lazy_import("cv2")  # imported by the grab thread, not at app startup
+
+
+class CameraConsumer:
+    """
+    One reader of a CameraHub, with its own rate limit and output size.
+
+    Frames are read-only. Without `size` they are the hub's decoded frames
+    (no copy); with `size` they are resized into a buffer owned by this
+    consumer, reused on the next read/callback.
+    """
+
+    def __init__(self, hub, name, callback=None, fps=None, size=None):
+        self.hub = hub
+        self.name = name
+        self.callback = callback
+        self.fps = fps
+        self.size = tuple(size) if size else None
+        self.last_seq = 0
+        self.next_at = 0.0
+        self.delivered = 0
+        self._buf = None
+
+    def read(self, timeout=None):
+        """
+        Block until a frame newer than the last one read is due.
+
+        Returns
+        -------
+        frame : np.ndarray or None
+            Read-only BGR frame, None on timeout or when the hub stopped.
+        seq : int
+            Frame sequence number (increases by one per grabbed frame).
+        timestamp : float
+            time.monotonic() when the frame was grabbed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            frame, seq, timestamp = self.hub.wait_frame(self.last_seq, remaining)
+            if frame is None:
+                return None, self.last_seq, None
+            if self._due(timestamp):
+                return self._deliver(frame, seq, timestamp), seq, timestamp
+            self.last_seq = seq  # skipped by the rate limit
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def _due(self, timestamp):
+        return not self.fps or timestamp >= self.next_at
+
+    def _deliver(self, frame, seq, timestamp):
+        self.last_seq = seq
+        if self.fps:
+            # Stay on schedule so frame-time jitter does not lower the delivered rate
+            self.next_at = max(self.next_at + 1.0 / self.fps, timestamp + 0.5 / self.fps)
+        self.delivered += 1
+        if self.size is None or frame.shape[1::-1] == self.size:
+            return frame
+        if self._buf is None:
+            self._buf = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+        self._buf.flags.writeable = True
+        cv2.resize(frame, self.size, dst=self._buf)
+        self._buf.flags.writeable = False
+        return self._buf
+
+
+class CameraHub:
+    """
+    Owns the camera: opens and configures it once, decodes each frame once.
+
+    A grab thread reads the device and publishes every frame read-only with
+    a sequence number and timestamp. Consumers either pull (read()) or get a
+    callback on the grab thread; each has its own rate limit and resolution,
+    so preview and recognition (and recording) share one stream.
+
+    API:
+      hub = CameraHub(0, width=1280, height=720)
+      hub.start()                                   # opens the device on the grab thread
+      rec = hub.subscribe("recognition")
+      frame, seq, ts = rec.read(timeout=1.0)
+      hub.subscribe("preview", callback=preview.submit, fps=30)
+      rec.close(); hub.stop()
+    """
+
+    OPEN_TIMEOUT = 5.0
+
+    def __init__(self, index=0, width=1280, height=720):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.consumers = []
+        self.frame = None
+        self.seq = 0
+        self.timestamp = None
+        self.error = None
+        self.running = False
+        self._opened = threading.Event()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    # ---------- Public API ----------
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.error = None
+        self._opened.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def wait_open(self, timeout=None):
+        """Wait until the device is open; raises the open error if it failed."""
+        self._opened.wait(self.OPEN_TIMEOUT if timeout is None else timeout)
+        if self.error is not None:
+            raise self.error
+        return self._opened.is_set()
+
+    def subscribe(self, name, callback=None, fps=None, size=None):
+        """
+        Parameters
+        ----------
+        name : str
+            Label used in error messages.
+        callback : callable
+            callback(frame, seq, timestamp), called on the grab thread. Pull consumers leave it None.
+        fps : float
+            Maximum delivery rate; None delivers every frame.
+        size : tuple
+            (width, height) to resize to; None keeps the capture size.
+        """
+        consumer = CameraConsumer(self, name, callback, fps, size)
+        with self._cond:
+            self.consumers.append(consumer)
+        return consumer
+
+    def unsubscribe(self, consumer):
+        with self._cond:
+            if consumer in self.consumers:
+                self.consumers.remove(consumer)
+
+    def wait_frame(self, after_seq, timeout=None):
+        """Newest (frame, seq, timestamp) with seq > after_seq; (None, after_seq, None) on timeout/stop."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after_seq or not self.running, timeout)
+            if not self.running or self.seq <= after_seq:
+                return None, after_seq, None
+            return self.frame, self.seq, self.timestamp
+
+    # ---------- Grab thread ----------
+    def _run(self):
+        cap = None
+        try:
+            cap = cv2.VideoCapture(self.index)
+            if not cap.isOpened():
+                raise RuntimeError("Cannot open webcam")
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            self._opened.set()
+
+            while self.running:
+                ret, frame = cap.read()
+                if not ret:
+                    time.sleep(0.005)
+                    continue
+                frame.flags.writeable = False
+                timestamp = time.monotonic()
+                with self._cond:
+                    self.frame, self.timestamp = frame, timestamp
+                    self.seq += 1
+                    seq = self.seq
+                    pushed = [c for c in self.consumers if c.callback is not None]
+                    self._cond.notify_all()
+                for consumer in pushed:
+                    if consumer._due(timestamp):
+                        try:
+                            consumer.callback(consumer._deliver(frame, seq, timestamp), seq, timestamp)
+                        except Exception as e:
+                            print(f"Camera consumer '{consumer.name}' error: {e}")
+        except Exception as e:
+            print(f"Camera error: {e}")
+            self.error = e
+            self._opened.set()
+        finally:
+            self.running = False
+            if cap is not None:
+                cap.release()
+            with self._cond:
+                self._cond.notify_all()
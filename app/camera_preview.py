@@ -0,0 +1,84 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class CameraPreview:
+    """
+    Mirrored, resized RGB preview of camera frames for a Tk label.
+
+    Frames are handed in by whichever thread already grabbed them (submit()),
+    at most `fps` times per second; everything above that rate is dropped
+    before any pixel is touched. The frame is resized straight into a reused
+    buffer, then mirrored and converted BGR→RGB in place. On the Tk thread,
+    show() pastes the newest frame into one persistent PhotoImage.
+
+    API:
+      p = CameraPreview(label, width=640, height=480, fps=30)
+      p.submit(frame_bgr)   # any thread
+      p.show()              # Tk thread, e.g. from an after() loop
+      p.clear()
+    """
+
+    def __init__(self, label, width=640, height=480, fps=30, mirror=True):
+        self.label = label
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.mirror = mirror
+        self.photo = None
+        self._front = np.empty((height, width, 3), dtype=np.uint8)
+        self._back = np.empty_like(self._front)
+        self._seq = 0
+        self._shown_seq = 0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def submit(self, frame):
+        """Offer a BGR frame; returns True if it was taken for the preview."""
+        now = time.monotonic()
+        if frame is None or now < self._next_at:
+            return False
+        # Keep the cadence: a frame a little early for its slot still takes it
+        period = 1.0 / self.fps
+        self._next_at = max(self._next_at + period, now + 0.5 * period)
+
+        out = self._back
+        if frame.shape[:2] == (self.height, self.width):
+            np.copyto(out, frame)
+        else:
+            cv2.resize(frame, (self.width, self.height), dst=out)
+        if self.mirror:
+            cv2.flip(out, 1, dst=out)
+        cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=out)
+
+        # The Tk thread only ever reads _front, under the lock
+        with self._lock:
+            self._front, self._back = self._back, self._front
+            self._seq += 1
+        return True
+
+    def show(self):
+        """Tk thread only. Paste the newest frame, if there is one, into the label's PhotoImage."""
+        with self._lock:
+            if self._seq == self._shown_seq:
+                return False
+            self._shown_seq = self._seq
+            image = Image.frombuffer("RGB", (self.width, self.height), self._front, "raw", "RGB", 0, 1)
+            if self.photo is None:
+                self.photo = ImageTk.PhotoImage(image=image)
+                self.label.config(image=self.photo, text="")
+                self.label.image = self.photo
+            else:
+                self.photo.paste(image)
+        return True
+
+    def clear(self):
+        """Forget the PhotoImage (e.g. when the camera stops); the next frame creates a new one."""
+        with self._lock:
+            self.photo = None
+            self._shown_seq = self._seq
+        self._next_at = 0.0
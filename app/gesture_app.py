@@ -1,15 +1,15 @@
 # gesture_app.py
 import tkinter as tk
-import cv2
 from PIL import Image, ImageTk, Image as PILImage
-import threading
 import queue
-import time
-import io
-import requests
 
-from app.dynamic_gestures.media_info import MediaInfo
-from app.dynamic_gestures.circle_visualizer import AudioRingVisualizer  # <-- import the module
+from media_info import MediaInfo
+from circle_visualizer import AudioRingVisualizer  # <-- import the module
+from album_art import AlbumArtCache
+from now_playing import NowPlayingTracker
+from camera_preview import CameraPreview
+from camera_hub import CameraHub
+from startup import timeline
 
 class HandGestureApp:
     def __init__(self, root):
@@ -24,16 +24,24 @@ class HandGestureApp:
         # --- Camera State ---
         self.camera_on = False
         self.camera_visible = False
-        self.cap = None
         # --- Smaller camera feed ---
         self.CAM_WIDTH = 640
         self.CAM_HEIGHT = 480
+        self.PREVIEW_FPS = 30
+        # opened once, shared by every frame consumer; at the resolution the preview always used
+        self.camera = CameraHub(0, width=self.CAM_WIDTH, height=self.CAM_HEIGHT)
+        self.preview_consumer = None
 
         # --- Media Info State ---
         self.media_info = MediaInfo()
         self.media_queue = queue.Queue()
-        self.media_poll_thread = None
-        self.polling_media = False
+        self.now_playing = NowPlayingTracker(self.media_info)
+        self.now_playing.subscribe(self.media_queue.put)
+        self.now_playing.subscribe(self._prefetch_next_album_art)
+        self.album_art = AlbumArtCache(size=(120, 120))
+        self.album_art_queue = queue.Queue()
+        self.album_art_key = None
+        self.prefetched_for = None
 
         # --- Top frame (camera/visualizer container) ---
         self.camera_frame = tk.Frame(self.root, width=self.CAM_WIDTH, height=self.CAM_HEIGHT, bg="#282828")
@@ -47,6 +55,7 @@ class HandGestureApp:
                                                  bg="black", fg="white")
         self.camera_placeholder_label.pack(expand=True)
         self.set_camera_placeholder("Press 'Start Camera' to begin")
+        self.preview = CameraPreview(self.camera_feed_label, self.CAM_WIDTH, self.CAM_HEIGHT, fps=self.PREVIEW_FPS)
 
         # --- Visualizer instance in the SAME area ---
         viz_size = min(self.CAM_WIDTH, self.CAM_HEIGHT)
@@ -127,6 +136,7 @@ class HandGestureApp:
         self.status_label.pack(pady=(0, 10))
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after(0, lambda: timeline.mark("window shown"))
 
     # ---------- Camera / Visualizer switching ----------
     def set_camera_placeholder(self, text):
@@ -142,16 +152,16 @@ class HandGestureApp:
             self.visualizer.stop()
             self.visualizer.hide()
 
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
+            self.camera.start()
+            if not self.camera.wait_open():
                 raise Exception("Cannot open webcam")
 
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.CAM_WIDTH)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.CAM_HEIGHT)
-
             self.camera_on = True
             self.camera_visible = True
-            
+            # Frames arrive on the camera's grab thread; the UI loop only shows the newest one.
+            # CameraPreview alone limits the rate: a second limit here would drift against it.
+            self.preview_consumer = self.camera.subscribe("preview", callback=self._on_preview_frame)
+
             self.camera_placeholder_label.pack_forget()
             self.camera_feed_label.pack(expand=True)
 
@@ -168,6 +178,7 @@ class HandGestureApp:
         except Exception as e:
             # If camera failed, fall back to visualizer
             self.show_status(f"Error: {e}", is_error=True)
+            self.camera.stop()
             self.camera_on = False
             self.camera_visible = False
             self.camera_feed_label.pack_forget()
@@ -178,10 +189,7 @@ class HandGestureApp:
         self.stop_media_polling()
         self.camera_on = False
         self.camera_visible = False
-
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self._release_camera()
 
         # Buttons
         self.stop_cam_btn.grid_forget()
@@ -222,26 +230,27 @@ class HandGestureApp:
             # self.set_camera_placeholder("Feed hidden. Gestures are still active.")
 
 
+    def _on_preview_frame(self, frame, seq, timestamp):
+        # Camera grab thread
+        if self.camera_visible:
+            self.preview.submit(frame)
+
+    def _release_camera(self):
+        if self.preview_consumer is not None:
+            self.preview_consumer.close()
+            self.preview_consumer = None
+        self.camera.stop()
+        self.preview.clear()
+
     def update_camera_feed(self):
         if not self.camera_on:
             return
 
         self.check_media_queue()
-        ret, frame = self.cap.read()
-
-        if ret and self.camera_visible:
-            if self.camera_visible:
-                # --- Resize frame to fit new CAM_WIDTH/HEIGHT ---
-                frame = cv2.resize(frame, (self.CAM_WIDTH, self.CAM_HEIGHT))
-                frame_flipped = cv2.flip(frame, 1)
-                cv_rgb = cv2.cvtColor(frame_flipped, cv2.COLOR_BGR2RGB)
-                
-                pil_img = Image.fromarray(cv_rgb)
-                img_tk = ImageTk.PhotoImage(image=pil_img)
-                self.camera_feed_label.config(image=img_tk, text="")
-                self.camera_feed_label.image = img_tk 
-
-        self.root.after(10, self.update_camera_feed)  # Loop
+        if self.camera_visible:
+            self.preview.show()
+
+        self.root.after(max(1, int(1000 / self.PREVIEW_FPS)), self.update_camera_feed)  # Loop
 
     def on_hand_symbol_detected(self, gesture):
         self.show_status(f"Gesture Detected: {gesture}")
@@ -249,38 +258,33 @@ class HandGestureApp:
 
     # ---------- Media polling ----------
     def start_media_polling(self):
-        if self.polling_media:
-            return
-        self.polling_media = True
-        self.media_poll_thread = threading.Thread(target=self._run_media_polling_loop, daemon=True)
-        self.media_poll_thread.start()
+        self.now_playing.start()
 
     def stop_media_polling(self):
-        if not self.polling_media:
-            return
-        self.polling_media = False
-        if self.media_poll_thread:
-            self.media_poll_thread.join(timeout=1.0)
-            self.media_poll_thread = None
-
-    def _run_media_polling_loop(self):
-        while self.polling_media:
-            try:
-                info = self.media_info.get()
-                self.media_queue.put(info)
-            except Exception as e:
-                print(f"Error in media info thread: {e}")
-                self.media_queue.put(None)
-            time.sleep(2)
+        self.now_playing.stop()
 
     def check_media_queue(self):
         try:
             while not self.media_queue.empty():
                 info = self.media_queue.get_nowait()
                 self.update_media_ui(info)
+            while not self.album_art_queue.empty():
+                key = self.album_art_queue.get_nowait()
+                if key == self.album_art_key:
+                    self.show_album_art(key)
         except queue.Empty:
             pass
 
+    def _prefetch_next_album_art(self, info):
+        # Runs on the now-playing thread, once per track change
+        track_id = info.get("track_id") if info else None
+        if track_id is None or track_id == self.prefetched_for:
+            return
+        self.prefetched_for = track_id
+        next_info = self.media_info.next_in_queue()
+        if next_info:
+            self.album_art.prefetch(next_info["album_art_url"], next_info["track_id"])
+
     def update_media_ui(self, info):
         # 1) Text labels
         if info and info.get('title'):
@@ -294,38 +298,27 @@ class HandGestureApp:
             self.song_title_label.config(text="No Media Playing")
             self.artist_label.config(text="---")
 
-        # --- 2. Update Album Art (Spotipy URL Method) ---
-        
+        # --- 2. Update Album Art (cached, loaded off the Tk thread) ---
         album_art_url = info.get("album_art_url") if info else None
-        
-        
-        if album_art_url:
-            try:
-                headers = {'User-Agent': 'Mozilla/5.0'}
-                response = requests.get(album_art_url, headers=headers, stream=True)
-                
-                if response.status_code != 200:
-                    raise Exception(f"Failed to download image: {response.status_code}")
-
-                image_bytes = response.raw.read()
-                image_stream = io.BytesIO(image_bytes)
-                pil_img = Image.open(image_stream)
-                
-                # --- Resize to new 120x120 size ---
-                pil_img = pil_img.resize((120, 120), Image.LANCZOS)
-                
-                img_tk = ImageTk.PhotoImage(image=pil_img)
-                
-                self.album_art_label.config(image=img_tk)
-                self.album_art_label.image = img_tk 
-                
-            except Exception as e:
-                print(f"Error processing thumbnail URL: {e}")
-                self.album_art_label.config(image=self.placeholder_img)
-                self.album_art_label.image = self.placeholder_img
-        else:
-            self.album_art_label.config(image=self.placeholder_img)
-            self.album_art_label.image = self.placeholder_img 
+        if not album_art_url:
+            self.album_art_key = None
+            self.show_album_art(None)
+            return
+
+        key = AlbumArtCache.key_for(album_art_url, info.get("track_id"))
+        if key == self.album_art_key:
+            return  # Same track, art is already shown or on its way
+        self.album_art_key = key
+        image = self.album_art.request(album_art_url, info.get("track_id"),
+                                       callback=lambda k, _img: self.album_art_queue.put(k))
+        self.show_album_art(key if image is not None else None)
+
+    def show_album_art(self, key):
+        img_tk = self.album_art.photo(key) if key is not None else None
+        if img_tk is None:
+            img_tk = self.placeholder_img
+        self.album_art_label.config(image=img_tk)
+        self.album_art_label.image = img_tk
 
 
     # ---------- Helpers ----------
@@ -337,9 +330,11 @@ class HandGestureApp:
         # Always clean up both camera and visualizer
 
         self.stop_media_polling()
+        self.album_art.shutdown()
         if self.camera_on:
+            self.camera_on = False
             try:
-                self.cap.release()
+                self._release_camera()
             except Exception:
                 pass
         self.root.destroy()
@@ -0,0 +1,112 @@
+import os
+import threading
+
+import requests
+import urllib3
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Load environment variables from .env
+load_dotenv()
+
+# Union of the scopes used by media_info.py and spotify_controller.py, so one client serves both
+SPOTIFY_SCOPE = (
+    "user-read-playback-state user-modify-playback-state user-read-currently-playing "
+    "user-library-modify user-library-read"
+)
+OAUTH_CACHE_PATH = ".spotipyoauthcache"
+
+POOL_SIZE = 10
+REQUEST_TIMEOUT = 5
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RETRY_MAX_SLEEP = 2.0  # seconds; longer Retry-After or backoff would stall the gesture/now-playing thread
+
+
+class _CappedRetry(Retry):
+    """Retry that never sleeps longer than RETRY_MAX_SLEEP, whatever Retry-After says."""
+
+    DEFAULT_BACKOFF_MAX = BACKOFF_MAX = RETRY_MAX_SLEEP  # urllib3 1.x reads the cap from the class
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, RETRY_MAX_SLEEP)
+
+
+_lock = threading.Lock()
+_session = None
+_spotify = None
+
+
+def get_session():
+    """
+    Return the process-wide requests.Session.
+
+    Connections to api.spotify.com, accounts.spotify.com and the image CDN are
+    pooled and kept alive, so only the first call to each host pays for the TLS
+    handshake. Idempotent requests are retried with exponential backoff on 429
+    and 5xx answers, honouring Retry-After up to RETRY_MAX_SLEEP per attempt. POST (next/previous track) is never
+    retried so a flaky answer cannot skip twice.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            # urllib3 2.x takes the backoff cap as an argument
+            capped = {"backoff_max": RETRY_MAX_SLEEP} if int(urllib3.__version__.split(".")[0]) >= 2 else {}
+            retry = _CappedRetry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUS,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+                **capped,
+            )
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers.update({"User-Agent": "Mozilla/5.0"})
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def get_spotify():
+    """Return the shared spotipy client. All Web API traffic goes through get_session()."""
+    global _spotify
+    # spotipy is only imported once a client is needed (off the UI thread at startup)
+    import spotipy
+    from spotipy.oauth2 import SpotifyOAuth
+
+    session = get_session()
+    with _lock:
+        if _spotify is None:
+            _spotify = spotipy.Spotify(
+                auth_manager=SpotifyOAuth(
+                    client_id=os.getenv("SPOTIPY_CLIENT_ID"),
+                    client_secret=os.getenv("SPOTIPY_CLIENT_SECRET"),
+                    redirect_uri=os.getenv("SPOTIPY_REDIRECT_URI"),
+                    scope=SPOTIFY_SCOPE,
+                    cache_path=OAUTH_CACHE_PATH,  # Saves the login
+                    requests_session=session,
+                ),
+                requests_session=session,
+                requests_timeout=REQUEST_TIMEOUT,
+            )
+        return _spotify
+
+
+def fetch_bytes(url, timeout=REQUEST_TIMEOUT):
+    """
+    Download `url` (e.g. album art) over the shared session.
+
+    Returns
+    -------
+    bytes
+        Response body.
+    """
+    response = get_session().get(url, timeout=timeout)
+    if response.status_code != 200:
+        raise Exception(f"Failed to download {url}: {response.status_code}")
+    return response.content
@@ -0,0 +1,265 @@
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def _worker_main(index, detection_model, classification_model, tasks, results, threads, warmup_hands):
+    """Worker process: owns its own ONNX sessions and reads frames straight from the shared ring."""
+    try:
+        from onnx_models import HandClassification, HandDetection
+
+        detector = HandDetection(detection_model, threads=threads)
+        classifier = HandClassification(classification_model, threads=threads)
+        if warmup_hands:
+            detector.warmup()
+            classifier.warmup(warmup_hands)
+    except Exception as e:
+        results.put(("failed", index, repr(e)))
+        return
+    results.put(("ready", index))
+
+    rings = {}  # shared memory name -> SharedMemory
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        seq, slot, shm_name, shape, classify = task
+        try:
+            shm = rings.get(shm_name)
+            if shm is None:
+                for old in rings.values():
+                    old.close()
+                rings = {shm_name: shared_memory.SharedMemory(name=shm_name)}
+                shm = rings[shm_name]
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * int(np.prod(shape)))
+            boxes, probs = detector(frame)
+            labels = classifier(frame, boxes) if classify and len(boxes) else None
+            del frame  # no views may outlive the mapping
+            results.put(("result", seq, index, boxes, probs, labels))
+        except Exception as e:
+            results.put(("error", seq, index, repr(e)))
+    for shm in rings.values():
+        shm.close()
+
+
+class InferencePool:
+    """
+    Hand detection and classification in worker processes, off the caller's GIL.
+
+    Each submitted frame is copied once into a slot of a shared-memory ring;
+    the worker reads it in place and sends back only the boxes, scores and
+    labels. Results come back in submission order. A worker that dies is
+    restarted; the frames it was holding are reported as failed (None).
+    Not thread-safe: submit and collect from one thread.
+
+    API:
+      pool = InferencePool("models/hand_detector.onnx", "models/crops_classifier.onnx", workers=2)
+      seq = pool.submit(frame, classify=True, data=timestamp)   # None when every slot is busy
+      for seq, output, data in pool.results(timeout=0.1):      # output: (boxes, probs, labels) or None
+          ...
+      pool.close()
+    """
+
+    START_TIMEOUT = 60.0      # seconds to wait for every worker to load its models
+    RESTART_LIMIT = 5         # give up after this many restarts within RESTART_WINDOW
+    RESTART_WINDOW = 60.0
+
+    def __init__(self, detection_model, classification_model, workers=2, slots=None, warmup_hands=4, threads=None):
+        """
+        Parameters
+        ----------
+        detection_model : str
+            Path to detection model.
+        classification_model : str
+            Path to classification model.
+        workers : int
+            Number of worker processes.
+        slots : int
+            Frames that can be in flight at once; defaults to two per worker.
+        warmup_hands : int
+            Passed to each worker's warm-up (see MainController.warmup).
+        threads : int
+            ONNX Runtime intra-op threads per worker; defaults to an even share of the CPUs.
+        """
+        self.model_paths = (detection_model, classification_model)
+        self.num_workers = int(workers)
+        self.slots = int(slots or 2 * self.num_workers)
+        self.warmup_hands = warmup_hands
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.num_workers)
+        # Workers are spawned, not forked: the parent runs Tk, camera and audio threads
+        self._ctx = mp.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._workers = [None] * self.num_workers  # (process, task queue)
+        self._restarts = []  # times of recent restarts
+        self._shm = None
+        self._ring = None
+        self._shape = None
+        self._free = list(range(self.slots))
+        self._inflight = {}  # seq -> (slot, worker, data)
+        self._done = {}  # seq -> (output or None, data)
+        self._next_seq = 0
+        self._next_out = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        for i in range(self.num_workers):
+            self._start_worker(i)
+        self._wait_ready()
+
+    # ---------- Public API ----------
+    def submit(self, frame, classify=True, data=None):
+        """Queue a uint8 frame for inference; returns its sequence number, or None if the pool is full."""
+        self._collect(0)
+        self._check_workers()
+        if not self._ensure_ring(frame.shape) or not self._free:
+            self.dropped += 1
+            return None
+        slot = self._free.pop()
+        np.copyto(self._ring[slot], frame)
+        worker = min(range(self.num_workers), key=self._load)
+        seq = self._next_seq
+        self._next_seq += 1
+        self._inflight[seq] = (slot, worker, data)
+        self._workers[worker][1].put((seq, slot, self._shm.name, self._shape, classify))
+        return seq
+
+    def results(self, timeout=0.0):
+        """Yield (seq, output, data) for finished frames, in submission order; waits up to `timeout` for the first."""
+        self._collect(timeout)
+        self._check_workers()
+        while self._next_out in self._done:
+            seq = self._next_out
+            self._next_out += 1  # before yielding, so a caller may stop iterating at any point
+            output, data = self._done.pop(seq)
+            yield seq, output, data
+
+    @property
+    def pending(self):
+        return len(self._inflight) + len(self._done)
+
+    def close(self):
+        for process, tasks in filter(None, self._workers):
+            tasks.put(None)
+        for process, tasks in filter(None, self._workers):
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._workers = [None] * self.num_workers
+        self._release_ring()
+
+    def metrics(self):
+        return {
+            "workers": self.num_workers,
+            "in_flight": len(self._inflight),
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "restarts": len(self._restarts),
+        }
+
+    # ---------- Workers ----------
+    def _start_worker(self, index):
+        tasks = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, *self.model_paths, tasks, self._results, self.threads, self.warmup_hands),
+            name=f"inference-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._workers[index] = (process, tasks)
+
+    def _wait_ready(self):
+        waiting = set(range(self.num_workers))
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while waiting:
+            try:
+                message = self._results.get(timeout=0.5)
+            except queue.Empty:
+                dead = [i for i in waiting if not self._workers[i][0].is_alive()]
+                if dead or time.monotonic() > deadline:
+                    reason = f"exited (code {self._workers[dead[0]][0].exitcode})" if dead else f"did not start in {self.START_TIMEOUT:.0f} s"
+                    self.close()
+                    raise RuntimeError(f"Inference workers {sorted(dead or waiting)} {reason}")
+                continue
+            if message[0] == "failed":
+                self.close()
+                raise RuntimeError(f"Inference worker {message[1]} failed to load models: {message[2]}")
+            if message[0] == "ready":
+                waiting.discard(message[1])
+
+    def _load(self, worker):
+        return sum(1 for _, w, _ in self._inflight.values() if w == worker)
+
+    def _check_workers(self):
+        for i, (process, tasks) in enumerate(self._workers):
+            if process.is_alive():
+                continue
+            now = time.monotonic()
+            self._restarts = [t for t in self._restarts if now - t < self.RESTART_WINDOW] + [now]
+            lost = [seq for seq, (_, worker, _) in self._inflight.items() if worker == i]
+            print(f"Inference worker {i} exited (code {process.exitcode}); restarting, {len(lost)} frame(s) lost")
+            for seq in lost:
+                self._finish(seq, None)
+            if len(self._restarts) > self.RESTART_LIMIT:
+                raise RuntimeError(f"Inference workers restarted {len(self._restarts)} times in {self.RESTART_WINDOW:.0f} s")
+            self._start_worker(i)
+
+    def _collect(self, timeout):
+        """Move every available worker message into _done; block up to `timeout` for the first one."""
+        block = timeout > 0 and bool(self._inflight)
+        while True:
+            try:
+                message = self._results.get(timeout=timeout) if block else self._results.get_nowait()
+            except queue.Empty:
+                return
+            block = False
+            kind = message[0]
+            if kind == "result":
+                _, seq, _, boxes, probs, labels = message
+                self._finish(seq, (boxes, probs, labels))
+            elif kind == "error":
+                _, seq, worker, error = message
+                print(f"Inference worker {worker} failed on frame {seq}: {error}")
+                self._finish(seq, None)
+            elif kind == "failed":
+                print(f"Inference worker {message[1]} failed to restart: {message[2]}")
+
+    def _finish(self, seq, output):
+        entry = self._inflight.pop(seq, None)
+        if entry is None:
+            return  # already reported lost
+        slot, _, data = entry
+        self._free.append(slot)
+        self._done[seq] = (output, data)
+        if output is None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    # ---------- Shared frame ring ----------
+    def _ensure_ring(self, shape):
+        shape = tuple(shape)
+        if shape == self._shape:
+            return True
+        if self._inflight:
+            return False  # frame size changed; wait for the old ring to drain
+        self._release_ring()
+        nbytes = int(np.prod(shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * nbytes)
+        self._ring = np.ndarray((self.slots, *shape), dtype=np.uint8, buffer=self._shm.buf)
+        self._shape = shape
+        return True
+
+    def _release_ring(self):
+        if self._shm is None:
+            return
+        self._ring = None  # drop the view before closing the mapping
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+        self._shape = None
@@ -1,3 +1,6 @@
+import time
+from collections import deque
+
 import numpy as np
 import sys, os
 sys.path.append(os.path.dirname(__file__))
@@ -13,8 +16,9 @@ from ocsort import (
     iou_batch,
     linear_assignment,
 )
-from onnx_models import HandClassification, HandDetection
-from utils import Deque, Drawer, Hand
+from ocsort import kernels
+from inference_pool import InferencePool
+from utils import Deque, Drawer
 
 ASSO_FUNCS = {"iou": iou_batch, "giou": giou_batch, "ciou": ciou_batch, "diou": diou_batch, "ct_dist": ct_dist}
 
@@ -33,17 +37,26 @@ def k_previous_obs(observations, cur_age, k):
 class MainController:
     """
     Main tracking function.
-    Class contains a list of tracks, each track contains a KalmanBoxTracker object and a Deque object with Hand objects.
+    Class contains a list of tracks, each track contains a KalmanBoxTracker object and a Deque holding its hand history.
     """
 
     def __init__(
-        self, detection_model, classification_model, max_age=30, min_hits=3, iou_threshold=0.3, maxlen=30, min_frames=20
+        self,
+        detection_model,
+        classification_model,
+        max_age=30,
+        min_hits=3,
+        iou_threshold=0.3,
+        maxlen=30,
+        min_frames=20,
+        warmup_hands=4,
+        inference_workers=0,
     ):
         """
         Parameters
         ----------
         detection_model : str
-            Path to detection model.
+            Path to detection model; None builds a tracker-only controller without models.
         classification_model : str
             Path to classification model.
         max_age : int
@@ -53,9 +66,16 @@ class MainController:
         iou_threshold : float
             IOU threshold for track association.
         maxlen : int
-            Maximum length of deque in track.
+            Gesture history window of each track, in frames at 30 FPS (kept as a time window).
         min_frames : int
-            Minimum number of frames to confirm track.
+            Default minimum gesture duration, in frames at 30 FPS (checked in milliseconds).
+        warmup_hands : int
+            Warm up the detector and every classifier batch shape for up to this many hands
+            at construction, so neither the first frame nor the first extra hand stalls; this also
+            compiles the tracker kernels when numba is the kernel backend. 0 skips it.
+        inference_workers : int
+            Run detection and classification in this many worker processes (see InferencePool)
+            instead of in this process. 0 keeps them in-process.
         """
         self.maxlen = maxlen
         self.min_frames = min_frames
@@ -67,11 +87,36 @@ class MainController:
         self.asso_func = ASSO_FUNCS["giou"]
         self.tracks = []
         self.frame_count = 0
+        self.drawer = Drawer()
+        self.recorder = None  # SessionRecorder; gets every frame update() sees
+        self.last_detection_at = None  # timestamp of the last frame update() got detections for
+        self._ready = deque()  # in-process results waiting for results()
+        if warmup_hands:
+            kernels.warmup()  # compile (or load from numba's cache) the tracker kernels before the first frame
+        if inference_workers:
+            self.detection_model = self.classification_model = None
+            self.pool = InferencePool(
+                detection_model, classification_model, workers=inference_workers, warmup_hands=warmup_hands
+            )
+            return
+        self.pool = None
+        if detection_model is None:
+            # tracking only: detections are fed to update() directly (see replay.py)
+            self.detection_model = self.classification_model = None
+            return
+        from onnx_models import HandClassification, HandDetection
+
         self.detection_model = HandDetection(detection_model)
         self.classification_model = HandClassification(classification_model)
-        self.drawer = Drawer()
+        if warmup_hands:
+            self.warmup(warmup_hands)
+
+    def warmup(self, max_hands):
+        """Run dummy inferences for the detector input and classifier batches of 1..max_hands."""
+        self.detection_model.warmup()
+        self.classification_model.warmup(max_hands)
 
-    def update(self, dets=np.empty((0, 5)), labels=None):
+    def update(self, dets=np.empty((0, 5)), labels=None, timestamp=None):
         """
         Parameters
         ----------
@@ -80,6 +125,10 @@ class MainController:
             Requires: this method must be called once for each frame even with empty detections (use np.empty((0, 5)) for frames without detections).
         labels : np.array
             Labels with shape (N, 1) where N is number of bounding boxes.
+            None keeps each matched track's last gesture (frames where the classifier was skipped).
+        timestamp : float
+            Capture time of the frame in seconds (time.monotonic()); gesture durations are measured on it.
+            Defaults to now.
 
         Returns
         -------
@@ -89,28 +138,27 @@ class MainController:
         Notes
         -----
         The number of objects returned may differ from the number of detections provided.
+        A frame without detections returns None; its tracks are still predicted, aged and
+        dropped after max_age frames, as on any frame where they go undetected.
 
         """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.frame_count += 1
+        trks = self._predict()
         if len(dets) == 0:
+            # nothing to associate: every track misses
             for trk in self.tracks:
-                trk["hands"].append(Hand(bbox=None, gesture=None))
+                self._miss(trk, timestamp)
+            self._prune()
+            if self.recorder is not None:
+                self.recorder.record_frame(timestamp, dets, labels, self.tracks)
             return
 
-        self.frame_count += 1
-
-        # get predicted locations from existing trackers.
-        trks = np.zeros((len(self.tracks), 5))
-        to_del = []
+        self.last_detection_at = timestamp
         ret = []
         lbs = []
-        for t, trk in enumerate(trks):
-            pos = self.tracks[t]["tracker"].predict()[0]
-            trk[:] = [pos[0], pos[1], pos[2], pos[3], 0]
-            if np.any(np.isnan(pos)):
-                to_del.append(t)
-        trks = np.ma.compress_rows(np.ma.masked_invalid(trks))
-        for t in reversed(to_del):
-            self.tracks.pop(t)
+        events = []  # (track id, Event) emitted on this frame, for the recorder
 
         velocities = np.array(
             [
@@ -132,7 +180,10 @@ class MainController:
 
         for m in matched:
             self.tracks[m[1]]["tracker"].update(dets[m[0], :])
-            self.tracks[m[1]]["hands"].append(Hand(bbox=dets[m[0], :4], gesture=labels[m[0]]))
+            hands = self.tracks[m[1]]["hands"]
+            gesture = labels[m[0]] if labels is not None else hands.last_gesture
+            if hands.append_observation(dets[m[0], :4], gesture, timestamp):
+                events.append((self.tracks[m[1]]["tracker"].id + 1, hands.action))
 
         """
             Second round of associaton by OCR
@@ -156,15 +207,17 @@ class MainController:
                     if iou_left[m[0], m[1]] < self.iou_threshold:
                         continue
                     self.tracks[trk_ind]["tracker"].update(dets[det_ind, :])
-                    self.tracks[trk_ind]["hands"].append(Hand(bbox=dets[det_ind, :4], gesture=labels[det_ind]))
+                    hands = self.tracks[trk_ind]["hands"]
+                    gesture = labels[det_ind] if labels is not None else hands.last_gesture
+                    if hands.append_observation(dets[det_ind, :4], gesture, timestamp):
+                        events.append((self.tracks[trk_ind]["tracker"].id + 1, hands.action))
                     to_remove_det_indices.append(det_ind)
                     to_remove_trk_indices.append(trk_ind)
                 unmatched_dets = np.setdiff1d(unmatched_dets, np.array(to_remove_det_indices))
                 unmatched_trks = np.setdiff1d(unmatched_trks, np.array(to_remove_trk_indices))
 
         for m in unmatched_trks:
-            self.tracks[m]["tracker"].update(None)
-            self.tracks[m]["hands"].append(Hand(bbox=None, gesture=None))
+            self._miss(self.tracks[m], timestamp)
 
         # create and initialise new trackers for unmatched detections
         for i in unmatched_dets:
@@ -174,7 +227,6 @@ class MainController:
                     "tracker": KalmanBoxTracker(dets[i, :], delta_t=self.delta_t),
                 }
             )
-        i = len(self.tracks)
         for trk in reversed(self.tracks):
             if trk["tracker"].last_observation.sum() < 0:
                 d = trk["tracker"].get_state()[0]
@@ -193,21 +245,49 @@ class MainController:
                     lbs.append(trk["hands"][-1].gesture)
                 else:
                     lbs.append(None)
-
-            i -= 1
-            # remove dead tracklet
-            if trk["tracker"].time_since_update > self.max_age:
-                self.tracks.pop(i)
+        self._prune()
+        if self.recorder is not None:
+            self.recorder.record_frame(timestamp, dets, labels, self.tracks, events)
         if len(ret) > 0:
             return np.concatenate(ret), lbs
         return np.empty((0, 5)), np.empty((0, 1))
 
-    def __call__(self, frame):
+    def _predict(self):
+        """Advance every track one frame and drop those whose prediction is invalid; returns [[x1,y1,x2,y2,0],...]."""
+        boxes = KalmanBoxTracker.predict_many([trk["tracker"] for trk in self.tracks])
+        invalid = np.isnan(boxes).any(axis=1)
+        for t in reversed(np.flatnonzero(invalid).tolist()):
+            self.tracks.pop(t)
+        return np.column_stack((boxes[~invalid], np.zeros(len(self.tracks))))
+
+    @staticmethod
+    def _miss(trk, timestamp):
+        """
+        Record a frame on which the track was not detected.
+
+        Only the first missed frame of a gap goes into the gesture history. A miss has no
+        gesture or position, so no rule reads it; one row marks the gap as well as a row per
+        frame, and a track that stays lost until max_age adds nothing per frame.
+        """
+        trk["tracker"].update(None)
+        if trk["tracker"].time_since_update == 1:
+            trk["hands"].append_observation(None, timestamp=timestamp)
+
+    def _prune(self):
+        """Remove dead tracklets: tracks not updated for more than max_age frames."""
+        self.tracks[:] = [trk for trk in self.tracks if trk["tracker"].time_since_update <= self.max_age]
+
+    def __call__(self, frame, timestamp=None, classify=True):
         """
         Parameters
         ----------
         frame : np.array
             Image frame with shape (H, W, 3).
+        timestamp : float
+            Capture time of the frame (time.monotonic()), e.g. from CameraConsumer.read. Defaults to now.
+        classify : bool
+            Run the gesture classifier; False tracks the hands and keeps their last gestures
+            (see QualityGovernor).
 
         Returns
         -------
@@ -215,12 +295,88 @@ class MainController:
 
 
         """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self.pool is None:
+            return self._track(*self._infer(frame, classify), timestamp)
+        # Worker processes: wait for this frame; frames submitted earlier are tracked on the way
+        seq = self.pool.submit(frame, classify, timestamp)
+        while seq is None:
+            for _ in self._completed(timeout=0.1):
+                pass
+            seq = self.pool.submit(frame, classify, timestamp)
+        while True:
+            for done_seq, result in self._completed(timeout=0.1):
+                if done_seq == seq:
+                    return result[:3] if result is not None else (None, None, None)
+
+    def submit(self, frame, timestamp=None, classify=True):
+        """
+        Queue a frame for results(); with inference workers the caller does not wait for the models.
+
+        Returns
+        -------
+        bool
+            False if every inference slot is busy and the frame was dropped.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self.pool is None:
+            self._ready.append(self._track(*self._infer(frame, classify), timestamp) + (timestamp,))
+            return True
+        return self.pool.submit(frame, classify, timestamp) is not None
+
+    def results(self, timeout=0.0):
+        """
+        Yield (bboxes, ids, labels, timestamp) for submitted frames that finished, oldest first.
+        The tracker is updated in submission order; frames a crashed worker lost are skipped.
+        """
+        while self._ready:
+            yield self._ready.popleft()
+        if self.pool is not None:
+            for _, result in self._completed(timeout):
+                if result is not None:
+                    yield result
+
+    def reset(self, timeout=2.0):
+        """
+        Forget every track, e.g. before a new gesture session; the models (and worker processes) stay loaded.
+
+        Frames of the previous session still in the workers are waited for (up to `timeout`
+        seconds) and dropped, so they are not tracked into the new one.
+        """
+        if self.pool is not None:
+            deadline = time.monotonic() + timeout
+            while self.pool.pending and time.monotonic() < deadline:
+                for _ in self.pool.results(timeout=0.1):
+                    pass
+        self._ready.clear()
+        self.tracks = []
+        self.frame_count = 0
+        self.last_detection_at = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+    def _completed(self, timeout):
+        for seq, output, timestamp in self.pool.results(timeout):
+            if output is None:
+                yield seq, None
+                continue
+            bboxes, probs, labels = output
+            yield seq, self._track(bboxes, probs, labels, timestamp) + (timestamp,)
+
+    def _infer(self, frame, classify):
         bboxes, probs = self.detection_model(frame)
+        labels = self.classification_model(frame, bboxes) if classify and len(bboxes) else None
+        return bboxes, probs, labels
+
+    def _track(self, bboxes, probs, labels, timestamp):
         if len(bboxes):
-            labels = self.classification_model(frame, bboxes)
             bboxes = np.concatenate((bboxes, np.expand_dims(probs, axis=1)), axis=1)
-            new_bboxes, labels = self.update(dets=bboxes, labels=labels)
+            new_bboxes, labels = self.update(dets=bboxes, labels=labels, timestamp=timestamp)
             return new_bboxes[:, :-1], new_bboxes[:, -1], labels
         else:
-            self.update(np.empty((0, 5)), None)
+            self.update(np.empty((0, 5)), None, timestamp)
             return None, None, None
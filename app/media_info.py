@@ -1,9 +1,13 @@
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
 from typing import Optional
 import os
+from concurrent.futures import wait
 from dotenv import load_dotenv
 
+from http_session import get_spotify
+from startup import run_in_background
+
+LOGIN_WAIT = 10.0  # seconds a media query waits for the background login
+
 # Load the .env file
 load_dotenv()
 
@@ -16,34 +20,42 @@ class MediaInfo:
         REDIRECT_URI = os.getenv("SPOTIPY_REDIRECT_URI")
         
         self.sp = None
+        self.login = None
         if CLIENT_ID and CLIENT_SECRET and REDIRECT_URI:
-            try:
-                # This scope is all we need to read the current song
-                scope = "user-read-currently-playing user-library-modify user-library-read"
-                
-                # This is the user login flow.
-                # It will open a browser the first time.
-                self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-                    client_id=CLIENT_ID,
-                    client_secret=CLIENT_SECRET,
-                    redirect_uri=REDIRECT_URI,
-                    scope=scope,
-                    cache_path=".spotipyoauthcache" # Saves the login
-                ))
-                # Test the login
-                self.sp.me() 
-                print("Spotipy (User Login) initialized successfully.")
-            except Exception as e:
-                print(f"Error initializing Spotipy: {e}")
-                print("Make sure you have a .env file with all three keys.")
-                print("You may need to run the app once and log in via your browser.")
+            # Login and its test request run off the UI thread; callers wait in wait_ready()
+            self.login = run_in_background("spotify login", self._login)
         else:
             print("Spotify .env keys not found. Media info will not be available.")
-            
 
-    def get(self) -> Optional[dict]:
-        """Return a dict with all current session info, or None if no session."""
-        if not self.sp:
+    def _login(self):
+        try:
+            # This is the user login flow.
+            # It will open a browser the first time.
+            # The client (and its pooled HTTP session) is shared with spotify_controller.
+            sp = get_spotify()
+            # Test the login
+            sp.me()
+            self.sp = sp
+            print("Spotipy (User Login) initialized successfully.")
+        except Exception as e:
+            print(f"Error initializing Spotipy: {e}")
+            print("Make sure you have a .env file with all three keys.")
+            print("You may need to run the app once and log in via your browser.")
+        return self.sp
+
+    def wait_ready(self, timeout=LOGIN_WAIT):
+        """Wait (off the UI thread) for the background login; returns the client or None."""
+        if self.login is not None:
+            wait([self.login], timeout)
+        return self.sp
+
+    def get(self, raise_errors=False) -> Optional[dict]:
+        """
+        Return a dict with all current session info, or None if no session.
+        With raise_errors, a failed API call raises instead of returning None,
+        so the caller can tell it apart from nothing playing.
+        """
+        if not self.wait_ready():
             return None # Spotipy failed to initialize
 
         try:
@@ -79,11 +91,33 @@ class MediaInfo:
                 "collected_utc": None,
             }
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error in MediaInfo.get(): {e}")
             return None
         
+    def next_in_queue(self) -> Optional[dict]:
+        """Return track_id and album_art_url of the next queued track, or None."""
+        if not self.wait_ready():
+            return None
+
+        try:
+            queue = self.sp.queue().get("queue") or []
+            if not queue or not queue[0] or "album" not in queue[0]:
+                return None # Empty queue or an episode
+
+            item = queue[0]
+            images = item["album"]["images"]
+            return {
+                "track_id": item.get("id"),
+                "album_art_url": images[0]["url"] if images else None,
+            }
+        except Exception as e:
+            print(f"Error in MediaInfo.next_in_queue(): {e}")
+            return None
+
     def like_current_song(self):
-        if not self.sp:
+        if not self.wait_ready():
             print("Spotify not intialized")
             return False
         
@@ -0,0 +1,154 @@
+import threading
+import time
+
+
+class NowPlayingTracker:
+    """
+    Adaptive replacement for polling MediaInfo.get() every 2 seconds.
+
+    While a track plays, the next poll is scheduled just after its predicted end
+    (from position_seconds/duration_seconds), capped so changes made on another
+    device are still seen. While paused or idle the interval doubles up to
+    MAX_IDLE_INTERVAL; that backoff only follows answers saying nothing plays.
+    A failed call keeps the last known state and is retried after
+    ERROR_RETRY_INTERVAL, so a network blip does not hide track changes.
+    poke() asks for a quick poll, e.g. right after a gesture skipped the
+    track. Subscribers are only called when what the UI shows changes.
+
+    API:
+      t = NowPlayingTracker(media_info)
+      t.subscribe(callback)   # callback(info) runs on the tracker thread
+      t.start(); t.poke(); t.stop()
+    """
+
+    MIN_INTERVAL = 0.5
+    MAX_PLAYING_INTERVAL = 15.0
+    IDLE_INTERVAL = 2.0
+    MAX_IDLE_INTERVAL = 30.0
+    END_MARGIN = 0.75  # poll this long after the predicted end of the track
+    POKE_DELAY = 0.4  # Spotify needs a moment to apply a command
+    POKE_RETRIES = 2  # quick follow-up polls if the command is not visible yet
+    POKE_RETRY_INTERVAL = 1.0
+    ERROR_RETRY_INTERVAL = 2.0  # after a failed call, whatever was playing
+
+    def __init__(self, media_info):
+        self.media_info = media_info
+        self.subscribers = []
+        self.info = None
+        self.fetched_at = None
+        self.polls = 0
+        self._idle_interval = self.IDLE_INTERVAL
+        self._poke_at = None
+        self._poke_retries = 0
+        self._published = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.running = False
+
+    # ---------- Public API ----------
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+        return callback
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def poke(self, delay=None):
+        """Poll soon, e.g. after a play/pause/skip was sent."""
+        delay = self.POKE_DELAY if delay is None else delay
+        with self._lock:
+            self._poke_at = time.monotonic() + delay
+            self._poke_retries = self.POKE_RETRIES
+        self._wake.set()
+
+    def position(self):
+        """Current playback position in seconds, extrapolated from the last poll."""
+        info = self.info
+        if not info:
+            return None
+        position = info.get("position_seconds") or 0.0
+        if self._is_playing(info):
+            position += time.monotonic() - self.fetched_at
+        return min(position, info.get("duration_seconds") or position)
+
+    # ---------- Core ----------
+    def _run(self):
+        while self.running:
+            previous = self.info
+            self.polls += 1
+            try:
+                info = self.media_info.get(raise_errors=True)
+            except Exception as e:
+                # keep the last known state (and position extrapolation); not a reason to back off
+                print(f"Error in media info thread: {e}")
+                self._sleep(self.ERROR_RETRY_INTERVAL)
+                continue
+            self.info, self.fetched_at = info, time.monotonic()
+
+            changed = not self._published or self._key(previous) != self._key(info)
+            if changed:
+                self._published = True
+                for callback in self.subscribers:
+                    try:
+                        callback(info)
+                    except Exception as e:
+                        print(f"Error in now-playing subscriber: {e}")
+
+            self._sleep(self._next_delay(info, changed))
+
+    def _next_delay(self, info, changed):
+        with self._lock:
+            if self._poke_retries > 0:
+                if changed:
+                    self._poke_retries = 0
+                else:
+                    self._poke_retries -= 1
+                    return self.POKE_RETRY_INTERVAL
+
+        if not self._is_playing(info):
+            delay = self._idle_interval
+            self._idle_interval = min(self._idle_interval * 2, self.MAX_IDLE_INTERVAL)
+            return delay
+
+        self._idle_interval = self.IDLE_INTERVAL
+        remaining = (info.get("duration_seconds") or 0.0) - (info.get("position_seconds") or 0.0)
+        return min(max(remaining + self.END_MARGIN, self.MIN_INTERVAL), self.MAX_PLAYING_INTERVAL)
+
+    def _sleep(self, delay):
+        deadline = time.monotonic() + delay
+        while self.running:
+            with self._lock:
+                if self._poke_at is not None:
+                    deadline = min(deadline, self._poke_at)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._wake.wait(remaining)
+            self._wake.clear()
+        with self._lock:
+            self._poke_at = None
+
+    @staticmethod
+    def _is_playing(info):
+        return bool(info) and info.get("status") == "PlaybackStatus.PLAYING"
+
+    @staticmethod
+    def _key(info):
+        # Everything the UI shows; position alone is not a change.
+        if not info:
+            return None
+        return info.get("track_id"), info.get("title"), info.get("artist"), info.get("album_art_url"), info.get("status")
@@ -1,5 +1,16 @@
 import numpy as np
 
+from . import kernels
+
+
+def _f8(a):
+    """
+    C-contiguous float64 view or copy of a, the one input type the kernels are compiled for
+    by kernels.warmup(). Track placeholders ([-1, ...] observations, (0, 0) velocities) are
+    int arrays, and numba would compile a new version for them while the camera runs.
+    """
+    return np.ascontiguousarray(a, dtype=np.float64)
+
 
 def iou_batch(bboxes1, bboxes2):
     """
@@ -16,6 +27,8 @@ def iou_batch(bboxes1, bboxes2):
     ious: numpy.ndarray
         shape is [N, M]
     """
+    if kernels.enabled:
+        return kernels.iou_batch(_f8(bboxes1), _f8(bboxes2))
     bboxes2 = np.expand_dims(bboxes2, 0)
     bboxes1 = np.expand_dims(bboxes1, 1)
 
@@ -50,6 +63,8 @@ def giou_batch(bboxes1, bboxes2):
         shape is [N, M]
     """
     # for details should go to https://arxiv.org/pdf/1902.09630.pdf
+    if kernels.enabled:
+        return kernels.giou_batch(_f8(bboxes1), _f8(bboxes2))
     # ensure predict's bbox form
     bboxes2 = np.expand_dims(bboxes2, 0)
     bboxes1 = np.expand_dims(bboxes1, 1)
@@ -262,6 +277,46 @@ def speed_direction_batch(dets, tracks):
     return dy, dx  # size: num_track x num_det
 
 
+def velocity_direction_cost(detections, previous_obs, velocities, vdc_weight):
+    """
+    Calculate the velocity direction consistency cost of matching detections to tracks.
+    Parameters
+    ----------
+    detections: numpy.ndarray
+        shape is [N, 5], the last column is the score
+    previous_obs: numpy.ndarray
+        shape is [M, 5], a negative last column means the track has no previous observation
+    velocities: numpy.ndarray
+        shape is [M, 2], (dy, dx) unit direction of each track
+    vdc_weight: float
+
+    Returns
+    -------
+    angle_diff_cost: numpy.ndarray
+        shape is [N, M]
+    """
+    if kernels.enabled:
+        return kernels.angle_diff_cost(_f8(detections), _f8(previous_obs), _f8(velocities), float(vdc_weight))
+    Y, X = speed_direction_batch(detections, previous_obs)
+    inertia_Y, inertia_X = velocities[:, 0], velocities[:, 1]
+    inertia_Y = np.repeat(inertia_Y[:, np.newaxis], Y.shape[1], axis=1)
+    inertia_X = np.repeat(inertia_X[:, np.newaxis], X.shape[1], axis=1)
+    diff_angle_cos = inertia_X * X + inertia_Y * Y
+    diff_angle_cos = np.clip(diff_angle_cos, a_min=-1, a_max=1)
+    diff_angle = np.arccos(diff_angle_cos)
+    diff_angle = (np.pi / 2.0 - np.abs(diff_angle)) / np.pi
+
+    valid_mask = np.ones(previous_obs.shape[0])
+    valid_mask[np.where(previous_obs[:, 4] < 0)] = 0
+
+    scores = np.repeat(detections[:, -1][:, np.newaxis], previous_obs.shape[0], axis=1)
+    valid_mask = np.repeat(valid_mask[:, np.newaxis], X.shape[1], axis=1)
+
+    angle_diff_cost = (valid_mask * diff_angle) * vdc_weight
+    angle_diff_cost = angle_diff_cost.T
+    return angle_diff_cost * scores
+
+
 def linear_assignment(cost_matrix):
     """
     Solve the linear assignment problem using scipy.optimize.linear_sum_assignment.
@@ -363,26 +418,9 @@ def associate(detections, trackers, iou_threshold, velocities, previous_obs, vdc
     if len(trackers) == 0:
         return np.empty((0, 2), dtype=int), np.arange(len(detections)), np.empty((0, 5), dtype=int)
 
-    Y, X = speed_direction_batch(detections, previous_obs)
-    inertia_Y, inertia_X = velocities[:, 0], velocities[:, 1]
-    inertia_Y = np.repeat(inertia_Y[:, np.newaxis], Y.shape[1], axis=1)
-    inertia_X = np.repeat(inertia_X[:, np.newaxis], X.shape[1], axis=1)
-    diff_angle_cos = inertia_X * X + inertia_Y * Y
-    diff_angle_cos = np.clip(diff_angle_cos, a_min=-1, a_max=1)
-    diff_angle = np.arccos(diff_angle_cos)
-    diff_angle = (np.pi / 2.0 - np.abs(diff_angle)) / np.pi
-
-    valid_mask = np.ones(previous_obs.shape[0])
-    valid_mask[np.where(previous_obs[:, 4] < 0)] = 0
-
     iou_matrix = iou_batch(detections, trackers)
-    scores = np.repeat(detections[:, -1][:, np.newaxis], trackers.shape[0], axis=1)
     # iou_matrix = iou_matrix * scores # a trick sometiems works, we don't encourage this
-    valid_mask = np.repeat(valid_mask[:, np.newaxis], X.shape[1], axis=1)
-
-    angle_diff_cost = (valid_mask * diff_angle) * vdc_weight
-    angle_diff_cost = angle_diff_cost.T
-    angle_diff_cost = angle_diff_cost * scores
+    angle_diff_cost = velocity_direction_cost(detections, previous_obs, velocities, vdc_weight)
 
     if min(iou_matrix.shape) > 0:
         a = (iou_matrix > iou_threshold).astype(np.int32)
@@ -391,31 +429,20 @@ def associate(detections, trackers, iou_threshold, velocities, previous_obs, vdc
         else:
             matched_indices = linear_assignment(-(iou_matrix + angle_diff_cost))
     else:
-        matched_indices = np.empty(shape=(0, 2))
-
-    unmatched_detections = []
-    for d, det in enumerate(detections):
-        if d not in matched_indices[:, 0]:
-            unmatched_detections.append(d)
-    unmatched_trackers = []
-    for t, trk in enumerate(trackers):
-        if t not in matched_indices[:, 1]:
-            unmatched_trackers.append(t)
-
-    # filter out matched with low IOU
-    matches = []
-    for m in matched_indices:
-        if iou_matrix[m[0], m[1]] < iou_threshold:
-            unmatched_detections.append(m[0])
-            unmatched_trackers.append(m[1])
-        else:
-            matches.append(m.reshape(1, 2))
-    if len(matches) == 0:
-        matches = np.empty((0, 2), dtype=int)
-    else:
-        matches = np.concatenate(matches, axis=0)
-
-    return matches, np.array(unmatched_detections), np.array(unmatched_trackers)
+        matched_indices = np.empty(shape=(0, 2), dtype=int)
+
+    # unmatched in index order, then matches rejected for low IOU in match order
+    matched_indices = matched_indices.astype(int, copy=False)
+    low = iou_matrix[matched_indices[:, 0], matched_indices[:, 1]] < iou_threshold
+    unmatched_detections = np.ones(len(detections), dtype=bool)
+    unmatched_detections[matched_indices[:, 0]] = False
+    unmatched_trackers = np.ones(len(trackers), dtype=bool)
+    unmatched_trackers[matched_indices[:, 1]] = False
+    unmatched_detections = np.concatenate((np.flatnonzero(unmatched_detections), matched_indices[low, 0]))
+    unmatched_trackers = np.concatenate((np.flatnonzero(unmatched_trackers), matched_indices[low, 1]))
+    matches = matched_indices[~low]
+
+    return matches, unmatched_detections, unmatched_trackers
 
 
 def associate_kitti(detections, trackers, det_cates, iou_threshold, velocities, previous_obs, vdc_weight):
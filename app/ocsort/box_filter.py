@@ -0,0 +1,197 @@
+import numpy as np
+
+from . import kernels
+from .kalmanfilter import KalmanFilterNew
+
+# Constant-velocity box model of KalmanBoxTracker: state [x, y, s, r, dx, dy, ds], measurement [x, y, s, r]
+BOX_F = np.array(
+    [
+        [1, 0, 0, 0, 1, 0, 0],
+        [0, 1, 0, 0, 0, 1, 0],
+        [0, 0, 1, 0, 0, 0, 1],
+        [0, 0, 0, 1, 0, 0, 0],
+        [0, 0, 0, 0, 1, 0, 0],
+        [0, 0, 0, 0, 0, 1, 0],
+        [0, 0, 0, 0, 0, 0, 1],
+    ]
+)
+BOX_H = np.eye(4, 7)
+
+# Entries of P that can be non-zero: each measured value with its own velocity, r alone
+_COUPLED = np.eye(7, dtype=bool)
+for _i in range(3):
+    _COUPLED[_i, _i + 4] = _COUPLED[_i + 4, _i] = True
+
+# (value, velocity) blocks: state indices, then flat indices into P of (i,i), (i,v), (v,i), (v,v)
+_BLOCKS = tuple((i, i + 4, i * 8, i * 7 + i + 4, (i + 4) * 7 + i, (i + 4) * 8) for i in range(3))
+
+
+def predict_covariances(P, q):
+    """
+    The covariance part of BoxKalmanFilter.predict for N filters at once, in place.
+
+    Parameters
+    ----------
+    P : np.array
+        Covariances with the block structure, shape (N, 7, 7).
+    q : np.array
+        Diagonals of Q, shape (N, 7).
+    """
+    p = P.copy()
+    for i, v, _, _, _, _ in _BLOCKS:
+        pv, pvv = p[:, i, v], p[:, v, v]
+        P[:, i, i] = p[:, i, i] + 2.0 * pv + pvv + q[:, i]
+        P[:, i, v] = P[:, v, i] = pv + pvv
+        P[:, v, v] = pvv + q[:, v]
+    P[:, 3, 3] = p[:, 3, 3] + q[:, 3]
+
+
+class BoxKalmanFilter(KalmanFilterNew):
+    """
+    KalmanFilterNew for KalmanBoxTracker's 7-state / 4-measurement box model.
+
+    F only adds each velocity to its own value and H selects the first four
+    states, so with diagonal Q, R and initial P the covariance never couples
+    x, y, s and r with each other: P stays made of three 2x2 blocks
+    (value, velocity) and one scalar (r). S = HPH' + R is then diagonal, its
+    inverse is a division, and predict/update reduce to a few scalar updates
+    per block instead of dense 7x7 products, a 4x4 inverse and the Joseph form
+    (P - KHP is used, equal to it for the optimal gain). x, P, K, y, S and the
+    prior/posterior copies keep their KalmanFilterNew meaning, so freeze,
+    unfreeze and the steady-state gain work unchanged. With the numba kernel
+    backend (see kernels.py) the same scalar updates run compiled.
+
+    The structure is checked on the first predict or update; if F, H, Q, R, P
+    or the fading memory do not have it, every call falls back to
+    KalmanFilterNew, as do calls that pass their own F, Q, B, u, R or H.
+    F, H, Q and R must not be changed after that first call.
+
+    API:
+      kf = BoxKalmanFilter()      # then set F, H, P, Q, R as for KalmanFilterNew(dim_x=7, dim_z=4)
+      kf.predict(); kf.update(z)
+    """
+
+    def __init__(self):
+        super().__init__(dim_x=7, dim_z=4)
+        self._fast = None  # True/False once the model has been checked
+        self.q_diag = None  # diagonal of Q, once the model is structured (see `structured`)
+        self.r_diag = None  # diagonal of R
+        self._q = None      # the same as lists, for the scalar NumPy path
+        self._r = None
+
+    @property
+    def structured(self):
+        """True if F, H, Q, R and P have the block structure (checked once, on first use)."""
+        if self._fast is None:
+            self._check_model()
+        return self._fast
+
+    def _check_model(self):
+        Q, R, P = np.asarray(self.Q), np.asarray(self.R), np.asarray(self.P)
+        self._fast = bool(
+            np.array_equal(self.F, BOX_F)
+            and np.array_equal(self.H, BOX_H)
+            and Q.shape == (7, 7) and not np.any(Q[~np.eye(7, dtype=bool)])
+            and R.shape == (4, 4) and not np.any(R[~np.eye(4, dtype=bool)])
+            and P.shape == (7, 7) and not np.any(P[~_COUPLED])
+            and self._alpha_sq == 1.0
+            and self.B is None
+        )
+        if self._fast:
+            self.q_diag = np.diag(Q).astype(float)
+            self.r_diag = np.diag(R).astype(float)
+            self._q = self.q_diag.tolist()
+            self._r = self.r_diag.tolist()
+
+    def predict(self, u=None, B=None, F=None, Q=None):
+        if u is not None or B is not None or F is not None or Q is not None or not self.structured:
+            return super().predict(u, B, F, Q)
+        x = self.x.copy()
+        P = self.P.copy()
+        if kernels.enabled:
+            kernels.box_predict(x, P, self.q_diag)
+        else:
+            # Scalar reads from a list and writes through a flat view: for a dozen entries this
+            # costs far less than numpy expressions or building arrays from lists
+            x[:3] += x[4:]
+            Pf = P.reshape(-1)
+            p = Pf.tolist()
+            q = self._q
+            for i, v, ii, iv, vi, vv in _BLOCKS:
+                pv, pvv = p[iv], p[vv]
+                Pf[ii] = p[ii] + 2.0 * pv + pvv + q[i]
+                Pf[iv] = Pf[vi] = pv + pvv
+                Pf[vv] = pvv + q[v]
+            Pf[24] = p[24] + q[3]
+        self.x = x
+        self.P = P
+        self.x_prior = x.copy()
+        self.P_prior = P.copy()
+
+    def update(self, z, R=None, H=None):
+        if z is None or R is not None or H is not None or not self.structured:
+            return super().update(z, R, H)
+        self._log_likelihood = None
+        self._likelihood = None
+        self._mahalanobis = None
+        self.history_obs.append(z)
+        if not self.observed:
+            self.unfreeze()  # re-update along the virtual trajectory since the last observation
+        self.observed = True
+
+        z = np.array(z, dtype=float).reshape(4, 1)
+        x = self.x.copy()
+        P = self.P.copy()
+        K = np.zeros((7, 4))
+        S = np.zeros((4, 4))
+        SI = np.zeros((4, 4))
+        if kernels.enabled:
+            y = np.empty((4, 1))
+            kernels.box_update(x, P, K, S, SI, y, z, self.r_diag)
+        else:
+            y = self._update_blocks(x, P, K, S, SI, z)
+        self.y = y
+        self.S = S
+        self.SI = SI
+        self.K = K
+        self.x = x
+        self.P = P
+        self.z = z
+        self.x_post = x.copy()
+        self.P_post = P.copy()
+
+    def _update_blocks(self, x, P, K, S, SI, z):
+        """The NumPy-backend update: fills x, P, K, S and SI in place and returns the residual."""
+        y = z - x[:4]
+        y_ = y[:, 0].tolist()
+        xf = x.reshape(-1)
+        Pf = P.reshape(-1)
+        p = Pf.tolist()
+        r = self._r
+        Kf = K.reshape(-1)
+        Sf = S.reshape(-1)
+        SIf = SI.reshape(-1)
+        # r: a scalar filter
+        s = p[24] + r[3]
+        k = p[24] / s
+        Sf[15] = s
+        SIf[15] = 1.0 / s
+        Kf[15] = k
+        xf[3] += k * y_[3]
+        Pf[24] = p[24] - k * p[24]
+        # x, y, s with their velocities: 2x2 blocks
+        for i, v, ii, iv, vi, vv in _BLOCKS:
+            pp, pv = p[ii], p[iv]
+            s = pp + r[i]
+            k = pp / s
+            kv = pv / s
+            Sf[i * 5] = s
+            SIf[i * 5] = 1.0 / s
+            Kf[i * 5] = k
+            Kf[v * 4 + i] = kv
+            xf[i] += k * y_[i]
+            xf[v] += kv * y_[i]
+            Pf[ii] = pp - k * pp
+            Pf[iv] = Pf[vi] = pv - k * pv
+            Pf[vv] = p[vv] - kv * pv
+        return y
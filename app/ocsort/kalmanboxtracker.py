@@ -45,6 +45,14 @@ class KalmanBoxTracker(object):
     """
 
     count = 0
+    # Steady-state mode: a track updated on enough consecutive frames has a Kalman gain
+    # within STEADY_GAIN_TOL of the fixed point of the covariance recursion, so P and K are
+    # replaced by those precomputed values and only x is propagated. A miss falls back to
+    # the full filter (P grows again) until the gain has converged back.
+    steady_state = True
+    STEADY_GAIN_TOL = 0.01
+    paths = {"full": 0, "steady": 0, "fallback": 0}  # updates taken by each path, all trackers
+    _steady = None  # (K, P prior, P posterior), see steady_gain()
 
     def __init__(self, bbox, delta_t=3, orig=False):
         """
@@ -53,33 +61,16 @@ class KalmanBoxTracker(object):
         """
         # define constant velocity model
         if not orig:
-            from .kalmanfilter import KalmanFilterNew as KalmanFilter
+            from .box_filter import BoxKalmanFilter
 
-            self.kf = KalmanFilter(dim_x=7, dim_z=4)
+            self.kf = BoxKalmanFilter()
         else:
             from filterpy.kalman import KalmanFilter
 
             self.kf = KalmanFilter(dim_x=7, dim_z=4)
-        self.kf.F = np.array(
-            [
-                [1, 0, 0, 0, 1, 0, 0],
-                [0, 1, 0, 0, 0, 1, 0],
-                [0, 0, 1, 0, 0, 0, 1],
-                [0, 0, 0, 1, 0, 0, 0],
-                [0, 0, 0, 0, 1, 0, 0],
-                [0, 0, 0, 0, 0, 1, 0],
-                [0, 0, 0, 0, 0, 0, 1],
-            ]
-        )
-        self.kf.H = np.array(
-            [[1, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0], [0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0]]
-        )
-
-        self.kf.R[2:, 2:] *= 10.0
-        self.kf.P[4:, 4:] *= 1000.0  # give high uncertainty to the unobservable initial velocities
-        self.kf.P *= 10.0
-        self.kf.Q[-1, -1] *= 0.01
-        self.kf.Q[4:, 4:] *= 0.01
+        self._configure(self.kf)
+        self.steady = False  # on the steady-state path; filterpy's filter (orig) never is
+        self.steady_capable = not orig and KalmanBoxTracker.steady_state
 
         self.kf.x[:4] = convert_bbox_to_z(bbox)
         self.time_since_update = 0
@@ -100,6 +91,59 @@ class KalmanBoxTracker(object):
         self.velocity = None
         self.delta_t = delta_t
 
+    @staticmethod
+    def _configure(kf):
+        """Constant velocity model in [x, y, s, r, dx, dy, ds] with the noise levels OC-SORT uses."""
+        kf.F = np.array(
+            [
+                [1, 0, 0, 0, 1, 0, 0],
+                [0, 1, 0, 0, 0, 1, 0],
+                [0, 0, 1, 0, 0, 0, 1],
+                [0, 0, 0, 1, 0, 0, 0],
+                [0, 0, 0, 0, 1, 0, 0],
+                [0, 0, 0, 0, 0, 1, 0],
+                [0, 0, 0, 0, 0, 0, 1],
+            ]
+        )
+        kf.H = np.array(
+            [[1, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0], [0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0]]
+        )
+
+        kf.R[2:, 2:] *= 10.0
+        kf.P[4:, 4:] *= 1000.0  # give high uncertainty to the unobservable initial velocities
+        kf.P *= 10.0
+        kf.Q[-1, -1] *= 0.01
+        kf.Q[4:, 4:] *= 0.01
+
+    @classmethod
+    def steady_gain(cls):
+        """
+        Gain and covariances the filter converges to when every frame has an observation.
+
+        P and K do not depend on the measurements, so they are found once by running the
+        predict/update recursion of a fresh filter to its fixed point.
+
+        Returns
+        -------
+        tuple of np.array
+            (K, P after predict, P after update).
+        """
+        if cls._steady is None:
+            from .kalmanfilter import KalmanFilterNew
+
+            kf = KalmanFilterNew(dim_x=7, dim_z=4)
+            cls._configure(kf)
+            z = np.zeros((4, 1))
+            for _ in range(10000):
+                previous = kf.K.copy()
+                kf.predict()
+                prior = kf.P.copy()
+                kf.update(z)
+                if np.abs(kf.K - previous).max() < 1e-12:
+                    break
+            cls._steady = (kf.K.copy(), prior, kf.P.copy())
+        return cls._steady
+
     def update(self, bbox):
         """
         Updates the state vector with observed bbox.
@@ -131,8 +175,17 @@ class KalmanBoxTracker(object):
             self.history = []
             self.hits += 1
             self.hit_streak += 1
-            self.kf.update(convert_bbox_to_z(bbox))
+            if self.steady:
+                self._update_steady(convert_bbox_to_z(bbox))
+            else:
+                KalmanBoxTracker.paths["full"] += 1
+                self.kf.update(convert_bbox_to_z(bbox))
+                if self.steady_capable and np.abs(self.kf.K - self.steady_gain()[0]).max() < self.STEADY_GAIN_TOL:
+                    self.steady = True
         else:
+            if self.steady:
+                KalmanBoxTracker.paths["fallback"] += 1
+                self.steady = False
             self.kf.update(bbox)
 
     def predict(self):
@@ -142,7 +195,10 @@ class KalmanBoxTracker(object):
         if (self.kf.x[6] + self.kf.x[2]) <= 0:
             self.kf.x[6] *= 0.0
 
-        self.kf.predict()
+        if self.steady:
+            self._predict_steady()
+        else:
+            self.kf.predict()
         self.age += 1
         if self.time_since_update > 0:
             self.hit_streak = 0
@@ -150,6 +206,88 @@ class KalmanBoxTracker(object):
         self.history.append(convert_x_to_bbox(self.kf.x))
         return self.history[-1]
 
+    @classmethod
+    def predict_many(cls, trackers):
+        """
+        predict() for several trackers at once.
+
+        Trackers on a BoxKalmanFilter with its block structure (see box_filter.py) are
+        advanced together: their states and covariances are stacked and moved with a few
+        array operations over all of them, and only the bookkeeping is done per tracker.
+        Others call predict(). Either way the result is the same as predict() on each.
+
+        Returns
+        -------
+        np.array
+            Predicted boxes [x1, y1, x2, y2], shape (len(trackers), 4).
+        """
+        from .box_filter import BoxKalmanFilter, predict_covariances
+
+        boxes = np.empty((len(trackers), 4))
+        rows = []
+        for n, trk in enumerate(trackers):
+            if isinstance(trk.kf, BoxKalmanFilter) and trk.kf.structured:
+                rows.append(n)
+            else:
+                boxes[n] = trk.predict()[0]
+        if not rows:
+            return boxes
+        group = [trackers[n] for n in rows]
+        x = np.concatenate([trk.kf.x for trk in group], axis=1).T
+        stalled = (x[:, 6] + x[:, 2]) <= 0
+        x[stalled, 6] *= 0.0
+        x[:, :3] += x[:, 4:]  # F x
+        # steady trackers take the converged prior covariance, the others propagate theirs
+        full = [k for k, trk in enumerate(group) if not trk.steady]
+        P = np.stack([group[k].kf.P for k in full]) if full else np.empty((0, 7, 7))
+        q = np.stack([group[k].kf.q_diag for k in full]) if full else np.empty((0, 7))
+        predict_covariances(P, q)
+        x_prior = x.copy()
+        P_prior = P.copy()
+        w = np.sqrt(x[:, 2] * x[:, 3])
+        h = x[:, 2] / w
+        boxes[rows] = np.stack((x[:, 0] - w / 2.0, x[:, 1] - h / 2.0, x[:, 0] + w / 2.0, x[:, 1] + h / 2.0), axis=1)
+        steady_prior = cls.steady_gain()[1] if len(full) < len(group) else None
+        j = 0
+        for k, (n, trk) in enumerate(zip(rows, group)):
+            kf = trk.kf
+            kf.x = x[k].reshape(7, 1)
+            kf.x_prior = x_prior[k].reshape(7, 1)
+            if trk.steady:
+                kf.P = steady_prior.copy()
+                kf.P_prior = kf.P
+            else:
+                kf.P = P[j]
+                kf.P_prior = P_prior[j]
+                j += 1
+            trk.age += 1
+            if trk.time_since_update > 0:
+                trk.hit_streak = 0
+            trk.time_since_update += 1
+            trk.history.append(boxes[n : n + 1])
+        return boxes
+
+    def _predict_steady(self):
+        kf = self.kf
+        kf.x = np.dot(kf.F, kf.x)
+        kf.P = self.steady_gain()[1].copy()
+        kf.x_prior = kf.x.copy()
+        kf.P_prior = kf.P
+
+    def _update_steady(self, z):
+        """KalmanFilterNew.update with the converged K and P: no S, no inverse, no P propagation."""
+        KalmanBoxTracker.paths["steady"] += 1
+        K, _, P_post = self.steady_gain()
+        kf = self.kf
+        kf.history_obs.append(z)  # kept for the re-update after a later miss (see KalmanFilterNew.unfreeze)
+        kf.y = z - kf.x[:4]  # H selects the first four state entries
+        kf.x = kf.x + np.dot(K, kf.y)
+        kf.K = K
+        kf.P = P_post.copy()
+        kf.z = z
+        kf.x_post = kf.x.copy()
+        kf.P_post = kf.P
+
     def get_state(self):
         """
         Returns the current bounding box estimate.
@@ -394,11 +394,11 @@ class KalmanFilterNew(object):
             index1 = indices[-2]
             index2 = indices[-1]
             box1 = new_history[index1]
-            x1, y1, s1, r1 = box1
+            x1, y1, s1, r1 = box1.ravel()
             w1 = np.sqrt(s1 * r1)
             h1 = np.sqrt(s1 / r1)
             box2 = new_history[index2]
-            x2, y2, s2, r2 = box2
+            x2, y2, s2, r2 = box2.ravel()
             w2 = np.sqrt(s2 * r2)
             h2 = np.sqrt(s2 / r2)
             time_gap = index2 - index1
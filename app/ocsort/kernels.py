@@ -0,0 +1,154 @@
+"""
+Optional compiled kernels for the tracker's per-frame math.
+
+With 2-10 hands the association and Kalman arrays are tiny, and NumPy's
+per-call overhead costs more than the arithmetic. When numba is installed,
+the IoU/GIoU matrices, the velocity-direction cost of associate() and the
+BoxKalmanFilter predict/update are compiled loops instead; otherwise the
+NumPy code in association.py and box_filter.py runs unchanged. The backend
+is picked at import: OCSORT_KERNELS=numpy forces NumPy, OCSORT_KERNELS=numba
+asks for numba, and by default numba is used when it imports.
+
+API:
+  from ocsort import kernels
+  kernels.backend               # "numba" or "numpy"
+  kernels.use("numpy")          # switch at runtime (e.g. to compare); returns the backend in use
+  kernels.warmup()              # compile now instead of on the first frame
+"""
+import os
+
+import numpy as np
+
+BACKENDS = ("numba", "numpy")
+backend = "numpy"
+enabled = False  # True while the compiled kernels are in use
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def use(name):
+    """Select "numba" or "numpy"; numba falls back to numpy (with a message) if it is not installed."""
+    global backend, enabled
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend {name!r}; expected one of {BACKENDS}")
+    if name == "numba" and numba is None:
+        print("numba is not installed; using the NumPy tracker kernels")
+        name = "numpy"
+    backend = name
+    enabled = name == "numba"
+    return backend
+
+
+def warmup():
+    """Compile every kernel for the dtypes the tracker uses (a no-op with NumPy)."""
+    if not enabled:
+        return
+    boxes = np.array([[0.0, 0.0, 10.0, 10.0, 1.0], [5.0, 5.0, 15.0, 15.0, 1.0]])
+    iou_batch(boxes, boxes)
+    giou_batch(boxes, boxes)
+    angle_diff_cost(boxes, boxes, np.zeros((2, 2)), 0.2)
+    x, P = np.zeros((7, 1)), np.eye(7)
+    q, r = np.ones(7), np.ones(4)
+    box_predict(x, P, q)
+    box_update(x, P, np.zeros((7, 4)), np.zeros((4, 4)), np.zeros((4, 4)), np.zeros((4, 1)), np.ones((4, 1)), r)
+
+
+if numba is not None:
+    # error_model="numpy": a zero union or area gives nan/inf like the NumPy code, not ZeroDivisionError
+    _jit = numba.njit(cache=True, nogil=True, error_model="numpy")
+
+    @_jit
+    def iou_batch(bboxes1, bboxes2):
+        n, m = bboxes1.shape[0], bboxes2.shape[0]
+        out = np.empty((n, m))
+        for i in range(n):
+            a0, a1, a2, a3 = bboxes1[i, 0], bboxes1[i, 1], bboxes1[i, 2], bboxes1[i, 3]
+            area1 = (a2 - a0) * (a3 - a1)
+            for j in range(m):
+                b0, b1, b2, b3 = bboxes2[j, 0], bboxes2[j, 1], bboxes2[j, 2], bboxes2[j, 3]
+                w = max(0.0, min(a2, b2) - max(a0, b0))
+                h = max(0.0, min(a3, b3) - max(a1, b1))
+                wh = w * h
+                out[i, j] = wh / (area1 + (b2 - b0) * (b3 - b1) - wh)
+        return out
+
+    @_jit
+    def giou_batch(bboxes1, bboxes2):
+        n, m = bboxes1.shape[0], bboxes2.shape[0]
+        out = np.empty((n, m))
+        for i in range(n):
+            a0, a1, a2, a3 = bboxes1[i, 0], bboxes1[i, 1], bboxes1[i, 2], bboxes1[i, 3]
+            area1 = (a2 - a0) * (a3 - a1)
+            for j in range(m):
+                b0, b1, b2, b3 = bboxes2[j, 0], bboxes2[j, 1], bboxes2[j, 2], bboxes2[j, 3]
+                w = max(0.0, min(a2, b2) - max(a0, b0))
+                h = max(0.0, min(a3, b3) - max(a1, b1))
+                wh = w * h
+                union = area1 + (b2 - b0) * (b3 - b1) - wh
+                wc = max(a2, b2) - min(a0, b0)
+                hc = max(a3, b3) - min(a1, b1)
+                if wc <= 0.0 or hc <= 0.0:
+                    raise AssertionError("degenerate box in giou_batch")
+                enclose = wc * hc
+                out[i, j] = (wh / union - (enclose - union) / enclose + 1.0) / 2.0
+        return out
+
+    @_jit
+    def angle_diff_cost(detections, previous_obs, velocities, vdc_weight):
+        n, m = detections.shape[0], previous_obs.shape[0]
+        out = np.zeros((n, m))
+        for j in range(m):
+            if previous_obs[j, 4] < 0:
+                continue  # no previous observation: no direction cost
+            cx2 = (previous_obs[j, 0] + previous_obs[j, 2]) / 2.0
+            cy2 = (previous_obs[j, 1] + previous_obs[j, 3]) / 2.0
+            vy, vx = velocities[j, 0], velocities[j, 1]
+            for i in range(n):
+                dx = (detections[i, 0] + detections[i, 2]) / 2.0 - cx2
+                dy = (detections[i, 1] + detections[i, 3]) / 2.0 - cy2
+                norm = np.sqrt(dx**2 + dy**2) + 1e-6
+                cos = min(1.0, max(-1.0, vx * (dx / norm) + vy * (dy / norm)))
+                diff_angle = (np.pi / 2.0 - np.abs(np.arccos(cos))) / np.pi
+                out[i, j] = diff_angle * vdc_weight * detections[i, -1]
+        return out
+
+    @_jit
+    def box_predict(x, P, q):
+        for i in range(3):
+            v = i + 4
+            x[i, 0] += x[v, 0]
+            pv, vv = P[i, v], P[v, v]
+            P[i, i] = P[i, i] + 2.0 * pv + vv + q[i]  # summed in BoxKalmanFilter's order
+            P[i, v] = pv + vv
+            P[v, i] = pv + vv
+            P[v, v] = vv + q[v]
+        P[3, 3] += q[3]
+
+    @_jit
+    def box_update(x, P, K, S, SI, y, z, r):
+        for i in range(4):
+            y[i, 0] = z[i, 0] - x[i, 0]
+        for i in range(4):
+            pp = P[i, i]
+            s = pp + r[i]
+            k = pp / s
+            S[i, i] = s
+            SI[i, i] = 1.0 / s
+            K[i, i] = k
+            x[i, 0] += k * y[i, 0]
+            P[i, i] = pp - k * pp
+            if i < 3:
+                v = i + 4
+                pv = P[i, v]
+                kv = pv / s
+                K[v, i] = kv
+                x[v, 0] += kv * y[i, 0]
+                P[v, v] -= kv * pv
+                P[i, v] = pv - k * pv
+                P[v, i] = pv - k * pv
+
+
+use(os.environ.get("OCSORT_KERNELS", "numba" if numba is not None else "numpy"))
@@ -0,0 +1,100 @@
+import os
+import wave
+
+import numpy as np
+from PIL import ImageDraw
+
+from ring_frames import RingFrameBuilder
+
+
+def load_audio(path, samplerate=None):
+    """
+    Load mono float32 samples from a PCM .wav file or a .npy array.
+
+    Parameters
+    ----------
+    path : str
+        .wav (8/16/24/32-bit PCM) or .npy file. Multi-channel audio is averaged to mono.
+    samplerate : int
+        Sample rate of a .npy file; defaults to RingFrameBuilder.FS. Ignored for .wav.
+
+    Returns
+    -------
+    samples : np.ndarray
+        float32 samples in [-1, 1].
+    samplerate : int
+    """
+    if path.lower().endswith(".npy"):
+        samples = np.load(path).astype(np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        return samples, samplerate or RingFrameBuilder.FS
+
+    with wave.open(path, "rb") as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 2**23
+    elif width in (2, 4):
+        dtype = np.int16 if width == 2 else np.int32
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / float(np.iinfo(dtype).max + 1)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+class OfflineRingRenderer:
+    """
+    Renders visualizer frames from a sample buffer as fast as possible.
+
+    Frame k shows the FFT_CHUNK samples ending at k / fps seconds, analyzed with
+    timestamp k / fps, so the result matches what the live visualizer would show
+    at that frame rate. No Tk, sound card or wall clock involved.
+
+    API:
+      r = OfflineRingRenderer(samples, samplerate, size=480, internal_size=320, fps=60)
+      for index, rgbx in r.frames(): ...   # rgbx buffer is reused between frames
+      r.save_sequence("out_dir")           # PNG per frame, centre pulse drawn as a white disc
+    """
+
+    def __init__(self, samples, samplerate, size=480, internal_size=None, fps=60):
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.samplerate = samplerate
+        self.fps = fps
+        self.builder = RingFrameBuilder(size, internal_size, samplerate)
+        self.window = np.zeros(self.builder.FFT_CHUNK, dtype=np.float32)
+
+    def __len__(self):
+        return int(self.samples.shape[0] * self.fps // self.samplerate) + 1
+
+    def block(self, index):
+        """The FFT_CHUNK samples ending at frame `index`, zero-padded before the start."""
+        n = self.window.shape[0]
+        end = min(int(round(index * self.samplerate / self.fps)), self.samples.shape[0])
+        start = max(0, end - n)
+        self.window[:n - (end - start)] = 0.0
+        self.window[n - (end - start):] = self.samples[start:end]
+        return self.window
+
+    def frames(self, count=None):
+        """Yield (index, rgbx) for the first `count` frames (all by default)."""
+        count = len(self) if count is None else min(count, len(self))
+        for index in range(count):
+            yield index, self.builder.step(self.block(index), now=index / self.fps)
+
+    def save_sequence(self, out_dir, count=None, fmt="png"):
+        """Write frames as out_dir/frame_00000.<fmt>; returns the number written."""
+        os.makedirs(out_dir, exist_ok=True)
+        written = 0
+        for index, _ in self.frames(count):
+            image = self.builder.renderer.to_image()
+            r, c = self.builder.r_inner, self.builder.size / 2
+            ImageDraw.Draw(image).ellipse((c - r, c - r, c + r, c + r), fill="white")
+            image.save(os.path.join(out_dir, f"frame_{index:05d}.{fmt}"))
+            written += 1
+        return written
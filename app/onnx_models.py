@@ -6,12 +6,15 @@ import onnxruntime as ort
 
 
 class OnnxModel(ABC):
-    def __init__(self, model_path, image_size):
+    def __init__(self, model_path, image_size, threads=None):
         self.model_path = model_path
         self.image_size = image_size
         self.mean = np.array([127, 127, 127], dtype=np.float32)
         self.std = np.array([128, 128, 128], dtype=np.float32)
         options, prov_opts, providers = self.get_onnx_provider()
+        if threads:
+            # several sessions in separate processes (InferencePool) would otherwise each take every core
+            options.intra_op_num_threads = threads
         self.sess = ort.InferenceSession(
             model_path, sess_options=options, providers=providers, provider_options=prov_opts
         )
@@ -108,13 +111,16 @@ class OnnxModel(ABC):
         )
 
 class HandDetection(OnnxModel):
-    def __init__(self, model_path, image_size=(320, 240)):
-        super().__init__(model_path, image_size)
-        self.image_size = image_size
-        self.sess = ort.InferenceSession(model_path)
+    def __init__(self, model_path, image_size=(320, 240), threads=None):
+        super().__init__(model_path, image_size, threads)
         self.input_name = self.sess.get_inputs()[0].name
         self.output_names = [output.name for output in self.sess.get_outputs()]
-        
+
+    def warmup(self):
+        """Run one dummy inference so the first real frame does not pay ORT's lazy allocation."""
+        width, height = self.image_size
+        self.sess.run(self.output_names, {self.input_name: np.zeros((1, 3, height, width), dtype=np.float32)})
+
     def __call__(self, frame):
         input_tensor = self.preprocess(frame)
         boxes, _, probs = self.sess.run(self.output_names, {self.input_name: input_tensor})
@@ -127,8 +133,37 @@ class HandDetection(OnnxModel):
 
 
 class HandClassification(OnnxModel):
-    def __init__(self, model_path, image_size=(128, 128)):
-        super().__init__(model_path, image_size)
+    BATCH_BUCKETS = (1, 2, 4, 8)
+
+    def __init__(self, model_path, image_size=(128, 128), threads=None):
+        super().__init__(model_path, image_size, threads)
+        self.input_name = self.sess.get_inputs()[0].name
+        # GPU providers re-plan whenever the batch shape changes, so batches are padded to a few
+        # fixed buckets there. On CPU a padded crop costs a full forward pass, so batches keep
+        # their size and warmup() pre-runs every size instead.
+        self.pad_batches = self.sess.get_providers()[0] != "CPUExecutionProvider"
+        self._batches = {}  # batch size -> reused input array
+
+    def batch_size_for(self, count):
+        """Batch size actually run for `count` crops."""
+        if self.pad_batches:
+            for size in self.BATCH_BUCKETS:
+                if size >= count:
+                    return size
+        return count
+
+    def _batch(self, size):
+        batch = self._batches.get(size)
+        if batch is None:
+            width, height = self.image_size
+            batch = np.zeros((size, 3, height, width), dtype=np.float32)
+            self._batches[size] = batch
+        return batch
+
+    def warmup(self, max_batch):
+        """Run a dummy inference for every batch shape that up to `max_batch` hands will use."""
+        for size in sorted({self.batch_size_for(count) for count in range(1, max_batch + 1)}):
+            self.sess.run(None, {self.input_name: self._batch(size)})
 
     @staticmethod
     def get_square(box, image):
@@ -194,8 +229,10 @@ class HandClassification(OnnxModel):
             Predictions from model
         """
         crops = self.get_crops(image, bboxes)
-        crops = [self.preprocess(crop) for crop in crops]
-        input_name = self.sess.get_inputs()[0].name
-        outputs = self.sess.run(None, {input_name: np.concatenate(crops, axis=0)})[0]
+        batch = self._batch(self.batch_size_for(len(crops)))
+        for i, crop in enumerate(crops):
+            batch[i] = self.preprocess(crop)[0]
+        # Rows past len(crops) are padding (stale crops); their outputs are dropped
+        outputs = self.sess.run(None, {self.input_name: batch})[0][: len(crops)]
         labels = np.argmax(outputs, axis=1)
         return labels
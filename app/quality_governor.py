@@ -0,0 +1,129 @@
+import time
+
+
+class QualityGovernor:
+    """
+    Keeps gesture recognition inside a per-frame time budget by trading quality for speed.
+
+    Each frame the recognition loop asks plan() what to run, does the work and
+    reports how long it took with frame_done(). The smoothed frame time is
+    compared with the budget: under load the governor steps down one level
+    (run the detector on fewer frames, refresh gesture labels less often,
+    redraw the preview less often), and steps back up once there is headroom.
+    Gesture timing is measured on capture timestamps, so skipped frames do not
+    change gesture semantics. The detector model has a fixed 320x240 input,
+    so its rate, not its input size, is what gets traded.
+
+    API:
+      gov = QualityGovernor(budget_ms=1000 / 30)
+      detect, classify = gov.plan()
+      ... run the detector only if detect, the classifier only if classify ...
+      gov.frame_done(seconds)       # work time of this frame
+      gov.preview_fps               # current preview rate
+      gov.metrics()                 # level, frame time, counters, transitions
+    """
+
+    # detect on every Nth frame, classify on every Nth detection, preview FPS; best first
+    LEVELS = (
+        (1, 1, 30),
+        (1, 2, 30),
+        (1, 3, 20),
+        (2, 3, 15),
+        (3, 4, 10),
+    )
+    FRAME_COST_EMA = 0.1
+    STEP_DOWN_AT   = 0.9     # step down if the smoothed frame time exceeds this share of the budget
+    STEP_UP_AT     = 0.5     # step back up if it is below this share
+    HOLD_SEC       = 2.0     # minimum time between level changes
+    MAX_TRANSITIONS = 100    # transitions kept for metrics()
+
+    def __init__(self, budget_ms=1000 / 30, level=0, verbose=True):
+        self.budget = budget_ms / 1000.0
+        self.level = level
+        self.verbose = verbose
+        self.frame_cost = 0.0  # EMA of work seconds per frame
+        self.frames = 0
+        self.detections = 0
+        self.classifications = 0
+        self.transitions = []  # (time.monotonic(), from level, to level, frame ms)
+        self.started_at = time.monotonic()
+        self.changed_at = self.started_at
+        self.time_at_level = [0.0] * len(self.LEVELS)
+
+    @property
+    def detect_every(self):
+        return self.LEVELS[self.level][0]
+
+    @property
+    def classify_every(self):
+        return self.LEVELS[self.level][1]
+
+    @property
+    def preview_fps(self):
+        return self.LEVELS[self.level][2]
+
+    def plan(self):
+        """
+        Returns
+        -------
+        detect : bool
+            Run the detector (and tracker) on this frame.
+        classify : bool
+            Also run the classifier; otherwise tracks keep their last gesture.
+        """
+        detect = self.frames % self.detect_every == 0
+        classify = detect and self.detections % self.classify_every == 0
+        self.frames += 1
+        self.detections += detect
+        self.classifications += classify
+        return detect, classify
+
+    def frame_done(self, seconds, now=None):
+        """Report the work time of the frame plan() was last called for; may change the level."""
+        now = time.monotonic() if now is None else now
+        self.frame_cost += self.FRAME_COST_EMA * (seconds - self.frame_cost)
+        if now - self.changed_at < self.HOLD_SEC:
+            return
+        share = self.frame_cost / self.budget
+        level = self.level
+        if share > self.STEP_DOWN_AT and level + 1 < len(self.LEVELS):
+            level += 1
+        elif share < self.STEP_UP_AT and level > 0:
+            level -= 1
+        else:
+            return
+        self._set_level(level, now)
+
+    def _set_level(self, level, now):
+        previous = self.level
+        self.time_at_level[previous] += now - self.changed_at
+        self.level = level
+        self.changed_at = now
+        self.transitions.append((now, previous, level, self.frame_cost * 1000))
+        del self.transitions[:-self.MAX_TRANSITIONS]
+        if self.verbose:
+            detect_every, classify_every, preview_fps = self.LEVELS[level]
+            print(
+                f"Quality level {previous} -> {level}: detect every {detect_every} frame(s), "
+                f"classify every {classify_every} detection(s), preview {preview_fps} FPS "
+                f"(frame time {self.frame_cost * 1000:.1f} ms, budget {self.budget * 1000:.1f} ms)"
+            )
+
+    def metrics(self, now=None):
+        """Snapshot of the governor state for logs or a status display."""
+        now = time.monotonic() if now is None else now
+        time_at_level = list(self.time_at_level)
+        time_at_level[self.level] += now - self.changed_at
+        return {
+            "level": self.level,
+            "detect_every": self.detect_every,
+            "classify_every": self.classify_every,
+            "preview_fps": self.preview_fps,
+            "frame_ms": self.frame_cost * 1000,
+            "budget_ms": self.budget * 1000,
+            "frames": self.frames,
+            "detections": self.detections,
+            "classifications": self.classifications,
+            "time_at_level": time_at_level,
+            "transitions": list(self.transitions),
+        }
@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+from main_controller import MainController
+from ocsort import KalmanBoxTracker
+from session_recorder import DETECTION, EVENT, FRAME, RECORD_DTYPE, TRACK, SessionRecording, frame_rows
+
+
+def frames_from_records(records):
+    """
+    Split recorded rows into replay input.
+
+    Returns
+    -------
+    list of (timestamp, dets, labels)
+        dets is (N, 5) float64 [x1, y1, x2, y2, score]; labels is (N,) int, or None where the
+        classifier was skipped (every label of the frame recorded as -1).
+    """
+    rows = records[(records["kind"] == FRAME) | (records["kind"] == DETECTION)]
+    starts = np.flatnonzero(rows["kind"] == FRAME)
+    ends = np.append(starts[1:], len(rows))
+    frames = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        dets = rows[start + 1:end]
+        boxes = np.empty((len(dets), 5))
+        boxes[:, :4] = dets["bbox"]
+        boxes[:, 4] = dets["score"]
+        labels = dets["label"].astype(np.int64)
+        frames.append((float(rows["timestamp"][start]), boxes, labels if (labels >= 0).any() else None))
+    return frames
+
+
+class _RowCollector:
+    """Stands in for SessionRecorder during a replay: keeps the rows in memory."""
+
+    def __init__(self):
+        self.rows = []
+        self.frames = 0
+
+    def record_frame(self, timestamp, dets, labels, tracks, events=()):
+        # detections are the replay input; only what the tracker made of them is kept
+        self.rows.extend(frame_rows(self.frames, timestamp, dets[:0], None, tracks, events))
+        self.frames += 1
+
+    def records(self):
+        return np.array(self.rows, dtype=RECORD_DTYPE)
+
+
+class TrackerReplay:
+    """
+    Drives MainController.update straight from detections: no camera, no models.
+
+    Each frame's boxes, probabilities and labels are fed to a tracker-only
+    MainController in order, with their original timestamps, so the tracker,
+    the association and the gesture rules run exactly as they did live.
+    Track ids start from 0 on every run, so two runs over the same input give
+    byte-identical output.
+
+    API:
+      replay = TrackerReplay(frames_from_records(SessionRecording(path).records))
+      out = replay.run()              # FRAME, TRACK and EVENT rows (RECORD_DTYPE) of every frame
+      replay.run(collect=False)       # timing only: update() and nothing else
+      replay.seconds, replay.us_per_frame
+      TrackerReplay.digest(out), TrackerReplay.first_difference(out, reference)
+    """
+
+    def __init__(self, frames, **controller_kwargs):
+        """
+        Parameters
+        ----------
+        frames : list of (timestamp, dets, labels)
+            See frames_from_records.
+        controller_kwargs
+            Passed to MainController (max_age, min_hits, iou_threshold, maxlen, min_frames).
+        """
+        self.frames = frames
+        self.controller_kwargs = controller_kwargs
+        self.seconds = None
+
+    @property
+    def us_per_frame(self):
+        return self.seconds * 1e6 / max(1, len(self.frames))
+
+    def run(self, collect=True):
+        """
+        Returns
+        -------
+        np.ndarray
+            RECORD_DTYPE rows of the tracks and events of every frame; None if not collecting.
+        """
+        controller = MainController(None, None, **self.controller_kwargs)
+        collector = _RowCollector() if collect else None
+        controller.recorder = collector
+        saved_count = KalmanBoxTracker.count
+        KalmanBoxTracker.count = 0
+        update = controller.update
+        try:
+            start = time.perf_counter()
+            for timestamp, dets, labels in self.frames:
+                update(dets, labels, timestamp)
+            self.seconds = time.perf_counter() - start
+        finally:
+            KalmanBoxTracker.count = saved_count
+        return collector.records() if collect else None
+
+    @staticmethod
+    def digest(records):
+        """SHA-256 of every field of every row (padding bytes excluded)."""
+        h = hashlib.sha256()
+        for name in RECORD_DTYPE.names:
+            h.update(np.ascontiguousarray(records[name]).tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    def first_difference(records, reference):
+        """
+        Returns
+        -------
+        tuple or None
+            (row index, field name) of the first bitwise difference, or None if identical.
+        """
+        n = min(len(records), len(reference))
+        first = None
+        for name in RECORD_DTYPE.names:
+            a = np.ascontiguousarray(records[name][:n]).view(np.uint8).reshape(n, -1)
+            b = np.ascontiguousarray(reference[name][:n]).view(np.uint8).reshape(n, -1)
+            rows = np.flatnonzero((a != b).any(axis=1))
+            if len(rows) and (first is None or rows[0] < first[0]):
+                first = (int(rows[0]), name)
+        if first is None and len(records) != len(reference):
+            first = (n, "length")
+        return first
+
+
+def run(args):
+    records = SessionRecording.concatenate(args.recordings)
+    frames = frames_from_records(records)
+    replay = TrackerReplay(frames)
+    n_dets = sum(len(dets) for _, dets, _ in frames)
+    print(f"{len(frames)} frames, {n_dets} detections, {len(args.recordings)} file(s)")
+
+    timings = []
+    for _ in range(args.repeat):
+        replay.run(collect=False)
+        timings.append(replay.seconds)
+    best = min(timings)
+    print(f"update: {best * 1e6 / max(1, len(frames)):.1f} us/frame, {len(frames) / best:.0f} frames/s (best of {args.repeat})")
+
+    out = replay.run()
+    live_events = int((records["kind"] == EVENT).sum())
+    print(f"{int((out['kind'] == TRACK).sum())} track rows, {int((out['kind'] == EVENT).sum())} events "
+          f"({live_events} recorded live), digest {TrackerReplay.digest(out)[:16]}")
+    if args.save:
+        np.save(args.save, out)
+        print(f"Saved replay output to {args.save}")
+    if args.reference:
+        reference = np.load(args.reference)
+        diff = TrackerReplay.first_difference(out, reference)
+        if diff is None:
+            print(f"Identical to {args.reference}")
+        else:
+            row, field = diff
+            frame = out["frame"][row] if row < len(out) else reference["frame"][row]
+            print(f"Differs from {args.reference}: row {row} (frame {frame}), field {field}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="Replay recorded detections through the tracker and gesture rules")
+    parser.add_argument("recordings", nargs="+", type=str, help="Session files (.grec), in order")
+    parser.add_argument("--repeat", default=3, type=int, help="Timed runs; the best is reported")
+    parser.add_argument("--save", default=None, type=str, help="Write the replay output (.npy) as a reference")
+    parser.add_argument("--reference", default=None, type=str, help="Compare bit-for-bit with a saved output")
+    args = parser.parse_args()
+    raise SystemExit(run(args))
@@ -0,0 +1,181 @@
+import numpy as np
+
+from ring_renderer import RingRenderer
+from spectrum_analyzer import SpectrumAnalyzer
+
+
+class RingFrameBuilder:
+    """
+    Audio in, ring frame out: everything the visualizer draws except Tk.
+
+    Runs SpectrumAnalyzer on a block of samples, turns the band state into a
+    per-angle palette and radius (half-ring interpolation + mirror), rasterizes
+    it with RingRenderer and computes the radius of the centre pulse. Needs no
+    display or sound card, so it backs both AudioRingVisualizer and offline
+    rendering/benchmarks (see offline_render.py).
+
+    API:
+      b = RingFrameBuilder(size=480, internal_size=320)
+      rgbx = b.step(samples)     # (size, size, 4) uint8, reused between calls
+      b.r_inner                  # centre pulse radius in display pixels
+      b.analyze(samples); b.needs_render(0.01) and b.render()
+      b.set_render_size(240)     # rasterize smaller (caller upscales); r_inner stays in display pixels
+    """
+
+    # ----- Visual / DSP knobs tuned to your prior version -----
+    INTERNAL_SIZE    = 320     # geometry grid (keeps edges smooth)
+    N_ANGLE          = 360     # must be even
+    NUM_BANDS        = 16
+    FFT_CHUNK        = 2048
+    FS               = 44100
+    FEATHER_PX       = 3.0
+    INNER_RATIO      = 0.50
+    DEFORM_SCALE     = 0.4
+    BASS_EMPHASIS    = 1.8
+    RING_MARGIN_PX   = 14.0
+    SAFETY           = 0.03
+
+    # bass-only pulse (smoothing, colour and beat-detection knobs live on SpectrumAnalyzer)
+    PULSE_STRENGTH = 0.2
+
+    def __init__(self, size=480, internal_size=None, samplerate=None):
+        assert self.N_ANGLE % 2 == 0, "N_ANGLE must be even."
+        self.size = int(size)
+        self.internal_size = int(internal_size or self.INTERNAL_SIZE)
+        self.samplerate = samplerate or self.FS
+
+        # Internal geometry grid (square); pixels are rasterized at display size
+        S = self.internal_size
+        self.cx = self.cy = S // 2
+        self.R_MAX_ALLOWED = min(self.cx, self.cy) - self.FEATHER_PX - 1
+        self.scale = self.size / S
+        self.renderers = {}  # raster size -> RingRenderer
+        self.set_render_size(self.size)
+
+        # angle caches for HALF interpolation
+        self.N_HALF = self.N_ANGLE // 2
+        self.angles_per_band_half = self.N_HALF / self.NUM_BANDS
+        pos_angles_half = np.arange(self.N_HALF, dtype=np.float32) / self.angles_per_band_half
+        self.i0_half = np.floor(pos_angles_half).astype(np.int32) % self.NUM_BANDS
+        self.i1_half = (self.i0_half + 1) % self.NUM_BANDS
+        self.t_half  = (pos_angles_half - np.floor(pos_angles_half)).astype(np.float32)
+
+        # Audio analysis (FFT bands, smoothing, bass beat detection)
+        self.analyzer = SpectrumAnalyzer(self.FFT_CHUNK, self.samplerate, self.NUM_BANDS)
+
+        # deformation weights with bass emphasis
+        idx = np.arange(self.NUM_BANDS, dtype=np.float32)
+        self.def_weights = 1.0 / np.sqrt(1.0 + idx)
+        self.def_weights /= self.def_weights.max()
+        self.def_weights[:3] *= self.BASS_EMPHASIS
+
+        self.r_inner = self.R_MAX_ALLOWED * self.INNER_RATIO * self.scale
+        self.rendered_levels = None
+        self.rendered_activity = 0.0
+
+    def set_render_size(self, render_size):
+        """Rasterize at `render_size` pixels from now on; the tables are built once per size."""
+        render_size = int(render_size)
+        renderer = self.renderers.get(render_size)
+        if renderer is None:
+            renderer = RingRenderer(render_size, self.internal_size, self.N_ANGLE, self.FEATHER_PX)
+            self.renderers[render_size] = renderer
+        self.renderer = renderer
+        self.rendered_levels = None
+
+    @property
+    def max_inner_radius(self):
+        """Largest centre pulse radius in display pixels."""
+        return (self.R_MAX_ALLOWED - self.RING_MARGIN_PX) * self.scale
+
+    def step(self, samples, now=None):
+        """
+        Analyze one FFT_CHUNK block of mono samples and rasterize the ring.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            Mono audio block.
+        now : float
+            Timestamp in seconds, passed to SpectrumAnalyzer.process.
+
+        Returns
+        -------
+        np.ndarray
+            (render_size, render_size, 4) uint8 RGBX frame, reused between calls.
+        """
+        self.analyze(samples, now)
+        return self.render()
+
+    def analyze(self, samples, now=None):
+        """Update the audio state and the centre pulse radius without rasterizing."""
+        self.analyzer.process(samples, now)
+        self.r_inner = self.inner_radius()
+
+    def needs_render(self, threshold):
+        """True if any band level or the activity moved by at least `threshold` since the last render()."""
+        if self.rendered_levels is None:
+            return True
+        analyzer = self.analyzer
+        return (float(np.max(np.abs(analyzer.levels - self.rendered_levels))) >= threshold
+                or abs(analyzer.activity - self.rendered_activity) >= threshold)
+
+    def render(self):
+        """Rasterize the current state; returns the renderer's reused RGBX frame."""
+        r_per_angle, pal_full = self.ring_shape()
+        frame = self.renderer.render(r_per_angle, pal_full)
+        self.rendered_levels = self.analyzer.levels.copy()
+        self.rendered_activity = self.analyzer.activity
+        return frame
+
+    def ring_shape(self):
+        """Per-angle radius (internal units) and uint8 RGB palette for the current analyzer state."""
+        analyzer = self.analyzer
+        levels, activity = analyzer.levels, analyzer.activity
+
+        # ---- Build colors & deformation (half → mirror) ----
+        band_h, band_v = analyzer.band_hv()
+        band_rgb = self._hsv_to_rgb_numpy(band_h, np.ones_like(band_h), band_v).astype(np.float32)
+
+        # deformation with bass emphasis
+        band_def = self.def_weights * (levels - levels.mean())
+        m = np.max(np.abs(band_def))
+        if m > 1e-6:
+            band_def /= m
+        band_def *= (1.0 - 0.9 * (1.0 - activity))  # REST_DEFORM_PULL=0.9
+
+        # interpolate HALF angles
+        pal_half = band_rgb[self.i0_half] * (1.0 - self.t_half[:, None]) + band_rgb[self.i1_half] * (self.t_half[:, None])
+        def_half = band_def[self.i0_half] * (1.0 - self.t_half) + band_def[self.i1_half] * (self.t_half)
+
+        # mirror to FULL
+        pal_full = np.concatenate([pal_half, pal_half[::-1]], axis=0).astype(np.uint8)
+        def_full = np.concatenate([def_half, def_half[::-1]], axis=0).astype(np.float32)
+
+        # adaptive headroom
+        max_def = float(np.max(np.abs(def_full)))
+        den = max(1e-6, 1.0 + self.DEFORM_SCALE * max_def)
+        r_base_dyn = (self.R_MAX_ALLOWED * (1.0 - self.SAFETY)) / den
+        r_per_angle = r_base_dyn * (1.0 + self.DEFORM_SCALE * def_full)
+        r_per_angle = np.clip(r_per_angle, 0.0, self.R_MAX_ALLOWED - 2.0)
+        return r_per_angle, pal_full
+
+    def inner_radius(self):
+        """Centre pulse radius in display pixels; grows only on strong bass."""
+        r_inner_base_small = self.R_MAX_ALLOWED * self.INNER_RATIO
+        r_inner_small = r_inner_base_small * (1.0 + self.PULSE_STRENGTH * min(1.0, self.analyzer.pulse_state))
+        r_inner_small = min(r_inner_small, self.R_MAX_ALLOWED - self.RING_MARGIN_PX)
+        return r_inner_small * self.scale
+
+    @staticmethod
+    def _hsv_to_rgb_numpy(h, s, v):
+        h = (h % 1.0) * 6.0
+        i = np.floor(h).astype(np.int32)
+        f = h - i
+        p = v * (1 - s)
+        q = v * (1 - s * f)
+        t = v * (1 - s * (1 - f))
+        r = np.choose(i % 6, [v, q, p, p, t, v], mode='clip')
+        g = np.choose(i % 6, [t, v, v, q, p, p], mode='clip')
+        b = np.choose(i % 6, [p, p, t, v, v, q], mode='clip')
+        return (np.clip(np.stack([r, g, b], axis=-1), 0, 1) * 255.0)
@@ -0,0 +1,97 @@
+import numpy as np
+from PIL import Image
+
+
+class RingRenderer:
+    """
+    Rasterizes the audio ring directly at output resolution.
+
+    Per-pixel angle index and radius are computed once for a given size. The
+    feathered edge is quantized to ALPHA_LEVELS steps, so every frame reduces
+    to building a small (angle, alpha) colour table and one uint32 gather per
+    pixel into a preallocated RGBX buffer. There is no upscale pass.
+
+    Geometry is expressed in `internal_size` units (the visualizer's
+    INTERNAL_SIZE grid), so radii and feathering look the same at any output size.
+
+    API:
+      r = RingRenderer(size=480, internal_size=320, n_angle=360, feather_px=3.0)
+      rgbx = r.render(r_per_angle, palette)  # (size, size, 4) uint8, reused between calls
+      img = r.to_image()                      # PIL RGB image of the last frame
+    """
+
+    ALPHA_LEVELS = 32
+
+    def __init__(self, size, internal_size, n_angle, feather_px, bg_color=(40, 40, 40)):
+        self.size = int(size)
+        self.internal_size = internal_size
+        self.n_angle = n_angle
+        self.feather_px = float(feather_px)
+        L = self.ALPHA_LEVELS
+
+        # Pixel centres of the output grid expressed in internal coordinates
+        scale = internal_size / self.size
+        c = internal_size // 2
+        coords = ((np.arange(self.size, dtype=np.float32) + 0.5) * scale - 0.5) - c
+        dy, dx = np.meshgrid(coords, coords, indexing="ij")
+        rr = np.hypot(dx, dy)
+        theta = (np.arctan2(dy, dx) + 2 * np.pi) % (2 * np.pi)
+        angle_idx = np.minimum((theta * (n_angle / (2 * np.pi))).astype(np.int32), n_angle - 1)
+
+        # alpha level = clip(((r - rr) / feather + 1) * L + 0.5, 0, L), split so that only
+        # r depends on the frame: level = r * L / feather - rr_term
+        self.level_scale = np.float32(L / self.feather_px)
+        self.rr_term = (rr * (L / self.feather_px) - L - 0.5).astype(np.float32).ravel()
+        # np.take converts any other index dtype to intp, allocating per call
+        self.angle_idx = angle_idx.ravel().astype(np.intp)
+        self.lut_base = self.angle_idx * (L + 1)
+
+        # colour table: row per angle, column per alpha level; level 0 is background
+        self._levels = (np.arange(1, L + 1, dtype=np.float32) / L)[None, :, None]
+        self._lut = np.empty((n_angle, L + 1, 4), dtype=np.uint8)
+        self._lut[..., 3] = 255
+        self._lut[:, 0, :3] = bg_color
+        self._lut32 = self._lut.reshape(-1, 4).view(np.uint32).ravel()
+        self._r_scaled = np.empty(n_angle, dtype=np.float32)
+
+        # Preallocated per-pixel work buffers
+        n = self.size * self.size
+        self._level = np.empty(n, dtype=np.float32)
+        self._index = np.empty(n, dtype=np.intp)
+        self.frame = np.empty((self.size, self.size, 4), dtype=np.uint8)
+        self._frame32 = self.frame.reshape(-1, 4).view(np.uint32).ravel()
+
+    def render(self, r_per_angle, palette):
+        """
+        Parameters
+        ----------
+        r_per_angle : np.ndarray
+            Ring radius per angle bin in internal units, shape (n_angle,).
+        palette : np.ndarray
+            RGB colour per angle bin, shape (n_angle, 3), uint8.
+
+        Returns
+        -------
+        np.ndarray
+            (size, size, 4) uint8 RGBX frame. The same buffer is returned every call.
+        """
+        L = self.ALPHA_LEVELS
+        # (alpha * color) truncated to uint8, like the original float render
+        np.multiply(palette[:, None, :], self._levels, out=self._lut[:, 1:, :3], casting="unsafe")
+
+        np.multiply(r_per_angle, self.level_scale, out=self._r_scaled, casting="unsafe")
+        level = self._level
+        # indices are always in range; mode="clip" also stops np.take from buffering `out`
+        np.take(self._r_scaled, self.angle_idx, out=level, mode="clip")
+        level -= self.rr_term
+        np.clip(level, 0.0, L, out=level)
+        np.copyto(self._index, level, casting="unsafe")
+        self._index += self.lut_base
+        np.take(self._lut32, self._index, out=self._frame32, mode="clip")
+        return self.frame
+
+    def to_image(self):
+        """Return the last rendered frame as a PIL RGB image."""
+        image = Image.frombuffer("RGB", (self.size, self.size), self.frame, "raw", "RGBX", 0, 1)
+        # newer Pillow keeps the zero-copy RGBX mode; PIL stores RGB as 4 bytes anyway
+        return image if image.mode == "RGB" else image.convert("RGB")
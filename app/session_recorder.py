@@ -0,0 +1,290 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+# Record kinds; every row of a session file has the same layout, whatever its kind
+FRAME, DETECTION, TRACK, EVENT = 0, 1, 2, 3
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("kind", "u1"),
+        ("frame", "<u4"),         # frame number within the recording
+        ("timestamp", "<f8"),     # capture time, time.monotonic()
+        ("track_id", "<i4"),      # tracks and events; -1 otherwise
+        ("bbox", "<f4", (4,)),    # x1, y1, x2, y2 (detections: detector box, tracks: Kalman state)
+        ("score", "<f4"),         # detector probability
+        ("label", "<i2"),         # gesture label (detections, tracks) or Event value (events); -1 for none
+        ("value", "<i2"),         # frame: detection count, track: frames since last update
+        ("hits", "<i2"),          # track hit streak
+    ],
+    align=True,
+)
+
+HEADER_DTYPE = np.dtype(
+    {
+        "names": ["magic", "version", "record_size", "created", "started"],
+        "formats": ["S8", "<u4", "<u4", "<f8", "<f8"],
+        "offsets": [0, 8, 12, 16, 24],
+        "itemsize": 64,
+    }
+)
+MAGIC = b"GESTREC1"
+VERSION = 1
+
+
+def frame_rows(frame, timestamp, dets, labels, tracks, events=()):
+    """RECORD_DTYPE rows, as tuples, for one frame of MainController.update (see SessionRecorder.record_frame)."""
+    rows = [(FRAME, frame, timestamp, -1, (0.0, 0.0, 0.0, 0.0), 0.0, -1, len(dets), 0)]
+    if len(dets):
+        det_labels = [-1] * len(dets) if labels is None else np.asarray(labels).reshape(-1).tolist()
+        for (x1, y1, x2, y2, score), label in zip(dets[:, :5].tolist(), det_labels):
+            rows.append((DETECTION, frame, timestamp, -1, (x1, y1, x2, y2), score, label, 0, 0))
+    for trk in tracks:
+        tracker = trk["tracker"]
+        # Kalman state [cx, cy, area, aspect] -> box, as convert_x_to_bbox does
+        cx, cy, s, r = tracker.kf.x[:4, 0].tolist()
+        w = (s * r) ** 0.5 if s * r > 0 else 0.0
+        h = s / w if w else 0.0
+        gesture = trk["hands"].last_gesture
+        rows.append((
+            TRACK, frame, timestamp, tracker.id + 1, (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2), 0.0,
+            -1 if gesture is None else gesture, min(tracker.time_since_update, 32767), min(tracker.hit_streak, 32767),
+        ))
+    for track_id, event in events:
+        rows.append((EVENT, frame, timestamp, track_id, (0.0, 0.0, 0.0, 0.0), 0.0, event.value, 0, 0))
+    return rows
+
+
+class SessionRecorder:
+    """
+    Always-on, low-overhead capture of what the gesture tracker saw and did.
+
+    Each tracked frame becomes a handful of fixed-size rows (RECORD_DTYPE):
+    one FRAME row, one row per detection (box, probability, label), one per
+    live track (Kalman box, last gesture, age) and one per emitted Event.
+    Rows are filled into a preallocated batch on the caller's thread and the
+    batch is handed to a writer thread, so the recognition loop never waits on
+    the disk; if the writer falls behind, batches are dropped and counted.
+    Files start with a 64-byte header and rotate by size or age, keeping the
+    newest `max_files`. Read them back with SessionRecording.
+
+    API:
+      rec = SessionRecorder("recordings")
+      controller.recorder = rec     # MainController.update records every frame
+      rec.close()
+    """
+
+    BATCH_ROWS = 1024
+    FLUSH_SEC  = 1.0      # hand a partial batch to the writer after this long
+    QUEUE_SIZE = 64       # batches waiting for the writer before new ones are dropped
+
+    def __init__(self, directory="recordings", prefix="session", max_bytes=64 << 20, max_seconds=3600.0, max_files=20):
+        """
+        Parameters
+        ----------
+        directory : str
+            Where session files are written; created if missing.
+        prefix : str
+            File name prefix; files are <prefix>-<YYYYmmdd-HHMMSS>-<n>.grec.
+        max_bytes : int
+            Start a new file once the current one reaches this size.
+        max_seconds : float
+            Start a new file once the current one is this old.
+        max_files : int
+            Delete the oldest files with this prefix beyond this count; None keeps all.
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+        self.frames = 0
+        self.records = 0
+        self.dropped = 0   # rows lost because the writer queue was full
+        self.files = []    # paths written, oldest first
+        self.error = None
+        self._batch = np.zeros(self.BATCH_ROWS, dtype=RECORD_DTYPE)
+        self._rows = 0
+        self._handed_at = time.monotonic()
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+
+    # ---------- Caller thread ----------
+    def record_frame(self, timestamp, dets, labels, tracks, events=()):
+        """
+        Parameters
+        ----------
+        timestamp : float
+            Capture time of the frame.
+        dets : np.ndarray
+            Detections [[x1, y1, x2, y2, score], ...], possibly empty.
+        labels : np.ndarray
+            Gesture label per detection, or None if the classifier was skipped.
+        tracks : list
+            MainController tracks after the update.
+        events : list
+            (track id, Event) pairs emitted on this frame.
+        """
+        rows = frame_rows(self.frames, timestamp, dets, labels, tracks, events)
+        needed = len(rows)
+        if self._rows + needed > len(self._batch):
+            self._hand_off()
+            if needed > len(self._batch):
+                self._batch = np.zeros(needed, dtype=RECORD_DTYPE)
+        self._batch[self._rows:self._rows + needed] = rows
+        self._rows += needed
+        self.frames += 1
+        self.records += needed
+        if timestamp - self._handed_at >= self.FLUSH_SEC:
+            self._hand_off(timestamp)
+
+    def flush(self):
+        """Hand the partial batch to the writer."""
+        self._hand_off()
+
+    def close(self):
+        """Write everything recorded so far and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._hand_off()
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def metrics(self):
+        return {
+            "frames": self.frames,
+            "records": self.records,
+            "dropped": self.dropped,
+            "files": len(self.files),
+            "queued": self._queue.qsize(),
+        }
+
+    def _hand_off(self, now=None):
+        self._handed_at = time.monotonic() if now is None else now
+        if not self._rows:
+            return
+        batch = self._batch[:self._rows]
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            self.dropped += self._rows
+        # the writer owns the old batch now
+        self._batch = np.zeros(self.BATCH_ROWS, dtype=RECORD_DTYPE)
+        self._rows = 0
+
+    # ---------- Writer thread ----------
+    def _run(self):
+        opened_at = 0.0
+        written = 0
+        try:
+            while True:
+                batch = self._queue.get()
+                if batch is None:
+                    break
+                now = time.monotonic()
+                if self._file is None or written >= self.max_bytes or now - opened_at >= self.max_seconds:
+                    written = self._open_file()
+                    opened_at = now
+                self._file.write(batch.tobytes())
+                self._file.flush()
+                written += batch.nbytes
+        except Exception as e:
+            print("Session recorder error:", e)
+            self.error = e
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open_file(self):
+        if self._file is not None:
+            self._file.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{len(self.files):03d}.grec")
+        header = np.zeros((), dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["record_size"] = RECORD_DTYPE.itemsize
+        header["created"] = time.time()
+        header["started"] = time.monotonic()
+        self._file = open(path, "wb")
+        self._file.write(header.tobytes())
+        self.files.append(path)
+        self._prune()
+        return HEADER_DTYPE.itemsize
+
+    def _prune(self):
+        if self.max_files is None:
+            return
+        names = sorted(
+            name for name in os.listdir(self.directory) if name.startswith(self.prefix + "-") and name.endswith(".grec")
+        )
+        for name in names[:-self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError as e:
+                print(f"Could not remove old recording {name}: {e}")
+
+
+class SessionRecording:
+    """
+    Read-only view of one session file; no parsing, the rows are memory-mapped.
+
+    API:
+      rec = SessionRecording("recordings/session-20260101-120000-000.grec")
+      rec.records                   # every row, RECORD_DTYPE
+      rec.frames, rec.detections, rec.tracks, rec.events   # rows of one kind
+      SessionRecording.concatenate(paths)                  # rotated files as one array
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(self.header) == 0 or self.header["magic"][0] != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        self.header = self.header[0]
+        if self.header["version"] != VERSION or self.header["record_size"] != RECORD_DTYPE.itemsize:
+            raise ValueError(
+                f"{path}: unsupported recording version {self.header['version']} "
+                f"(record size {self.header['record_size']})"
+            )
+        # a file cut off mid-write ends in a partial row; ignore it
+        count = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def of_kind(self, kind):
+        return self.records[self.records["kind"] == kind]
+
+    @property
+    def frames(self):
+        return self.of_kind(FRAME)
+
+    @property
+    def detections(self):
+        return self.of_kind(DETECTION)
+
+    @property
+    def tracks(self):
+        return self.of_kind(TRACK)
+
+    @property
+    def events(self):
+        return self.of_kind(EVENT)
+
+    @staticmethod
+    def concatenate(paths):
+        """Rows of several files (e.g. one rotated session) as one in-memory array."""
+        return np.concatenate([SessionRecording(path).records for path in paths] or [np.zeros(0, dtype=RECORD_DTYPE)])
@@ -0,0 +1,278 @@
+import time
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+
+from startup import lazy_import
+
+# scipy.fft keeps float32 input in single precision. It costs ~0.25 s to import, so it is
+# loaded by load_fft() (app.py calls it on a background thread), not when the app starts.
+_scipy_fft = lazy_import("scipy.fft")
+_fft = None
+
+
+def load_fft():
+    """The FFT module: scipy.fft, or numpy.fft without scipy. Imported on the first call."""
+    global _fft
+    if _fft is None:
+        try:
+            _fft = _scipy_fft.load()
+        except ImportError:  # pragma: no cover - scipy is a dependency of utils, numpy is the fallback
+            _fft = np.fft
+    return _fft
+
+
+class RunningMedianMAD:
+    """
+    Exact median and median absolute deviation over the last `window` values.
+
+    Values are kept sorted, so the median is an index lookup and the MAD is a
+    k-th-smallest search over the two sorted runs of deviations on either side
+    of the median (O(log^2 n)), instead of two full np.median passes per frame.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._order = deque()
+        self._sorted = []
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def push(self, x):
+        x = float(x)
+        if len(self._order) == self.window:
+            old = self._order.popleft()
+            del self._sorted[bisect_left(self._sorted, old)]
+        self._order.append(x)
+        insort(self._sorted, x)
+
+    def median(self):
+        s, n = self._sorted, len(self._sorted)
+        return s[n // 2] if n % 2 else 0.5 * (s[n // 2 - 1] + s[n // 2])
+
+    def mad(self):
+        s, n = self._sorted, len(self._sorted)
+        m = self.median()
+        p = bisect_left(s, m)
+        if n % 2:
+            return self._kth_deviation(s, p, m, n // 2)
+        return 0.5 * (self._kth_deviation(s, p, m, n // 2 - 1) + self._kth_deviation(s, p, m, n // 2))
+
+    @staticmethod
+    def _kth_deviation(s, p, m, k):
+        # Deviations form two ascending runs: A[i] = m - s[p-1-i] (below m), B[j] = s[p+j] - m.
+        la, lb = p, len(s) - p
+        lo, hi = max(0, k + 1 - lb), min(k + 1, la)
+        while lo < hi:
+            i = (lo + hi) // 2  # take i from A and k+1-i from B
+            j = k + 1 - i
+            if j > 0 and s[p + j - 1] - m > m - s[p - 1 - i]:
+                lo = i + 1
+            else:
+                hi = i
+        i, j = lo, k + 1 - lo
+        a = m - s[p - i] if i > 0 else -np.inf
+        b = s[p + j - 1] - m if j > 0 else -np.inf
+        return max(a, b)
+
+
+class SpectrumAnalyzer:
+    """
+    Audio analysis behind the visualizer, usable without Tk or a sound card.
+
+    Per frame: float32 FFT of a Hann-windowed block, band averages through a
+    precomputed np.add.reduceat over contiguous bin ranges, robust per-band
+    normalization, attack/release smoothing, loudness, and a bass-only
+    spectral-flux beat detector with a running median/MAD threshold.
+    band_hv() maps the result to per-band hue/value using precomputed phasors.
+
+    API:
+      a = SpectrumAnalyzer(fft_size=2048, samplerate=44100, num_bands=16)
+      a.process(samples)            # float32 block of fft_size mono samples
+      a.levels, a.delta_ema, a.activity, a.pulse_state
+      h, v = a.band_hv()
+    """
+
+    # colours
+    HUE_BAND_SPREAD  = 0.67
+    HUE_AMP_WOBBLE   = 0.7
+    HUE_DELTA_BLEND  = 0.35
+    VAL_BASE         = 0.25
+    VAL_AMP_BOOST    = 0.85
+    VAL_BAND_BOOST   = 0.35
+
+    # smoothing
+    ALPHA_ATTACK       = 0.2
+    ALPHA_RELEASE      = 0.4
+    ALPHA_LOUD_ATTACK  = 0.2
+    ALPHA_LOUD_RELEASE = 0.4
+
+    # bass-only pulse
+    PULSE_GAIN   = 0.6
+    PULSE_DECAY  = 0.5
+
+    # bass detection
+    BASS_MAX_HZ   = 160.0
+    BASS_WEIGHT_EXP = 0.4
+    FLUX_HISTORY  = 90
+    FLUX_K_MAD    = 4.0
+    REFRACTORY    = 0.1
+    MIN_ACTIVITY  = 0.1
+
+    def __init__(self, fft_size=2048, samplerate=44100, num_bands=16, fmin=50.0):
+        self.fft_size = int(fft_size)
+        self.samplerate = samplerate
+        self.num_bands = int(num_bands)
+
+        # FFT bands
+        self.win = np.hanning(self.fft_size).astype(np.float32)
+        self.band_edges = np.geomspace(fmin, samplerate / 2, self.num_bands + 1)
+        self.band_centers = np.sqrt(self.band_edges[:-1] * self.band_edges[1:])
+        freqs = np.fft.rfftfreq(self.fft_size, d=1.0 / samplerate)
+        bin_band = np.searchsorted(self.band_edges, freqs, side='right') - 1
+        bin_band[(freqs < self.band_edges[0]) | (freqs >= self.band_edges[-1])] = -1
+        valid = np.flatnonzero(bin_band >= 0)
+        # Bins are sorted by frequency, so every band is one contiguous run of bins
+        self.bin_lo, self.bin_hi = int(valid[0]), int(valid[-1]) + 1
+        counts = np.bincount(bin_band[valid], minlength=self.num_bands)
+        self.bands_present = np.flatnonzero(counts > 0)
+        self.band_starts = (np.concatenate(([0], np.cumsum(counts)[:-1]))[self.bands_present]).astype(np.intp)
+        self.band_counts = counts[self.bands_present].astype(np.float32)
+
+        # bass mask/weights
+        bass_mask = self.band_centers <= self.BASS_MAX_HZ
+        if not np.any(bass_mask):
+            bass_mask[0] = True
+        bass_centers_norm = np.clip(self.band_centers[bass_mask] / max(1e-6, self.BASS_MAX_HZ), 0.0, 1.0)
+        self.bass_weights = (bass_centers_norm ** self.BASS_WEIGHT_EXP).astype(np.float32)
+        self.bass_weights /= (self.bass_weights.sum() + 1e-9)
+        self.bass_mask = bass_mask
+
+        # median / 90th percentile positions (np.percentile 'linear' interpolation)
+        n = self.num_bands
+        self._q = [(int(np.floor(q * (n - 1))), q * (n - 1) - np.floor(q * (n - 1))) for q in (0.5, 0.9)]
+
+        # band phasors and hue offsets for band_hv
+        idx = np.arange(self.num_bands, dtype=np.float32)
+        self.phasors = np.exp(1j * 2.0 * np.pi * (idx / self.num_bands)).astype(np.complex64)
+        self.hue_offsets = (self.HUE_BAND_SPREAD * (idx / max(1, self.num_bands - 1))).astype(np.float32)
+
+        # Preallocated buffers
+        self._windowed = np.empty(self.fft_size, dtype=np.float32)
+        self._mag = np.empty(self.fft_size // 2 + 1, dtype=np.float32)
+        self._band_sum = np.empty(self.bands_present.shape[0], dtype=np.float32)
+        self.amps = np.zeros(self.num_bands, dtype=np.float32)
+
+        self.reset()
+
+    def reset(self):
+        self.levels     = np.zeros(self.num_bands, dtype=np.float32)
+        self.prev_lvls  = np.zeros_like(self.levels)
+        self.delta_ema  = np.zeros_like(self.levels)
+        self.loud_state = 0.0
+        self.activity = 0.0
+        self.pulse_state = 0.0
+        self.prev_norm_for_flux_bass = None
+        self.flux_prev2 = 0.0
+        self.flux_prev1 = 0.0
+        self.flux_stats = RunningMedianMAD(self.FLUX_HISTORY)
+        self.last_trigger_time = 0.0
+
+    def process(self, samples, now=None):
+        """
+        Analyze one block of `fft_size` mono samples and update the state.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            Mono audio block.
+        now : float
+            Timestamp in seconds for the beat refractory period; defaults to time.perf_counter().
+        """
+        # spectrum → band averages
+        np.multiply(samples, self.win, out=self._windowed, casting="unsafe")
+        spec = (_fft or load_fft()).rfft(self._windowed)
+        np.abs(spec, out=self._mag, casting="unsafe")
+        np.add.reduceat(self._mag[self.bin_lo:self.bin_hi], self.band_starts, out=self._band_sum)
+        self._band_sum /= self.band_counts
+        amps = self.amps
+        amps[self.bands_present] = self._band_sum
+
+        # robust normalize
+        s = np.sort(amps)
+        (i50, f50), (i90, f90) = self._q
+        med = float(s[i50] + (s[min(i50 + 1, s.shape[0] - 1)] - s[i50]) * f50) + 1e-8
+        p90 = float(s[i90] + (s[min(i90 + 1, s.shape[0] - 1)] - s[i90]) * f90) + 1e-8
+        norm = np.clip((amps - med) / ((p90 - med) + 1e-8), 0.0, 1.0)
+
+        # Bass-only spectral flux (lag-1 peak)
+        bass_norm = norm[self.bass_mask]
+        if self.prev_norm_for_flux_bass is None:
+            flux_bass_now = 0.0
+        else:
+            pos = np.clip(bass_norm - self.prev_norm_for_flux_bass, 0.0, 1.0)
+            flux_bass_now = float(np.dot(pos, self.bass_weights))
+        self.prev_norm_for_flux_bass = bass_norm
+
+        # per-band smoothing
+        alpha = np.where(norm > self.levels, self.ALPHA_ATTACK, self.ALPHA_RELEASE).astype(np.float32)
+        self.levels = alpha * self.levels + (1 - alpha) * norm
+        delta = np.clip(self.levels - self.prev_lvls, 0.0, 1.0)
+        self.delta_ema = 0.70 * self.delta_ema + 0.30 * delta
+        self.prev_lvls = self.levels
+
+        # activity (loudness)
+        loud_now = float(np.sqrt(np.dot(self.levels, self.levels) / self.num_bands))
+        if loud_now > self.loud_state:
+            self.loud_state = self.ALPHA_LOUD_ATTACK  * self.loud_state + (1 - self.ALPHA_LOUD_ATTACK)  * loud_now
+        else:
+            self.loud_state = self.ALPHA_LOUD_RELEASE * self.loud_state + (1 - self.ALPHA_LOUD_RELEASE) * loud_now
+        self.activity = min(1.0, max(0.0, self.loud_state))
+
+        # Update flux history on prev1 (lag-1)
+        self.flux_stats.push(self.flux_prev1)
+        if len(self.flux_stats) >= 10:
+            medf = self.flux_stats.median()
+            mad  = self.flux_stats.mad() + 1e-9
+            thresh = medf + self.FLUX_K_MAD * (1.4826 * mad)
+        else:
+            thresh = 1.0
+
+        # Bass beat trigger → center pulse
+        now_time = time.perf_counter() if now is None else now
+        is_peak = (self.flux_prev1 > self.flux_prev2) and (self.flux_prev1 > flux_bass_now)
+        strong_enough = (self.flux_prev1 > thresh)
+        refractory_ok = (now_time - self.last_trigger_time) >= self.REFRACTORY
+        active_enough = (self.activity >= self.MIN_ACTIVITY)
+
+        self.pulse_state *= self.PULSE_DECAY
+        if is_peak and strong_enough and refractory_ok and active_enough:
+            self.pulse_state += self.PULSE_GAIN
+            self.last_trigger_time = now_time
+
+        self.flux_prev2, self.flux_prev1 = self.flux_prev1, flux_bass_now
+        return self
+
+    def band_hv(self):
+        """Per-band hue and value in [0, 1] for the current state."""
+        levels_01, activity_01 = self.levels, self.activity
+
+        z1 = np.dot(levels_01 + 1e-6, self.phasors)
+        hue_energy = (np.angle(z1) % (2 * np.pi)) / (2 * np.pi)
+
+        z2 = np.dot(self.delta_ema + 1e-6, self.phasors)
+        hue_change = (np.angle(z2) % (2 * np.pi)) / (2 * np.pi)
+
+        hue_base = (1.0 - self.HUE_DELTA_BLEND) * hue_energy + self.HUE_DELTA_BLEND * hue_change
+        hue_base %= 1.0
+
+        h0 = (hue_base + self.hue_offsets) % 1.0
+        h1 = (h0 + self.HUE_AMP_WOBBLE * levels_01) % 1.0
+        # shortest-arc hue lerp
+        d = ((h1 - h0 + 0.5) % 1.0) - 0.5
+        h = (h0 + levels_01 * d) % 1.0
+
+        v = np.clip(self.VAL_BASE + self.VAL_AMP_BOOST * activity_01 + self.VAL_BAND_BOOST * levels_01, 0.0, 1.0)
+        return h, v
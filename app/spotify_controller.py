@@ -1,29 +1,20 @@
 import os
 import platform
 import sys
+import threading
 import time
 import subprocess
+import weakref
 
 import psutil
-from dotenv import load_dotenv
 import spotipy
-from spotipy.oauth2 import SpotifyOAuth
 
-# Load environment variables from .env
-load_dotenv()
-
-CLIENT_ID = os.getenv("SPOTIPY_CLIENT_ID")
-CLIENT_SECRET = os.getenv("SPOTIPY_CLIENT_SECRET")
-REDIRECT_URI = os.getenv("SPOTIPY_REDIRECT_URI")
+from http_session import get_spotify
 
 
 def auth_spotify():
-    return spotipy.Spotify(auth_manager=SpotifyOAuth(
-        client_id=CLIENT_ID,
-        client_secret=CLIENT_SECRET,
-        redirect_uri=REDIRECT_URI,
-        scope="user-read-playback-state user-modify-playback-state user-read-currently-playing"
-    ))
+    """Return the shared Spotify client (pooled keep-alive session with retries)."""
+    return get_spotify()
 
 def list_devices(sp):
     """Return list of available devices (dicts)."""
@@ -46,71 +37,195 @@ def get_device_id(sp, device_name=None):
     # no active device
     return None
 
+
+# ---------- playback state cache ----------
+STATE_TTL_SEC = 5.0
+
+
+class PlaybackStateCache:
+    """
+    Short-lived copy of the playback state the commands below need:
+    active device id, its volume and whether it is playing.
+
+    One `sp.current_playback()` call fills all three fields, which then stay
+    valid for `ttl` seconds. Commands update the fields locally after they
+    succeed, so repeated volume swipes are computed here and reconciled with
+    Spotify on the next refresh. A 404 from Spotify means the cached device
+    is gone, so the whole cache is dropped.
+    """
+
+    def __init__(self, ttl=STATE_TTL_SEC):
+        self.ttl = ttl
+        self.device_id = None
+        self.volume = None
+        self.is_playing = None
+        self.updated_at = None
+        self.named_devices = {}  # lower-cased device name -> id
+        self.devices_at = None
+        self.lock = threading.RLock()
+
+    def _fresh(self, stamp):
+        return stamp is not None and time.monotonic() - stamp < self.ttl
+
+    def refresh(self, sp):
+        """Reload device, volume and play state with a single API call."""
+        playback = sp.current_playback()
+        device = (playback or {}).get("device") or {}
+        with self.lock:
+            self.device_id = device.get("id")
+            self.volume = device.get("volume_percent")
+            self.is_playing = bool(playback and playback.get("is_playing"))
+            self.updated_at = time.monotonic()
+        return playback
+
+    def ensure(self, sp):
+        """Refresh the state only if it is older than the TTL."""
+        with self.lock:
+            if not self._fresh(self.updated_at):
+                self.refresh(sp)
+
+    def resolve_device(self, sp, device_name=None):
+        """Cached equivalent of `get_device_id`."""
+        with self.lock:
+            if not device_name:
+                self.ensure(sp)
+                return self.device_id
+            key = device_name.lower()
+            if not self._fresh(self.devices_at) or key not in self.named_devices:
+                devices = list_devices(sp)
+                self.named_devices = {d["name"].lower(): d["id"] for d in devices}
+                self.devices_at = time.monotonic()
+                if key not in self.named_devices:
+                    raise RuntimeError(
+                        f"Device named '{device_name}' not found. Available: {[d['name'] for d in devices]}"
+                    )
+            return self.named_devices[key]
+
+    def patch(self, **fields):
+        """
+        Update cached fields after a command succeeded, e.g. `patch(is_playing=False)`.
+        Done under the lock, as refresh() and invalidate() may run on other threads.
+        """
+        with self.lock:
+            for name, value in fields.items():
+                if name not in ("device_id", "volume", "is_playing"):
+                    raise AttributeError(f"PlaybackStateCache has no field {name!r}")
+                setattr(self, name, value)
+
+    def invalidate(self):
+        with self.lock:
+            self.device_id = None
+            self.volume = None
+            self.is_playing = None
+            self.updated_at = None
+            self.named_devices = {}
+            self.devices_at = None
+
+
+_state_caches = weakref.WeakKeyDictionary()
+
+
+def get_state_cache(sp):
+    """Return the PlaybackStateCache bound to this Spotify client."""
+    cache = _state_caches.get(sp)
+    if cache is None:
+        cache = _state_caches.setdefault(sp, PlaybackStateCache())
+    return cache
+
+
+def _run_on_device(sp, device_name, command):
+    """
+    Resolve the device through the cache and run `command(device_id)`.
+    If Spotify no longer knows the cached device (404), drop the cache and retry once.
+    """
+    cache = get_state_cache(sp)
+    device_id = cache.resolve_device(sp, device_name)
+    try:
+        return command(device_id)
+    except spotipy.SpotifyException as e:
+        if e.http_status != 404:
+            raise
+        cache.invalidate()
+        return command(cache.resolve_device(sp, device_name))
+
+
 def transfer_to_device(sp, device_name, force_play=False):
     device_id = get_device_id(sp, device_name)
     sp.transfer_playback(device_id, force_play=force_play)
+    get_state_cache(sp).invalidate()
     return device_id
 
 def pause(sp, device_name=None):
-    device_id = get_device_id(sp, device_name)
-    sp.pause_playback(device_id=device_id)
+    _run_on_device(sp, device_name, lambda device_id: sp.pause_playback(device_id=device_id))
+    get_state_cache(sp).patch(is_playing=False)
 
 def play(sp, device_name=None, uris=None, context_uri=None, position_ms=None):
     """
     Resume or start playback. Optionally pass track URIs, a context_uri (album/playlist),
     or a starting position_ms.
     """
-    device_id = get_device_id(sp, device_name)
-    sp.start_playback(
-        device_id=device_id,
-        uris=uris,
-        context_uri=context_uri,
-        position_ms=position_ms
+    _run_on_device(
+        sp,
+        device_name,
+        lambda device_id: sp.start_playback(
+            device_id=device_id,
+            uris=uris,
+            context_uri=context_uri,
+            position_ms=position_ms
+        ),
     )
+    get_state_cache(sp).patch(is_playing=True)
 
 def next_track(sp, device_name=None):
-    device_id = get_device_id(sp, device_name)
-    sp.next_track(device_id=device_id)
+    _run_on_device(sp, device_name, lambda device_id: sp.next_track(device_id=device_id))
 
 def previous_track(sp, device_name=None):
-    device_id = get_device_id(sp, device_name)
-    sp.previous_track(device_id=device_id)
+    _run_on_device(sp, device_name, lambda device_id: sp.previous_track(device_id=device_id))
 
 
 def get_current_volume(sp):
-    """Return the active device's current volume percent (0–100)."""
-    playback = sp.current_playback()
-    if playback and playback.get("device"):
-        return playback["device"].get("volume_percent")
-    return None
+    """Return the active device's current volume percent (0–100), at most STATE_TTL_SEC old."""
+    cache = get_state_cache(sp)
+    with cache.lock:
+        cache.ensure(sp)
+        return cache.volume
+
+
+def _change_volume(sp, step, device_name=None):
+    """Apply a relative volume change computed from the cached volume."""
+    cache = get_state_cache(sp)
+    with cache.lock:
+        current = get_current_volume(sp)
+        if current is None:
+            return None
+        new_volume = max(0, min(100, current + step))
+        set_volume(sp, new_volume, device_name)
+    return new_volume
 
 
 def increase_volume(sp, step=5, device_name=None):
     """Increase volume by `step` percent (default +5)."""
-    current = get_current_volume(sp)
-    if current is None:
+    new_volume = _change_volume(sp, step, device_name)
+    if new_volume is None:
         print("No active device or unable to get current volume.")
         return
-    new_volume = min(100, current + step)
-    set_volume(sp, new_volume, device_name)
     print(f"Volume increased to {new_volume}%")
 
 
 def decrease_volume(sp, step=5, device_name=None):
     """Decrease volume by `step` percent (default -5)."""
-    current = get_current_volume(sp)
-    if current is None:
+    new_volume = _change_volume(sp, -step, device_name)
+    if new_volume is None:
         print("No active device or unable to get current volume.")
         return
-    new_volume = max(0, current - step)
-    set_volume(sp, new_volume, device_name)
     print(f"Volume decreased to {new_volume}%")
 
 def set_volume(sp, volume_percent, device_name=None):
     """0–100"""
     volume_percent = max(0, min(100, int(volume_percent)))
-    device_id = get_device_id(sp, device_name)
-    sp.volume(volume_percent, device_id=device_id)
+    _run_on_device(sp, device_name, lambda device_id: sp.volume(volume_percent, device_id=device_id))
+    # Keep the local copy in sync; the next refresh reconciles it with Spotify.
+    get_state_cache(sp).patch(volume=volume_percent)
 
 def playpause(sp, device_name=None):
     """
@@ -119,20 +234,20 @@ def playpause(sp, device_name=None):
     - If currently paused, resumes.
     """
     try:
-        playback = sp.current_playback()
-        if not playback:
+        cache = get_state_cache(sp)
+        cache.ensure(sp)
+        with cache.lock:  # device and play state from the same snapshot
+            device_id, is_playing = cache.device_id, cache.is_playing
+        if device_id is None:
             activate_and_play_here(sp, "Its late")
             print("No active playback found. Start playing something first.")
             return
 
-        is_playing = playback.get("is_playing", False)
-        device_id = playback.get("device", {}).get("id") or get_device_id(sp, device_name)
-
         if is_playing:
-            sp.pause_playback(device_id=device_id)
+            pause(sp, device_name)
             print("⏸️  Paused playback.")
         else:
-            sp.start_playback(device_id=device_id)
+            play(sp, device_name)
             print("▶️  Resumed playback.")
 
     except Exception as e:
@@ -265,4 +380,5 @@ def activate_and_play_here(sp, playlist_uri=None, shuffle=True, wait_open=8, dev
     # 4) Shuffle + play HERE
     sp.shuffle(bool(shuffle), device_id=device_id)
     sp.start_playback(device_id=device_id, context_uri=playlist_uri)
+    get_state_cache(sp).invalidate()
     print(f"🎯 Active device set to THIS computer.\n🔀▶️  Shuffling and playing: {playlist_name}")
\ No newline at end of file
@@ -0,0 +1,113 @@
+import importlib
+import threading
+import time
+from concurrent.futures import Future
+
+_T0 = time.perf_counter()
+
+
+class StartupTimeline:
+    """
+    Records when each startup step finished, relative to when this module was
+    first imported (the first import in app.py).
+
+    API:
+      timeline.mark("window shown")   # any thread; printed as it happens
+      timeline.report()               # all marks so far, in order
+    """
+
+    def __init__(self, verbose=True):
+        self.verbose = verbose
+        self.marks = []  # (seconds since start, thread name, label)
+        self._lock = threading.Lock()
+
+    def mark(self, label):
+        t = time.perf_counter() - _T0
+        with self._lock:
+            self.marks.append((t, threading.current_thread().name, label))
+        if self.verbose:
+            print(f"[startup] +{t:6.3f}s {label}")
+        return t
+
+    def report(self):
+        with self._lock:
+            marks = sorted(self.marks)
+        lines = [f"  +{t:6.3f}s  {label}  ({thread})" for t, thread, label in marks]
+        print("Startup timeline:\n" + "\n".join(lines))
+        return marks
+
+
+timeline = StartupTimeline()
+_imported = set()  # modules already reported on the timeline
+
+
+class LazyModule:
+    """
+    Stand-in for a module (or one of its attributes) that is imported on first use.
+
+    `cv2 = lazy_import("cv2")` keeps `cv2.imshow(...)` working unchanged while
+    the import cost moves to the first call, or to a warm-up thread via load().
+    """
+
+    def __init__(self, module_name, attr=None):
+        self._module_name = module_name
+        self._attr = attr
+        self._target = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    t0 = time.perf_counter()
+                    target = importlib.import_module(self._module_name)
+                    if self._attr is not None:
+                        target = getattr(target, self._attr)
+                    self._target = target
+                    if self._module_name not in _imported:
+                        _imported.add(self._module_name)
+                        timeline.mark(f"imported {self._module_name} ({time.perf_counter() - t0:.3f}s)")
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __repr__(self):
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy {self._module_name}{'.' + self._attr if self._attr else ''} ({state})>"
+
+
+def lazy_import(module_name, attr=None):
+    return LazyModule(module_name, attr)
+
+
+def run_in_background(label, fn, *args, **kwargs):
+    """
+    Run fn on a daemon thread and mark the timeline when it finishes.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Holds fn's result, or the exception it raised.
+    """
+    future = Future()
+
+    def _run():
+        future.set_running_or_notify_cancel()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            timeline.mark(f"{label} failed: {e}")
+            future.set_exception(e)
+        else:
+            timeline.mark(f"{label} ready")
+            future.set_result(result)
+
+    threading.Thread(target=_run, name=label, daemon=True).start()
+    return future
@@ -0,0 +1,167 @@
+import numpy as np
+
+GESTURES = (31, 35, 36, 0, 1, 2, 30, 19, 17, 25, 3, 38, 5, 4, 15, 14, 39, 16, 6, 18, 29, 11, 12, 23, 40)
+
+
+class SyntheticScene:
+    """
+    Detection streams with ground truth for stressing the tracker with many hands.
+
+    Every object is a hand-sized box moving in a `width` x `height` frame.
+    Motion models: "linear" (constant velocity, bouncing off the edges),
+    "walk" (velocity does a random walk) and "swipe" (back-and-forth sweeps).
+    A `crossing` share of the objects enter from the left and right edges at
+    shared heights so their paths cross head-on. The detector is simulated
+    with corner noise, random misses, occlusion (when two boxes overlap more
+    than `occlusion_iou`, the one drawn behind is not detected) and false
+    positives; labels follow each object's gesture, which changes now and then.
+
+    API:
+      scene = SyntheticScene(objects=20, frames=600, motion="walk", dropout=0.1, seed=0)
+      frames, truth = scene.generate()
+      # frames: [(timestamp, dets (N, 5), labels (N,)), ...] as replay.TrackerReplay takes them
+      # truth:  [object id per detection row (N,), -1 for false positives, ...]
+    """
+
+    MOTIONS = ("linear", "walk", "swipe")
+    SIZE_RANGE  = (60.0, 120.0)   # box width in pixels; height is 1.2x
+    SPEED_RANGE = (2.0, 12.0)     # pixels per frame
+    GESTURE_CHANGE = 0.02         # chance per frame that an object changes gesture
+
+    def __init__(
+        self,
+        objects=10,
+        frames=600,
+        fps=30,
+        width=1280,
+        height=720,
+        motion="linear",
+        crossing=0.0,
+        dropout=0.05,
+        occlusion_iou=0.5,
+        noise_px=2.0,
+        false_positives=0.0,
+        seed=0,
+    ):
+        """
+        Parameters
+        ----------
+        objects : int
+            Number of hands in the scene.
+        frames : int
+            Length of the stream.
+        fps : float
+            Frame rate the timestamps are spaced at.
+        width, height : int
+            Frame size in pixels.
+        motion : str
+            One of MOTIONS.
+        crossing : float
+            Share of objects on head-on crossing paths.
+        dropout : float
+            Chance that a visible object is not detected on a frame.
+        occlusion_iou : float
+            Overlap above which the object behind is hidden; None disables occlusion.
+        noise_px : float
+            Standard deviation of the detector noise on each box corner.
+        false_positives : float
+            Mean number of spurious detections per frame.
+        seed : int
+            Random seed; the same arguments give the same stream.
+        """
+        if motion not in self.MOTIONS:
+            raise ValueError(f"motion must be one of {self.MOTIONS}, not {motion!r}")
+        self.objects = int(objects)
+        self.frames = int(frames)
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.motion = motion
+        self.crossing = crossing
+        self.dropout = dropout
+        self.occlusion_iou = occlusion_iou
+        self.noise_px = noise_px
+        self.false_positives = false_positives
+        self.seed = seed
+
+    def generate(self):
+        rng = np.random.default_rng(self.seed)
+        n = self.objects
+        size = rng.uniform(*self.SIZE_RANGE, n)
+        wh = np.stack((size, size * 1.2), axis=1)
+        limit = np.array((self.width, self.height)) - wh
+        pos = rng.uniform(0.0, 1.0, (n, 2)) * limit
+        speed = rng.uniform(*self.SPEED_RANGE, n)
+        angle = rng.uniform(0.0, 2 * np.pi, n)
+        vel = np.stack((np.cos(angle), np.sin(angle)), axis=1) * speed[:, None]
+
+        crossers = rng.random(n) < self.crossing
+        if crossers.any():
+            # pairs share a height and start from opposite edges, heading at each other
+            idx = np.flatnonzero(crossers)
+            lanes = rng.uniform(0.0, 1.0, (len(idx) + 1) // 2) * limit[idx[0], 1]
+            for k, i in enumerate(idx):
+                from_left = k % 2 == 0
+                pos[i] = (0.0 if from_left else limit[i, 0], lanes[k // 2])
+                vel[i] = (speed[i] if from_left else -speed[i], 0.0)
+
+        # swipers sweep left and right around where they started; crossers still cross
+        swipers = np.flatnonzero(~crossers) if self.motion == "swipe" else np.empty(0, dtype=int)
+        vel[swipers] = 0.0
+        swipe_phase = rng.uniform(0.0, 2 * np.pi, len(swipers))
+        swipe_period = rng.uniform(20, 60, len(swipers))  # frames per sweep
+        swipe_center = pos[swipers, 0].copy()
+        swipe_amplitude = rng.uniform(0.1, 0.3, len(swipers)) * self.width
+        gesture = rng.choice(GESTURES, n)
+        depth = rng.permutation(n)  # higher is in front
+
+        frames, truth = [], []
+        for f in range(self.frames):
+            if self.motion == "walk":
+                vel += rng.normal(0.0, 1.0, (n, 2))
+                np.clip(vel, -self.SPEED_RANGE[1], self.SPEED_RANGE[1], out=vel)
+            pos += vel
+            if len(swipers):
+                phase = swipe_phase + 2 * np.pi * f / swipe_period
+                pos[swipers, 0] = swipe_center + swipe_amplitude * np.sin(phase)
+            # bounce off the edges
+            vel[(pos < 0.0) | (pos > limit)] *= -1.0
+            np.clip(pos, 0.0, limit, out=pos)
+
+            changes = rng.random(n) < self.GESTURE_CHANGE
+            gesture[changes] = rng.choice(GESTURES, int(changes.sum()))
+
+            boxes = np.concatenate((pos, pos + wh), axis=1)
+            visible = rng.random(n) >= self.dropout
+            if self.occlusion_iou is not None:
+                visible &= ~self._occluded(boxes, depth)
+            ids = np.flatnonzero(visible)
+            dets = boxes[ids] + rng.normal(0.0, self.noise_px, (len(ids), 4))
+            scores = rng.uniform(0.6, 1.0, len(ids))
+            labels = gesture[ids]
+
+            spurious = rng.poisson(self.false_positives) if self.false_positives else 0
+            if spurious:
+                s = rng.uniform(*self.SIZE_RANGE, spurious)
+                xy = rng.uniform(0.0, 1.0, (spurious, 2)) * (np.array((self.width, self.height)) - s[:, None] * 1.2)
+                fp = np.concatenate((xy, xy + np.stack((s, s * 1.2), axis=1)), axis=1)
+                dets = np.concatenate((dets, fp))
+                scores = np.concatenate((scores, rng.uniform(0.5, 0.8, spurious)))
+                labels = np.concatenate((labels, rng.choice(GESTURES, spurious)))
+                ids = np.concatenate((ids, np.full(spurious, -1)))
+
+            frames.append((f / self.fps, np.column_stack((dets, scores)), labels.astype(np.int64)))
+            truth.append(ids)
+        return frames, truth
+
+    def _occluded(self, boxes, depth):
+        """Objects hidden behind another one they overlap by more than occlusion_iou."""
+        x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+        y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+        x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+        y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+        inter = np.clip(x2 - x1, 0.0, None) * np.clip(y2 - y1, 0.0, None)
+        area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        iou = inter / (area[:, None] + area[None, :] - inter)
+        behind = depth[:, None] < depth[None, :]
+        return ((iou > self.occlusion_iou) & behind).any(axis=1)
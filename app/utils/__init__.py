@@ -2,7 +2,7 @@ from .action_controller import Deque
 from .box_utils_numpy import hard_nms
 from .drawer import Drawer
 from .enums import Event, HandPosition, targets
-from .hand import Hand
+from .hand import Hand, HandHistory
 
 
 __all__ = [
@@ -12,5 +12,6 @@ __all__ = [
     "Event",
     "HandPosition",
     "targets",
-    "Hand"
+    "Hand",
+    "HandHistory",
 ]
\ No newline at end of file
@@ -1,55 +1,160 @@
+import time
+
+import numpy as np
 from scipy.spatial import distance
 from collections import deque
 
 from .enums import Event, HandPosition, targets
-from .hand import Hand
+from .hand import Hand, HandHistory
+
+
+# gesture -> (start position, position if the start is in the history, position otherwise)
+POSITION_RULES = {
+    31: (HandPosition.DOWN_START, HandPosition.UP_END, HandPosition.UP_START),  # palm
+    35: (HandPosition.DOWN_START, HandPosition.UP_END, HandPosition.UP_START),  # stop
+    36: (HandPosition.DOWN_START, HandPosition.UP_END, HandPosition.UP_START),  # stop_inv
+    0: (HandPosition.UP_START, HandPosition.DOWN_END, HandPosition.DOWN_START),  # hand_down
+    1: (HandPosition.LEFT_START, HandPosition.RIGHT_END, HandPosition.RIGHT_START),  # hand_right
+    2: (HandPosition.RIGHT_START, HandPosition.LEFT_END, HandPosition.LEFT_START),  # hand_left
+    30: (HandPosition.FAST_SWIPE_UP_START, HandPosition.FAST_SWIPE_UP_END, HandPosition.FAST_SWIPE_DOWN_START),  # one
+    19: (HandPosition.FAST_SWIPE_DOWN_START, HandPosition.FAST_SWIPE_DOWN_END, HandPosition.FAST_SWIPE_UP_START),  # point
+    17: (None, HandPosition.DRAG_START, HandPosition.DRAG_START),  # grabbing
+    25: (HandPosition.ZOOM_OUT_START, HandPosition.ZOOM_OUT_END, HandPosition.ZOOM_IN_START),  # fist
+    3: (HandPosition.ZOOM_IN_START, HandPosition.ZOOM_IN_END, HandPosition.ZOOM_OUT_START),  # thumb_index
+    38: (HandPosition.ZOOM_IN_START, HandPosition.ZOOM_IN_END, HandPosition.ZOOM_OUT_START),  # three2
+    5: (HandPosition.LEFT_START2, HandPosition.RIGHT_END2, HandPosition.RIGHT_START2),  # thumb_right
+    4: (HandPosition.RIGHT_START2, HandPosition.LEFT_END2, HandPosition.LEFT_START2),  # thumb_left
+    15: (HandPosition.LEFT_START3, HandPosition.RIGHT_END3, HandPosition.RIGHT_START3),  # two_right
+    14: (HandPosition.RIGHT_START3, HandPosition.LEFT_END3, HandPosition.LEFT_START3),  # two_left
+    39: (HandPosition.DOWN_START3, HandPosition.UP_END3, HandPosition.UP_START3),  # two_up
+    16: (HandPosition.UP_START3, HandPosition.DOWN_END3, HandPosition.DOWN_START3),  # two_down
+    6: (HandPosition.ZOOM_OUT_START, HandPosition.DOWN_END2, HandPosition.UP_START2),  # thumb_down
+}
+
+# gestures without a position that still trigger (or end) an action in check_is_action
+UNPOSITIONED_ACTION_GESTURES = {11, 12, 18, 29}  # hand_heart, hand_heart2, grip, ok
 
 
 class Deque:
-    def __init__(self, maxlen=30, min_frames=20):
+    """
+    Gesture history of one track and the rules that turn it into events.
+
+    Observations are rows of a HandHistory; indexing and iteration return
+    Hand views. "Where did this position/gesture first appear" is a column
+    scan; "is this position in the history" is a per-position count.
+
+    Durations and the history window are measured on observation timestamps,
+    so gestures take as long to trigger at 15 FPS, with skipped frames or with
+    skipped detections as they do at 30 FPS. The rules were tuned in frames at
+    NOMINAL_FPS; each threshold below is that frame count converted with half
+    a frame of slack, so timestamp jitter does not flip the outcome.
+    """
+
+    NOMINAL_FPS = 30
+    MAX_FPS = 120              # history rows are sized for this rate
+    FAST_SWIPE_MS = 617        # 20 frames
+    SWIPE3_MS = 450            # 15 frames
+    DRAG_MS = 50               # 3 frames
+    TAP_MS = 217               # 8 frames
+    DOUBLE_TAP_MIN_MS = 17     # 2 frames
+    DOUBLE_TAP_MAX_MS = 250    # at most 8 frames
+
+    def __init__(self, maxlen=30, min_frames=20, window_ms=None, min_duration_ms=None):
+        """
+        Parameters
+        ----------
+        maxlen : int
+            History length in frames at NOMINAL_FPS; sets window_ms unless given.
+        min_frames : int
+            Default gesture duration in frames at NOMINAL_FPS; sets min_duration_ms unless given.
+        window_ms : float
+            Observations older than this are dropped.
+        min_duration_ms : float
+            Default minimum gesture duration for check_duration.
+        """
         self.maxlen = maxlen
-        self._deque = []
+        self.min_frames = min_frames
+        self.window_ms = window_ms if window_ms is not None else self.frames_to_ms(maxlen, slack=0.5)
+        self.min_duration_ms = min_duration_ms if min_duration_ms is not None else self.frames_to_ms(min_frames)
+        rows = max(maxlen, int(self.window_ms * self.MAX_FPS / 1000) + 1)
+        self._deque = HandHistory(rows, max_age=self.window_ms / 1000)
         self.action = None
+        self.last_gesture = None  # latest classified gesture; survives clear() for frames that skip the classifier
         self.min_absolute_distance = 1.5
-        self.min_frames = min_frames
         self.action_deque = deque(maxlen=5)
 
+    @classmethod
+    def frames_to_ms(cls, frames, slack=-0.5):
+        """Time from the first to the last of `frames` frames at NOMINAL_FPS, plus `slack` frames."""
+        return (frames - 1 + slack) * 1000.0 / cls.NOMINAL_FPS
+
     def __len__(self):
         return len(self._deque)
 
     def index_position(self, x):
-        for i in range(len(self._deque)):
-            if self._deque[i].position == x:
-                return i
+        found = np.flatnonzero(self._deque.column("position") == x.value)
+        return int(found[0]) if len(found) else None
 
     def index_gesture(self, x):
-        for i in range(len(self._deque)):
-            if self._deque[i].gesture == x:
-                return i
+        found = np.flatnonzero(self._deque.column("gesture") == x)
+        return int(found[0]) if len(found) else None
 
     def __getitem__(self, index):
-        return self._deque[index]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._deque.view(index)
 
     def __setitem__(self, index, value):
-        self._deque[index] = value
+        self._deque.set_record(index, value._rec)
 
     def __delitem__(self, index):
-        del self._deque[index]
+        self._deque.replace(np.delete(self._deque.rows, index))
 
     def __iter__(self):
-        return iter(self._deque)
+        return (self._deque.view(i) for i in range(len(self)))
 
     def __reversed__(self):
-        return reversed(self._deque)
+        return (self._deque.view(i) for i in range(len(self) - 1, -1, -1))
 
     def append(self, x):
-        if self.maxlen is not None and len(self) >= self.maxlen:
-            self._deque.pop(0)
-        self.set_hand_position(x)
-        self._deque.append(x)
-        self.check_is_action(x)
+        self._deque.make_room(x.timestamp)
+        if x.gesture is not None:
+            self.last_gesture = x.gesture
+        position = self.position_for(x.gesture)
+        rec = self._deque.push_record(x._rec, position)
+        self.check_is_action(Hand._of(rec, x.hand_id, x.gesture, position))
+
+    def append_observation(self, bbox=None, gesture=None, timestamp=None):
+        """
+        Record one frame of this track without allocating a Hand for misses.
+
+        Parameters
+        ----------
+        bbox : np.ndarray
+            Bounding box [x1, y1, x2, y2], or None if the track was not detected.
+        gesture : int
+            Gesture label, or None.
+        timestamp : float
+            Capture time in seconds (time.monotonic()); defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self._deque.make_room(timestamp)
+        if gesture is not None:
+            self.last_gesture = gesture
+        position = self.position_for(gesture)
+        rec = self._deque.push(bbox, gesture, timestamp, position)
+        if bbox is None and gesture is None:
+            # A miss has no gesture, so its position is UNKNOWN and no rule can fire on it
+            return False
+        return self.check_is_action(Hand._of(rec, None, None if gesture is None else int(gesture), position))
 
-    def check_duration(self, start_index, min_frames=None):
+    def elapsed_ms(self, start_index):
+        """Milliseconds from the observation at start_index to the newest one."""
+        timestamps = self._deque.column("timestamp")
+        return (timestamps[-1] - timestamps[start_index]) * 1000.0
+
+    def check_duration(self, start_index, min_ms=None):
         """
         Check duration of swipe.
 
@@ -58,19 +163,19 @@ class Deque:
         start_index : int
             Index of start position of swipe.
 
+        min_ms : float
+            Minimum duration; defaults to min_duration_ms.
+
         Returns
         -------
         bool
-            True if duration of swipe is more than min_frames.
+            True if duration of swipe is at least min_ms.
         """
-        if min_frames == None:
-            min_frames = self.min_frames
-        if len(self) - start_index >= min_frames:
-            return True
-        else:
-            return False
-        
-    def check_duration_max(self, start_index, max_frames=10):
+        if min_ms is None:
+            min_ms = self.min_duration_ms
+        return self.elapsed_ms(start_index) >= min_ms
+
+    def check_duration_max(self, start_index, max_ms=317):
         """
         Check duration of swipe.
 
@@ -79,15 +184,15 @@ class Deque:
         start_index : int
             Index of start position of swipe.
 
+        max_ms : float
+            Maximum duration (default: 10 frames at NOMINAL_FPS).
+
         Returns
         -------
         bool
-            True if duration of swipe is more than min_frames.
+            True if duration of swipe is at most max_ms.
         """
-        if len(self) - start_index <= max_frames:
-            return True
-        else:
-            return False
+        return self.elapsed_ms(start_index) <= max_ms
         
     def check_is_action(self, x):
         """
@@ -103,12 +208,15 @@ class Deque:
         bool
             True if gesture is action.
         """
+        if x.position is HandPosition.UNKNOWN and x.gesture not in UNPOSITIONED_ACTION_GESTURES:
+            return False
+
         if x.position == HandPosition.LEFT_END and HandPosition.RIGHT_START in self:
             start_index = self.index_position(HandPosition.RIGHT_START)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_horizontal_swipe(self._deque[start_index], x)
+                and self.check_horizontal_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_LEFT
                 self.clear()
@@ -117,9 +225,9 @@ class Deque:
         elif x.position == HandPosition.RIGHT_END and HandPosition.LEFT_START in self:
             start_index = self.index_position(HandPosition.LEFT_START)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_horizontal_swipe(self._deque[start_index], x)
+                and self.check_horizontal_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_RIGHT
                 self.clear()
@@ -130,9 +238,9 @@ class Deque:
         elif x.position == HandPosition.UP_END and HandPosition.DOWN_START in self:
             start_index = self.index_position(HandPosition.DOWN_START)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_UP
                 self.clear()
@@ -143,9 +251,9 @@ class Deque:
         elif x.position == HandPosition.DOWN_END and HandPosition.UP_START in self:
             start_index = self.index_position(HandPosition.UP_START)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_DOWN
                 self.clear()
@@ -180,8 +288,8 @@ class Deque:
         elif x.position == HandPosition.FAST_SWIPE_UP_END and HandPosition.FAST_SWIPE_UP_START in self:
             start_index = self.index_position(HandPosition.FAST_SWIPE_UP_START)
             if (
-                self.check_duration(start_index, min_frames=20)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                self.check_duration(start_index, min_ms=self.FAST_SWIPE_MS)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.FAST_SWIPE_UP
                 self.clear()
@@ -192,8 +300,8 @@ class Deque:
         elif x.position == HandPosition.FAST_SWIPE_DOWN_END and HandPosition.FAST_SWIPE_DOWN_START in self:
             start_index = self.index_position(HandPosition.FAST_SWIPE_DOWN_START)
             if (
-                self.check_duration(start_index, min_frames=20)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                self.check_duration(start_index, min_ms=self.FAST_SWIPE_MS)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.FAST_SWIPE_DOWN
                 self.clear()
@@ -202,9 +310,9 @@ class Deque:
         elif x.position == HandPosition.ZOOM_IN_END and HandPosition.ZOOM_IN_START in self:
             start_index = self.index_position(HandPosition.ZOOM_IN_START)
             if (
-                    self.check_duration(start_index, min_frames=20)
-                    and self.check_vertical_swipe(self._deque[start_index], x)
-                    and self.check_horizontal_swipe(self._deque[start_index], x)
+                    self.check_duration(start_index, min_ms=self.FAST_SWIPE_MS)
+                    and self.check_vertical_swipe(self[start_index], x)
+                    and self.check_horizontal_swipe(self[start_index], x)
                 ):
                     self.action = Event.ZOOM_IN
                     self.clear()
@@ -213,9 +321,9 @@ class Deque:
         elif x.position == HandPosition.ZOOM_OUT_END and HandPosition.ZOOM_OUT_START in self:
             start_index = self.index_position(HandPosition.ZOOM_OUT_START)
             if (
-                    self.check_duration(start_index, min_frames=20)
-                    and self.check_vertical_swipe(self._deque[start_index], x)
-                    and self.check_horizontal_swipe(self._deque[start_index], x)
+                    self.check_duration(start_index, min_ms=self.FAST_SWIPE_MS)
+                    and self.check_vertical_swipe(self[start_index], x)
+                    and self.check_horizontal_swipe(self[start_index], x)
                 ):
                     self.action = Event.ZOOM_OUT
                     self.clear()
@@ -227,9 +335,9 @@ class Deque:
             
             start_index = self.index_position(HandPosition.RIGHT_START2)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_horizontal_swipe(self._deque[start_index], x)
+                and self.check_horizontal_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_LEFT2
                 self.clear()
@@ -240,9 +348,9 @@ class Deque:
         elif x.position == HandPosition.RIGHT_END2 and HandPosition.LEFT_START2 in self:
             start_index = self.index_position(HandPosition.LEFT_START2)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_horizontal_swipe(self._deque[start_index], x)
+                and self.check_horizontal_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_RIGHT2
                 self.clear()
@@ -253,9 +361,9 @@ class Deque:
         elif x.position == HandPosition.UP_END2 and HandPosition.DOWN_START2 in self:
             start_index = self.index_position(HandPosition.DOWN_START2)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_UP2
                 self.clear()
@@ -266,9 +374,9 @@ class Deque:
         elif x.position == HandPosition.LEFT_END3 and HandPosition.RIGHT_START3 in self:
             start_index = self.index_position(HandPosition.RIGHT_START3)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_horizontal_swipe(self._deque[start_index], x)
+                and self.check_horizontal_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_LEFT3 # two
                 self.clear()
@@ -279,9 +387,9 @@ class Deque:
         elif x.position == HandPosition.RIGHT_END3 and HandPosition.LEFT_START3 in self:
             start_index = self.index_position(HandPosition.LEFT_START3)
             if (
-                self.swipe_distance(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
                 and self.check_duration(start_index)
-                and self.check_horizontal_swipe(self._deque[start_index], x)
+                and self.check_horizontal_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_RIGHT3
                 self.clear()
@@ -292,8 +400,8 @@ class Deque:
         elif x.position == HandPosition.UP_END3 and HandPosition.DOWN_START3 in self:
             start_index = self.index_position(HandPosition.DOWN_START3)
             if (
-                self.check_duration(start_index, min_frames=15)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                self.check_duration(start_index, min_ms=self.SWIPE3_MS)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_UP3
                 self.clear()
@@ -304,8 +412,8 @@ class Deque:
         elif x.position == HandPosition.DOWN_END3 and HandPosition.UP_START3 in self:
             start_index = self.index_position(HandPosition.UP_START3)
             if (
-                self.check_duration(start_index, min_frames=15)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                self.check_duration(start_index, min_ms=self.SWIPE3_MS)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_DOWN3
                 self.clear()
@@ -317,7 +425,7 @@ class Deque:
             if self.action is None:
                 start_index = self.index_gesture(17) # grabbing
                 
-                if self.check_duration(start_index, min_frames=3):
+                if self.check_duration(start_index, min_ms=self.DRAG_MS):
                     self.action = Event.DRAG
                     return True
                 else:
@@ -326,18 +434,18 @@ class Deque:
         elif HandPosition.ZOOM_IN_START in self and x.gesture == 19: # point
             start_index = self.index_position(HandPosition.ZOOM_IN_START)
             if (
-                self.check_duration(start_index, min_frames=8)
-                and self.check_vertical_swipe(self._deque[start_index], x)
-                and self.check_horizontal_swipe(self._deque[start_index], x)
+                self.check_duration(start_index, min_ms=self.TAP_MS)
+                and self.check_vertical_swipe(self[start_index], x)
+                and self.check_horizontal_swipe(self[start_index], x)
             ):
                 self.action = Event.TAP
                 self.clear()
                 return True
             elif (
-                self.check_duration(start_index, min_frames=2)
-                and self.check_duration_max(start_index, max_frames=8)
-                and self.check_vertical_swipe(self._deque[start_index], x)
-                and self.check_horizontal_swipe(self._deque[start_index], x)
+                self.check_duration(start_index, min_ms=self.DOUBLE_TAP_MIN_MS)
+                and self.check_duration_max(start_index, max_ms=self.DOUBLE_TAP_MAX_MS)
+                and self.check_vertical_swipe(self[start_index], x)
+                and self.check_horizontal_swipe(self[start_index], x)
             ):
                 self.action_deque.append(Event.TAP)
                 if len(self.action_deque) >= 2 and self.action_deque[-1] == Event.TAP and self.action_deque[-2] == Event.TAP:
@@ -352,8 +460,8 @@ class Deque:
         elif x.position == HandPosition.DOWN_END2 and HandPosition.ZOOM_OUT_START in self:
             start_index = self.index_position(HandPosition.ZOOM_OUT_START)
             if (
-                self.swipe_distance(self._deque[start_index], x)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_DOWN2
                 self.clear()
@@ -364,8 +472,8 @@ class Deque:
         elif x.position == HandPosition.ZOOM_OUT_START and HandPosition.UP_START2 in self:
             start_index = self.index_position(HandPosition.UP_START2)
             if (
-                self.swipe_distance(self._deque[start_index], x)
-                and self.check_vertical_swipe(self._deque[start_index], x)
+                self.swipe_distance(self[start_index], x)
+                and self.check_vertical_swipe(self[start_index], x)
             ):
                 self.action = Event.SWIPE_UP2
                 self.clear()
@@ -430,9 +538,7 @@ class Deque:
             return False
 
     def __contains__(self, item):
-        for x in self._deque:
-            if x.position == item:
-                return True
+        return self._deque.has_position(item.value)
 
     def set_hand_position(self, hand: Hand):
         """
@@ -443,106 +549,29 @@ class Deque:
         hand : Hand
             Hand object.
         """
-        if hand.gesture in [31, 35, 36]: # [palm, stop, stop_inv]
-            if HandPosition.DOWN_START in self:
-                hand.position = HandPosition.UP_END
-            else:
-                hand.position = HandPosition.UP_START
-
-        elif hand.gesture == 0: # hand_down
-            if HandPosition.UP_START in self:
-                hand.position = HandPosition.DOWN_END
-            else:
-                hand.position = HandPosition.DOWN_START
-
-        elif hand.gesture == 1: # hand_right
-            if HandPosition.LEFT_START in self:
-                hand.position = HandPosition.RIGHT_END
-            else:
-                hand.position = HandPosition.RIGHT_START
-
-        elif hand.gesture == 2: # hand_left
-            if HandPosition.RIGHT_START in self:
-                hand.position = HandPosition.LEFT_END
-            else:
-                hand.position = HandPosition.LEFT_START
-
-        elif hand.gesture == 30: # one
-            if HandPosition.FAST_SWIPE_UP_START in self:
-                hand.position = HandPosition.FAST_SWIPE_UP_END
-            else:
-                hand.position = HandPosition.FAST_SWIPE_DOWN_START
-
-        elif hand.gesture == 19: # point
-            if HandPosition.FAST_SWIPE_DOWN_START in self:
-                hand.position = HandPosition.FAST_SWIPE_DOWN_END
-            else:
-                hand.position = HandPosition.FAST_SWIPE_UP_START
-
-        elif hand.gesture == 17: # grabbing
-            hand.position = HandPosition.DRAG_START
-        
-        elif hand.gesture == 25: # fist
-            if HandPosition.ZOOM_OUT_START in self:
-                hand.position = HandPosition.ZOOM_OUT_END
-            else:
-                hand.position = HandPosition.ZOOM_IN_START
-        
-        elif hand.gesture == 3: # thumb_index
-            if HandPosition.ZOOM_IN_START in self:
-                hand.position = HandPosition.ZOOM_IN_END
-            else:
-                hand.position = HandPosition.ZOOM_OUT_START
-
-        elif hand.gesture == 38: # three2
-            if HandPosition.ZOOM_IN_START in self:
-                hand.position = HandPosition.ZOOM_IN_END
-            else:
-                hand.position = HandPosition.ZOOM_OUT_START
-
-        elif hand.gesture == 5: # thumb_right
-            if HandPosition.LEFT_START2 in self:
-                hand.position = HandPosition.RIGHT_END2
-            else:
-                hand.position = HandPosition.RIGHT_START2
+        hand.position = self.position_for(hand.gesture)
 
-        elif hand.gesture == 4: # thumb_left
-            if HandPosition.RIGHT_START2 in self:
-                hand.position = HandPosition.LEFT_END2
-            else:
-                hand.position = HandPosition.LEFT_START2
-
-        elif hand.gesture == 15: # two_right
-            if HandPosition.LEFT_START3 in self:
-                hand.position = HandPosition.RIGHT_END3
-            else:
-                hand.position = HandPosition.RIGHT_START3
-
-        elif hand.gesture == 14: # two_left
-            if HandPosition.RIGHT_START3 in self:
-                hand.position = HandPosition.LEFT_END3
-            else:
-                hand.position = HandPosition.LEFT_START3
-        
-        elif hand.gesture == 39: # two_up
-            if HandPosition.DOWN_START3 in self:
-                hand.position = HandPosition.UP_END3
-            else:
-                hand.position = HandPosition.UP_START3
+    def position_for(self, gesture):
+        """
+        Position a new observation with this gesture gets, given the history so far.
 
-        elif hand.gesture == 16: # two_down
-            if HandPosition.UP_START3 in self:
-                hand.position = HandPosition.DOWN_END3
-            else:
-                hand.position = HandPosition.DOWN_START3
+        Parameters
+        ----------
+        gesture : int
+            Gesture label, or None.
 
-        elif hand.gesture == 6: # thumb_down
-            if HandPosition.ZOOM_OUT_START in self:
-                hand.position = HandPosition.DOWN_END2
-            else:
-                hand.position = HandPosition.UP_START2
-        else:
-            hand.position = HandPosition.UNKNOWN
+        Returns
+        -------
+        HandPosition
+            The "end" position if the matching "start" is in the history, else the "start" one.
+        """
+        rule = POSITION_RULES.get(gesture)
+        if rule is None:
+            return HandPosition.UNKNOWN
+        start, end, otherwise = rule
+        if start is not None and start in self:
+            return end
+        return otherwise
 
     def swipe_distance(
         self,
@@ -574,25 +603,29 @@ class Deque:
         self._deque.clear()
 
     def copy(self):
-        return self._deque.copy()
+        return [hand.copy() for hand in self]
 
     def count(self, x):
-        return self._deque.count(x)
+        return int(np.count_nonzero(self._deque.rows == x._rec))
 
     def extend(self, iterable):
-        self._deque.extend(iterable)
+        for x in iterable:
+            self._deque.push_record(x._rec, x.position)
 
     def insert(self, i, x):
-        self._deque.insert(i, x)
+        self._deque.replace(np.insert(self._deque.rows, i, x._rec))
 
     def pop(self):
         return self._deque.pop()
 
     def remove(self, value):
-        self._deque.remove(value)
+        found = np.flatnonzero(self._deque.rows == value._rec)
+        if not len(found):
+            raise ValueError("Deque.remove(x): x not in deque")
+        del self[int(found[0])]
 
     def reverse(self):
-        self._deque.reverse()
+        self._deque.replace(self._deque.rows[::-1])
 
     def __str__(self):
-        return f"Deque({[hand.gesture for hand in self._deque]})"
+        return f"Deque({[hand.gesture for hand in self]})"
@@ -1,4 +1,40 @@
+import time
+from collections import Counter
+
+import numpy as np
+
+from .enums import HandPosition
+
+# One observation of a tracked hand. Missed frames are rows with valid=False.
+HAND_DTYPE = np.dtype(
+    [
+        ("bbox", np.float64, 4),
+        ("center", np.float64, 2),
+        ("size", np.float64),
+        ("gesture", np.int16),  # NO_GESTURE when the frame had no detection
+        ("position", np.int16),  # HandPosition value, NO_POSITION until set
+        ("timestamp", np.float64),
+        ("valid", np.bool_),
+    ]
+)
+NO_GESTURE = -1
+NO_POSITION = 0
+
+_POSITIONS = {position.value: position for position in HandPosition}
+
+
 class Hand:
+    """
+    One hand observation: a view over a row of a HandHistory, or a standalone record.
+
+    Views stay valid until the history they come from is appended to again
+    (rows move when the buffer slides); copy() detaches one. gesture and
+    position are read once and written through to the row, since the gesture
+    rules look at them many times per frame.
+    """
+
+    __slots__ = ("_rec", "hand_id", "_gesture", "_position")
+
     def __init__(self, bbox, hand_id=None, gesture=None):
         """
         Hand class
@@ -14,16 +50,200 @@ class Hand:
         gesture : int
             Current gesture of hand
         """
-        self.bbox = bbox
+        self._rec = np.array([_record(bbox, gesture, time.monotonic())], dtype=HAND_DTYPE)[0]
         self.hand_id = hand_id
-        if self.bbox is not None:
-            self.center = self._get_center()
-            self.size = self.bbox[2] - self.bbox[0]
-        self.position = None
-        self.gesture = gesture
+        self._gesture = None if gesture is None else int(gesture)
+        self._position = None
+
+    @classmethod
+    def view(cls, rec, hand_id=None):
+        gesture = int(rec["gesture"])
+        return cls._of(rec, hand_id, None if gesture == NO_GESTURE else gesture, _POSITIONS.get(int(rec["position"])))
+
+    @classmethod
+    def _of(cls, rec, hand_id, gesture, position):
+        """View of a row whose gesture and position the caller just wrote."""
+        hand = cls.__new__(cls)
+        hand._rec = rec
+        hand.hand_id = hand_id
+        hand._gesture = gesture
+        hand._position = position
+        return hand
 
-    def _get_center(self):
-        return (self.bbox[0] + self.bbox[2]) / 2, (self.bbox[1] + self.bbox[3]) / 2
+    def copy(self):
+        return Hand.view(self._rec.copy(), self.hand_id)
+
+    @property
+    def bbox(self):
+        return self._rec["bbox"] if self._rec["valid"] else None
+
+    @property
+    def center(self):
+        return self._rec["center"] if self._rec["valid"] else None
+
+    @property
+    def size(self):
+        return float(self._rec["size"]) if self._rec["valid"] else None
+
+    @property
+    def gesture(self):
+        return self._gesture
+
+    @gesture.setter
+    def gesture(self, value):
+        self._rec["gesture"] = NO_GESTURE if value is None else value
+        self._gesture = None if value is None else int(value)
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        # For standalone hands; rows of a HandHistory get their position from push()
+        self._rec["position"] = NO_POSITION if value is None else value.value
+        self._position = value
+
+    @property
+    def timestamp(self):
+        return float(self._rec["timestamp"])
 
     def __repr__(self):
         return f"Hand({self.center}, {self.size}, {self.position}, {self.gesture})"
+
+
+class HandHistory:
+    """
+    Fixed-capacity history of one track's observations in a structured array.
+
+    Rows live in a buffer twice as long as `maxlen`; the live window only
+    slides forward, and is moved back to the front once per `maxlen` appends,
+    so it is always one contiguous slice and column scans are plain numpy.
+    A count per position answers "is there a LEFT_START in the window" without
+    a scan; positions are therefore written through push(), not through views.
+    With `max_age`, rows older than that (relative to the newest timestamp)
+    are dropped too, so the window covers the same time at any frame rate.
+
+    API:
+      h = HandHistory(120, max_age=1.0)
+      h.push(bbox, gesture, timestamp, position)   # bbox None records a miss
+      h.has_position(HandPosition.LEFT_START.value)
+      h.column("gesture")                          # live (n,) view, oldest first
+      h.view(-1)                                   # Hand view of the newest row
+    """
+
+    def __init__(self, maxlen=30, max_age=None):
+        self.maxlen = maxlen
+        self.max_age = max_age
+        self._data = np.zeros(2 * maxlen if maxlen else 64, dtype=HAND_DTYPE)
+        self._start = 0
+        self._end = 0
+        self._position_counts = Counter()
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def rows(self):
+        """Live window of records, oldest first (a view)."""
+        return self._data[self._start:self._end]
+
+    def column(self, name):
+        return self._data[name][self._start:self._end]
+
+    def view(self, index):
+        return Hand.view(self._data[self._row(index)])
+
+    def has_position(self, value):
+        return self._position_counts[value] > 0
+
+    def make_room(self, timestamp=None):
+        """
+        Drop rows too old for an observation at `timestamp`, and the oldest one if
+        the history is full, so the next push does not evict.
+        """
+        if self.max_age is not None and timestamp is not None:
+            timestamps = self.column("timestamp")
+            expired = int(np.searchsorted(timestamps, timestamp - self.max_age, side="right"))
+            for row in range(self._start, self._start + expired):
+                self._position_counts[int(self._data[row]["position"])] -= 1
+            self._start += expired
+        if self.maxlen and self._end - self._start >= self.maxlen:
+            self._position_counts[int(self._data[self._start]["position"])] -= 1
+            self._start += 1
+
+    def push(self, bbox=None, gesture=None, timestamp=None, position=None):
+        """Append one observation; old rows are dropped first (see make_room). Returns the new row."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        row = self._next_row(timestamp)
+        self._data[row] = _record(bbox, gesture, timestamp, position)
+        self._position_counts[NO_POSITION if position is None else position.value] += 1
+        return self._data[row]
+
+    def push_record(self, rec, position=None):
+        row = self._next_row(float(rec["timestamp"]))
+        self._data[row] = rec
+        if position is not None:
+            self._data[row]["position"] = position.value
+        self._position_counts[int(self._data[row]["position"])] += 1
+        return self._data[row]
+
+    def set_record(self, index, rec):
+        self._data[self._row(index)] = rec
+        self._recount()
+
+    def pop(self):
+        if self._end == self._start:
+            raise IndexError("pop from empty HandHistory")
+        self._end -= 1
+        rec = self._data[self._end].copy()
+        self._position_counts[int(rec["position"])] -= 1
+        return Hand.view(rec)
+
+    def clear(self):
+        self._start = self._end = 0
+        self._position_counts.clear()
+
+    def replace(self, records):
+        """Make `records` (oldest first) the whole history; used by the rarely needed list-style edits."""
+        records = np.array(records, dtype=HAND_DTYPE)
+        if self.maxlen:
+            records = records[-self.maxlen:]
+        if len(records) > len(self._data):
+            self._data = np.zeros(2 * len(records), dtype=HAND_DTYPE)
+        self._data[:len(records)] = records
+        self._start, self._end = 0, len(records)
+        self._recount()
+
+    def _recount(self):
+        self._position_counts = Counter(self.column("position").tolist())
+
+    def _row(self, index):
+        n = self._end - self._start
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("HandHistory index out of range")
+        return self._start + index
+
+    def _next_row(self, timestamp=None):
+        self.make_room(timestamp)
+        if self._end == len(self._data):
+            n = self._end - self._start
+            if not self.maxlen and n > len(self._data) // 2:
+                self._data = np.concatenate([self._data, np.zeros_like(self._data)])
+            self._data[:n] = self._data[self._start:self._end]
+            self._start, self._end = 0, n
+        self._end += 1
+        return self._end - 1
+
+
+def _record(bbox, gesture, timestamp, position=None):
+    """Row tuple for HAND_DTYPE; assigning it writes the whole row in one call."""
+    gesture = NO_GESTURE if gesture is None else gesture
+    position = NO_POSITION if position is None else position.value
+    if bbox is None:
+        return (0.0, 0.0, 0.0, gesture, position, timestamp, False)
+    x1, y1, x2, y2 = bbox[:4].tolist()
+    return ((x1, y1, x2, y2), ((x1 + x2) / 2, (y1 + y2) / 2), x2 - x1, gesture, position, timestamp, True)